@@ -0,0 +1,143 @@
+"""A long-lived asyncio event loop on a background thread for agent work.
+
+Streamlit runs each session's script on its own thread, so ADK's coroutines
+cannot simply be run on the calling thread: nesting ``run_until_complete``
+on a shared loop lets one slow turn stall every other session using it. All
+agent work is submitted to one loop running on a dedicated daemon thread
+instead. Callers get a ``concurrent.futures.Future`` back (or a blocking
+iterator for streamed replies), may wait with a timeout and may cancel; the
+turns of different sessions interleave on the loop while each script thread
+waits only for its own.
+
+Every coroutine touching the ADK runner or session service must go through
+the same loop, since asyncio objects created on one loop cannot be used
+from another.
+"""
+
+import asyncio
+import concurrent.futures
+import os
+import queue
+import threading
+import time
+from collections.abc import AsyncIterator, Coroutine, Iterator
+
+DEFAULT_TURN_TIMEOUT = float(os.environ.get("AGENT_TURN_TIMEOUT", "120"))
+
+
+class AgentLoop:
+    """An asyncio event loop running forever on a daemon thread."""
+
+    def __init__(self, name: str = "agent-loop"):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.timeouts = 0
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def _finished(self, future: concurrent.futures.Future):
+        with self._lock:
+            self.active -= 1
+            if future.cancelled():
+                self.cancelled += 1
+            elif future.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+    def submit(self, coro: Coroutine) -> concurrent.futures.Future:
+        """Schedule ``coro`` on the loop; safe to call from any thread."""
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        with self._lock:
+            self.submitted += 1
+            self.active += 1
+        future.add_done_callback(self._finished)
+        return future
+
+    def run(self, coro: Coroutine, timeout: float | None = DEFAULT_TURN_TIMEOUT):
+        """Run ``coro`` on the loop and wait for its result.
+
+        Raises ``TimeoutError`` and cancels the coroutine when it takes
+        longer than ``timeout`` seconds (None waits forever).
+        """
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            with self._lock:
+                self.timeouts += 1
+            raise TimeoutError(f"agent job took longer than {timeout:g}s") from None
+        except BaseException:
+            future.cancel()
+            raise
+
+    def stream(self, items: AsyncIterator, timeout: float | None = DEFAULT_TURN_TIMEOUT) -> Iterator:
+        """Iterate ``items`` on the loop, yielding each item on the calling thread.
+
+        The whole iteration runs as one task. ``timeout`` bounds the entire
+        iteration; when it expires, or the caller stops iterating early, the
+        task is cancelled. ``TimeoutError`` is raised on timeout.
+        """
+        handoff: queue.Queue = queue.Queue()
+        done = object()
+
+        async def produce():
+            try:
+                async for item in items:
+                    handoff.put(item)
+            finally:
+                handoff.put(done)
+
+        future = self.submit(produce())
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            while True:
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                try:
+                    item = handoff.get(timeout=remaining)
+                except queue.Empty:
+                    with self._lock:
+                        self.timeouts += 1
+                    raise TimeoutError(f"agent job took longer than {timeout:g}s") from None
+                if item is done:
+                    break
+                yield item
+            future.result()
+        finally:
+            if not future.done():
+                future.cancel()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "active": self.active,
+                "completed": self.completed,
+                "failed": self.failed,
+                "cancelled": self.cancelled,
+                "timeouts": self.timeouts,
+            }
+
+
+_agent_loop: AgentLoop | None = None
+_agent_loop_lock = threading.Lock()
+
+
+def get_agent_loop() -> AgentLoop:
+    """The process-wide agent loop, started on first use."""
+    global _agent_loop
+    if _agent_loop is None:
+        with _agent_loop_lock:
+            if _agent_loop is None:
+                _agent_loop = AgentLoop()
+    return _agent_loop
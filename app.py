@@ -1,84 +1,94 @@
-import asyncio
-import json
+import html
+import logging
 import os
 import re
 import time
-from datetime import datetime, timedelta
+from collections.abc import AsyncIterator, Iterator
+from datetime import datetime
 
-import nest_asyncio
 import streamlit as st
 from dotenv import load_dotenv
 
 load_dotenv("fitness_agent/.env")
 
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.events import Event
 from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
 from google.genai import types as genai_types
 
+from fitness_agent import tracing
 from fitness_agent.agent import root_agent
+from fitness_agent.context_compaction import pop_report
 from fitness_agent.utils.calculations import calculate_bmi, calculate_tdee, calculate_macros
 from auth import is_authenticated, render_login_page, render_user_badge
+from agent_loop import get_agent_loop
+from fitness_agent.prefetch import get_prefetcher
+from history_store import DEFAULT_USER_ID, get_history_store
+from session_service import DurableSessionService, session_service_from_env
+from quick_actions import QUICK_ACTIONS, run_quick_action, session_events
+from response_cache import get_response_cache
 
-nest_asyncio.apply()
+logger = logging.getLogger(__name__)
 
 APP_NAME = "fitness_agent"
-USER_ID = "default_user"
-HISTORY_FILE = "fitness_agent/data/user_history.json"
+USER_ID = DEFAULT_USER_ID
+
+MAX_TOOL_CALLS = 6
+STREAMING_RUN_CONFIG = RunConfig(streaming_mode=StreamingMode.SSE)
+FALLBACK_RESPONSE = "I'm sorry, I couldn't process that. Could you try again?"
+TOOL_PROGRESS = {
+    "get_workout_plan": "Building your workout plan...",
+    "get_diet_plan": "Calculating your calories and picking meals...",
+    "get_youtube_recommendations": "Finding videos for your goal...",
+}
+RESPONSE_METRICS_KEPT = 50
+INTRO_REQUEST = " Please greet me by name and briefly tell me what you can help with."
+TRACE_PANEL = os.environ.get("TRACE_PANEL", "0") == "1"
+
+GOAL_MAP = {"Fat Loss": "fat_loss", "Weight Gain": "weight_gain",
+            "Muscle Building": "muscle_building", "Health Maintenance": "health_maintenance"}
+DIET_MAP = {"Vegetarian": "vegetarian", "Non-Vegetarian": "non_vegetarian",
+            "Vegan": "vegan", "Eggetarian": "eggetarian"}
+CUISINE_MAP = {"Indian": "indian", "Western": "western", "Flexible": "flexible"}
+EQUIP_MAP = {"None (Home only)": "none", "Basic (Dumbbells, Bands)": "basic", "Full Gym": "full_gym"}
 
 
 # ── Persistence: Workout Log + Streaks ───────────────────────────────────────
 
-def _load_history() -> dict:
-    if os.path.exists(HISTORY_FILE):
-        with open(HISTORY_FILE) as f:
-            return json.load(f)
-    return {"sessions": [], "workout_log": [], "weight_log": []}
+def _user_id() -> str:
+    """The signed-in user's id, or the shared anonymous id; keys both history and agent sessions."""
+    user = st.session_state.get("auth_user")
+    return user["id"] if user else USER_ID
 
 
-def _save_history(data: dict):
-    os.makedirs(os.path.dirname(HISTORY_FILE), exist_ok=True)
-    with open(HISTORY_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+@tracing.traced("history.load")
+def _load_history() -> dict:
+    return get_history_store().snapshot(_user_id())
 
 
+@tracing.traced("history.log_session")
 def log_session():
-    history = _load_history()
     today = datetime.now().strftime("%Y-%m-%d")
-    if today not in history["sessions"]:
-        history["sessions"].append(today)
-    _save_history(history)
+    get_history_store().log_session(_user_id(), today)
 
 
+@tracing.traced("history.log_weight")
 def log_weight(weight: float):
-    history = _load_history()
     today = datetime.now().strftime("%Y-%m-%d")
-    history["weight_log"] = [
-        e for e in history["weight_log"] if e["date"] != today
-    ]
-    history["weight_log"].append({"date": today, "weight": weight})
-    _save_history(history)
+    get_history_store().log_weight(_user_id(), today, weight)
+
+
+@tracing.traced("history.aggregates")
+def get_history_aggregates() -> dict:
+    return get_history_store().aggregates(_user_id(), datetime.now().strftime("%Y-%m-%d"))
 
 
 def get_streak() -> int:
-    history = _load_history()
-    sessions = sorted(set(history.get("sessions", [])), reverse=True)
-    if not sessions:
-        return 0
-    streak = 0
-    today = datetime.now().date()
-    for i, date_str in enumerate(sessions):
-        d = datetime.strptime(date_str, "%Y-%m-%d").date()
-        expected = today - timedelta(days=i)
-        if d == expected:
-            streak += 1
-        else:
-            break
-    return streak
+    return get_history_aggregates()["current_streak"]
 
 
 def get_weight_history() -> list:
-    history = _load_history()
-    return history.get("weight_log", [])
+    return _load_history()["weight_log"]
 
 
 # ── Styling ──────────────────────────────────────────────────────────────────
@@ -147,103 +157,353 @@ def inject_css():
             line-height: 1.5;
         }
         .next-step-hint strong { color: var(--text-color); }
+
+        .trace-row { display: flex; align-items: center; gap: 0.5rem; font-size: 0.75rem; line-height: 1.4; }
+        .trace-label { flex: 0 0 38%; overflow: hidden; white-space: nowrap; text-overflow: ellipsis; }
+        .trace-track { flex: 1; position: relative; height: 0.7rem; }
+        .trace-bar { position: absolute; top: 0; height: 100%; min-width: 2px; border-radius: 3px; background: #9ca3af; }
+        .trace-model { background: #667eea; }
+        .trace-tool { background: #f59e0b; }
+        .trace-data { background: #10b981; }
+        .trace-history { background: #ef4444; }
+        .trace-render { background: #764ba2; }
+        .trace-ms { flex: 0 0 4.5rem; text-align: right; opacity: 0.75; }
     </style>
     """, unsafe_allow_html=True)
 
 
 # ── ADK Session Management ───────────────────────────────────────────────────
 
-def get_runner():
-    if "adk_runner" not in st.session_state:
-        session_service = InMemorySessionService()
-        runner = Runner(
-            agent=root_agent,
-            app_name=APP_NAME,
-            session_service=session_service,
-        )
-        st.session_state["adk_runner"] = runner
-        st.session_state["adk_session_service"] = session_service
-    return st.session_state["adk_runner"]
+@st.cache_resource
+def get_runner() -> Runner:
+    """The process-wide runner; its session service holds every browser session's ADK session."""
+    return Runner(
+        agent=root_agent,
+        app_name=APP_NAME,
+        session_service=session_service_from_env(),
+    )
 
 
-def get_or_create_session(runner: Runner):
-    if "adk_session_id" not in st.session_state:
+def get_or_create_session(runner: Runner) -> str:
+    """This browser session's ADK session id, creating the session if it is missing.
+
+    With the durable backend, a browser session first resumes the user's most
+    recently updated stored session, so a chat survives an app restart; "Reset
+    Chat" then starts a new one. Otherwise a new session is created after
+    sign-in (the user id changes) and after the session service evicted an
+    idle one.
+    """
+    user_id = _user_id()
+    if st.session_state.get("adk_session_id") is None and st.session_state.get("resumed_for") != user_id:
+        st.session_state["resumed_for"] = user_id
+        _resume_session(runner, user_id)
+    session_id = st.session_state.get("adk_session_id")
+    if session_id is None or not runner.session_service.has_session(APP_NAME, user_id, session_id):
         session_id = f"session_{int(time.time())}_{os.urandom(4).hex()}"
-        st.session_state["adk_session_id"] = session_id
-
-        session_service = st.session_state["adk_session_service"]
-        loop = asyncio.get_event_loop()
-        loop.run_until_complete(session_service.create_session(
+        get_agent_loop().run(runner.session_service.create_session(
             app_name=APP_NAME,
-            user_id=USER_ID,
+            user_id=user_id,
             session_id=session_id,
             state={},
         ))
-    return st.session_state["adk_session_id"]
+        st.session_state["adk_session_id"] = session_id
+    return session_id
 
 
-async def _run_agent(runner: Runner, session_id: str, message: str) -> str:
+def _resume_session(runner: Runner, user_id: str):
+    """Reopen ``user_id``'s latest stored session and rebuild the chat from its events."""
+    if not isinstance(runner.session_service, DurableSessionService):
+        return
+    stored = get_agent_loop().run(runner.session_service.list_sessions(app_name=APP_NAME, user_id=user_id))
+    if not stored.sessions:
+        return
+    session = get_agent_loop().run(runner.session_service.get_session(
+        app_name=APP_NAME, user_id=user_id, session_id=stored.sessions[-1].id,
+    ))
+    if session is None:
+        return
+    st.session_state["adk_session_id"] = session.id
+    messages = chat_messages(session.events)
+    if messages:
+        st.session_state["messages"] = messages
+
+
+def chat_messages(events: list[Event]) -> list[dict]:
+    """The chat's ``{"role", "content"}`` messages for a session's events.
+
+    The profile line sent with the first message is left out, and so is the
+    greeting request, which the chat never shows.
+    """
+    messages = []
+    for event in events:
+        if event.partial or not event.content:
+            continue
+        text = "".join(p.text for p in event.content.parts or [] if p.text and not p.thought)
+        if not text:
+            continue
+        if event.author == "user":
+            if text.endswith(INTRO_REQUEST):
+                continue
+            if text.startswith("My profile:"):
+                text = text.partition("\n\nUser request: ")[2] or text
+            messages.append({"role": "user", "content": text})
+        elif event.is_final_response():
+            messages.append({"role": "assistant", "content": text})
+    return messages
+
+
+async def _agent_events(
+    runner: Runner,
+    session_id: str,
+    message: str,
+    metrics: dict,
+    run_config: RunConfig | None = STREAMING_RUN_CONFIG,
+    user_id: str = USER_ID,
+) -> AsyncIterator[tuple[str, str]]:
+    """Yield ``("text", chunk)`` and ``("tool", name)`` as the agent produces them.
+
+    With SSE streaming the model's text arrives as partial events followed by
+    one complete event repeating it; only the partial chunks are yielded.
+    ``metrics`` receives ``ttft_ms`` (first text chunk, None if there was
+    none), ``total_ms``, per-tool ``tools`` timings and ``context``, the
+    request tokens before and after context compaction.
+
+    Inside a trace, each model call is recorded as a ``model.generate`` span
+    (from the request, or the last tool response, to its final event) and
+    each tool call as a ``tool.call`` span from its call to its response.
+    """
     content = genai_types.Content(
         role="user",
         parts=[genai_types.Part(text=message)],
     )
-    final_text = ""
-    all_text = ""
+    started = time.perf_counter()
+    metrics.update(ttft_ms=None, total_ms=None, tools=[], streamed=False, context=None)
+    invocation_id = None
+    running_tools: dict[str, tuple[str, float]] = {}
     tool_call_count = 0
-    max_tool_calls = 6
-
-    try:
-        async for event in runner.run_async(
-            user_id=USER_ID,
-            session_id=session_id,
-            new_message=content,
-        ):
-            if event.content and event.content.parts:
-                for part in event.content.parts:
-                    if hasattr(part, "function_call") and part.function_call:
+    partial_seen = False
+    model_started, first_chunk = started, None
+
+    def text(chunk: str) -> tuple[str, str]:
+        if metrics["ttft_ms"] is None:
+            metrics["ttft_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return "text", chunk
+
+    with tracing.span("agent.run", session_id=session_id):
+        try:
+            async for event in runner.run_async(
+                user_id=user_id,
+                session_id=session_id,
+                new_message=content,
+                run_config=run_config,
+            ):
+                invocation_id = event.invocation_id
+                now = time.perf_counter()
+                for part in (event.content.parts or []) if event.content else []:
+                    if part.function_call and not event.partial:
                         tool_call_count += 1
-                    if hasattr(part, "text") and part.text:
-                        all_text += part.text
-                        if event.is_final_response():
-                            final_text += part.text
-            if tool_call_count >= max_tool_calls:
-                break
-    except Exception as e:
-        return f"Error: {e}"
-    return final_text or all_text or "I'm sorry, I couldn't process that. Could you try again?"
+                        call = part.function_call
+                        running_tools[call.id or call.name] = (call.name, time.perf_counter())
+                        yield "tool", call.name
+                    elif part.function_response:
+                        response = part.function_response
+                        name, tool_started = running_tools.pop(
+                            response.id or response.name, (response.name, None)
+                        )
+                        if tool_started is not None:
+                            metrics["tools"].append({
+                                "name": name,
+                                "ms": round((now - tool_started) * 1000, 1),
+                            })
+                            tracing.add_span("tool.call", tool_started, now, tool=name)
+                        model_started, first_chunk = now, None
+                    elif part.text and not part.thought:
+                        if first_chunk is None:
+                            first_chunk = now
+                        if event.partial:
+                            partial_seen = metrics["streamed"] = True
+                            yield text(part.text)
+                        elif not partial_seen:
+                            yield text(part.text)
+                if event.content and event.content.role == "model" and not event.partial:
+                    first_chunk_ms = None if first_chunk is None else round((first_chunk - model_started) * 1000, 1)
+                    tracing.add_span(
+                        "model.generate", model_started, now, first_chunk_ms=first_chunk_ms,
+                        tool_calls=sum(1 for p in event.content.parts or [] if p.function_call),
+                    )
+                    model_started, first_chunk = now, None
+                if not event.partial:
+                    partial_seen = False
+                if tool_call_count >= MAX_TOOL_CALLS:
+                    break
+        except Exception as e:
+            yield text(f"Error: {e}")
+        finally:
+            metrics["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            if invocation_id:
+                metrics["context"] = pop_report(invocation_id)
+
+
+def stream_agent(
+    runner: Runner,
+    session_id: str,
+    message: str,
+    metrics: dict,
+    run_config: RunConfig | None = STREAMING_RUN_CONFIG,
+    user_id: str = USER_ID,
+) -> Iterator[tuple[str, str]]:
+    """Synchronous view of :func:`_agent_events`, run on the background agent loop.
+
+    The script thread only waits for this turn's items; a turn running longer
+    than ``AGENT_TURN_TIMEOUT`` seconds is cancelled and ends with an error.
+    """
+    try:
+        yield from get_agent_loop().stream(
+            _agent_events(runner, session_id, message, metrics, run_config, user_id)
+        )
+    except TimeoutError as e:
+        yield "text", f"Error: {e}"
+
+
+def run_agent(
+    runner: Runner,
+    session_id: str,
+    message: str,
+    user_id: str = USER_ID,
+    profile: dict | None = None,
+    name: str = "",
+) -> str:
+    """The agent's complete reply to ``message``.
+
+    With ``profile`` (``profile_tool_args()``) and the user's ``name``, a
+    message opening the session is first looked up in the response cache
+    (see ``response_cache.py``); a hit is recorded in the session without
+    calling the model, and a reply that needed no tool is stored for the
+    next user with the same profile.
+    """
+    with tracing.trace("turn", kind="intro" if profile is not None else "message"):
+        return _run_agent(runner, session_id, message, user_id, profile, name)
+
+
+def _run_agent(
+    runner: Runner, session_id: str, message: str, user_id: str, profile: dict | None, name: str
+) -> str:
+    response_cache = get_response_cache() if profile is not None else None
+    if response_cache is not None:
+        session = get_agent_loop().run(runner.session_service.get_session(
+            app_name=APP_NAME, user_id=user_id, session_id=session_id,
+        ))
+        if session is None or session.events:
+            response_cache = None
+    if response_cache is not None:
+        personal = {"name": name}
+        model = getattr(runner.agent.model, "model", runner.agent.model)
+        key = response_cache.key(model, runner.agent.instruction, profile, message, personal)
+        reply = response_cache.get(key, personal)
+        if reply is not None:
+            _append_events(runner.session_service, user_id, session_id, [
+                _text_event("user", "user", message),
+                _text_event(runner.agent.name, "model", reply),
+            ])
+            logger.info("response cache hit key=%s %s", key[:12], response_cache.stats())
+            return reply
+
+    metrics: dict = {}
+    chunks = [
+        value for kind, value in stream_agent(runner, session_id, message, metrics, None, user_id)
+        if kind == "text"
+    ]
+    reply = "".join(chunks)
+    if response_cache is not None and reply and not metrics["tools"] and not reply.startswith("Error:"):
+        response_cache.put(key, reply, personal, metrics["total_ms"])
+    return reply or FALLBACK_RESPONSE
+
+
+def _text_event(author: str, role: str, text: str) -> Event:
+    return Event(
+        invocation_id=f"e-{os.urandom(8).hex()}",
+        author=author,
+        content=genai_types.Content(role=role, parts=[genai_types.Part(text=text)]),
+    )
+
+
+def _append_events(session_service, user_id: str, session_id: str, events: list[Event]):
+    """Record turns answered without the model in the ADK session, so follow-ups see them."""
+    async def append():
+        session = await session_service.get_session(
+            app_name=APP_NAME, user_id=user_id, session_id=session_id,
+        )
+        if session is None:
+            return
+        for event in events:
+            await session_service.append_event(session, event)
+
+    get_agent_loop().run(append())
+
+
+def _record_metrics(metrics: dict):
+    history = st.session_state.setdefault("response_metrics", [])
+    history.append(metrics)
+    del history[:-RESPONSE_METRICS_KEPT]
+    logger.info(
+        "agent response ttft_ms=%s total_ms=%s streamed=%s tools=%s context_tokens=%s",
+        metrics["ttft_ms"], metrics["total_ms"], metrics["streamed"],
+        ",".join(f"{t['name']}:{t['ms']:.0f}ms" for t in metrics["tools"]) or "-",
+        _context_summary(metrics.get("context")),
+    )
 
 
-def run_agent(runner: Runner, session_id: str, message: str) -> str:
-    loop = asyncio.get_event_loop()
-    return loop.run_until_complete(_run_agent(runner, session_id, message))
+def _context_summary(report: dict | None) -> str:
+    if not report:
+        return "-"
+    return f"{report['tokens_before']}->{report['tokens_after']} (saved {report['tokens_saved']})"
 
 
 # ── YouTube Embed Helper ─────────────────────────────────────────────────────
 
+YOUTUBE_URL_RE = re.compile(
+    r"(https?://(?:www\.)?(?:youtube\.com/watch\?v=|youtu\.be/)[a-zA-Z0-9_-]{11}[^\s\)]*)"
+)
+VIDEO_ID_RES = [
+    re.compile(r"youtu\.be/([a-zA-Z0-9_-]{11})"),
+    re.compile(r"youtube\.com/watch\?v=([a-zA-Z0-9_-]{11})"),
+    re.compile(r"youtube\.com/embed/([a-zA-Z0-9_-]{11})"),
+]
+
+
 def _extract_video_id(url: str) -> str | None:
-    patterns = [
-        r"youtu\.be/([a-zA-Z0-9_-]{11})",
-        r"youtube\.com/watch\?v=([a-zA-Z0-9_-]{11})",
-        r"youtube\.com/embed/([a-zA-Z0-9_-]{11})",
-    ]
-    for pat in patterns:
-        m = re.search(pat, url)
+    for pattern in VIDEO_ID_RES:
+        m = pattern.search(url)
         if m:
             return m.group(1)
     return None
 
 
-def render_message_with_embeds(text: str):
-    """Render markdown text and convert YouTube URLs into embedded players."""
-    url_pattern = r"(https?://(?:www\.)?(?:youtube\.com/watch\?v=|youtu\.be/)[a-zA-Z0-9_-]{11}[^\s\)]*)"
-    parts = re.split(url_pattern, text)
+def parse_message_embeds(text: str) -> list[tuple[str, str | None]]:
+    """Split a reply into ``(markdown, video_id)`` segments.
 
+    ``video_id`` is set on the segment holding the first mention of each
+    YouTube video, which gets an embedded player after it; it is None
+    everywhere else.
+    """
+    segments = []
     seen_ids = set()
-    for part in parts:
+    for part in YOUTUBE_URL_RE.split(text):
         vid = _extract_video_id(part)
         if vid and vid not in seen_ids:
             seen_ids.add(vid)
-            st.markdown(part)
+            segments.append((part, vid))
+        else:
+            segments.append((part, None))
+    return segments
+
+
+@tracing.traced("render.message_with_embeds")
+def render_message_with_embeds(text: str):
+    """Render markdown text and convert YouTube URLs into embedded players."""
+    for part, vid in parse_message_embeds(text):
+        st.markdown(part)
+        if vid:
             st.markdown(
                 f'<iframe class="yt-embed" width="100%" height="315" '
                 f'src="https://www.youtube.com/embed/{vid}" '
@@ -252,8 +512,6 @@ def render_message_with_embeds(text: str):
                 f'allowfullscreen></iframe>',
                 unsafe_allow_html=True,
             )
-        else:
-            st.markdown(part)
 
 
 # ── Sidebar ──────────────────────────────────────────────────────────────────
@@ -301,6 +559,7 @@ def render_sidebar():
                 st.session_state["profile_days"] = workout_days
                 st.session_state["profile_equipment"] = equipment
                 st.session_state["profile_saved"] = True
+                get_prefetcher().submit(get_or_create_session(get_runner()), profile_tool_args())
                 log_weight(weight)
                 log_session()
                 st.rerun()
@@ -341,29 +600,43 @@ def render_sidebar():
 def get_profile_summary() -> str | None:
     if not st.session_state.get("profile_saved"):
         return None
+    return format_profile_summary(st.session_state["profile_name"], profile_tool_args())
 
-    goal_map = {"Fat Loss": "fat_loss", "Weight Gain": "weight_gain",
-                "Muscle Building": "muscle_building", "Health Maintenance": "health_maintenance"}
-    diet_map = {"Vegetarian": "vegetarian", "Non-Vegetarian": "non_vegetarian",
-                "Vegan": "vegan", "Eggetarian": "eggetarian"}
-    cuisine_map = {"Indian": "indian", "Western": "western", "Flexible": "flexible"}
-    equip_map = {"None (Home only)": "none", "Basic (Dumbbells, Bands)": "basic", "Full Gym": "full_gym"}
 
+def format_profile_summary(name: str, args: dict) -> str:
+    """The profile line sent to the model, from the name and ``profile_tool_args()``."""
     return (
-        f"My profile: Name={st.session_state['profile_name']}, "
-        f"Age={st.session_state['profile_age']}, "
-        f"Weight={st.session_state['profile_weight']}kg, "
-        f"Height={st.session_state['profile_height']}cm, "
-        f"Gender={st.session_state['profile_gender']}, "
-        f"Goal={goal_map.get(st.session_state['profile_goal'], 'health_maintenance')}, "
-        f"Fitness Level={st.session_state['profile_fitness_level'].lower()}, "
-        f"Diet Preference={diet_map.get(st.session_state['profile_diet_pref'], 'vegetarian')}, "
-        f"Cuisine={cuisine_map.get(st.session_state['profile_cuisine_pref'], 'indian')}, "
-        f"Workout Days/Week={st.session_state['profile_days']}, "
-        f"Equipment={equip_map.get(st.session_state['profile_equipment'], 'none')}."
+        f"My profile: Name={name}, "
+        f"Age={args['age']}, "
+        f"Weight={args['weight_kg']}kg, "
+        f"Height={args['height_cm']}cm, "
+        f"Gender={args['gender']}, "
+        f"Goal={args['goal']}, "
+        f"Fitness Level={args['fitness_level']}, "
+        f"Diet Preference={args['diet_preference']}, "
+        f"Cuisine={args['cuisine_preference']}, "
+        f"Workout Days/Week={args['workout_days_per_week']}, "
+        f"Equipment={args['equipment_access']}."
     )
 
 
+def profile_tool_args() -> dict:
+    """The saved profile as tool argument values, keyed by tool parameter name."""
+    p = st.session_state
+    return {
+        "goal": GOAL_MAP.get(p["profile_goal"], "health_maintenance"),
+        "fitness_level": p["profile_fitness_level"].lower(),
+        "equipment_access": EQUIP_MAP.get(p["profile_equipment"], "none"),
+        "workout_days_per_week": p["profile_days"],
+        "weight_kg": p["profile_weight"],
+        "height_cm": p["profile_height"],
+        "age": p["profile_age"],
+        "gender": p.get("profile_gender", "male"),
+        "diet_preference": DIET_MAP.get(p["profile_diet_pref"], "vegetarian"),
+        "cuisine_preference": CUISINE_MAP.get(p["profile_cuisine_pref"], "indian"),
+    }
+
+
 # ── Stats Dashboard ──────────────────────────────────────────────────────────
 
 def render_stats_dashboard():
@@ -372,21 +645,18 @@ def render_stats_dashboard():
 
     p = st.session_state
     bmi = calculate_bmi(p["profile_weight"], p["profile_height"])
-    streak = get_streak()
-    weight_hist = get_weight_history()
+    aggregates = get_history_aggregates()
 
-    goal_map = {"Fat Loss": "fat_loss", "Weight Gain": "weight_gain",
-                "Muscle Building": "muscle_building", "Health Maintenance": "health_maintenance"}
     tdee = calculate_tdee(
         p["profile_weight"], p["profile_height"], p["profile_age"],
-        p["profile_days"], goal_map.get(p["profile_goal"], "health_maintenance"),
+        p["profile_days"], GOAL_MAP.get(p["profile_goal"], "health_maintenance"),
         p.get("profile_gender", "male"),
     )
-    macros = calculate_macros(tdee["target_calories"], goal_map.get(p["profile_goal"], "health_maintenance"))
+    macros = calculate_macros(tdee["target_calories"], GOAL_MAP.get(p["profile_goal"], "health_maintenance"))
 
     weight_delta = ""
-    if len(weight_hist) >= 2:
-        diff = weight_hist[-1]["weight"] - weight_hist[0]["weight"]
+    if aggregates["weight_delta"] is not None:
+        diff = aggregates["weight_delta"]
         arrow = "↓" if diff < 0 else "↑" if diff > 0 else "→"
         weight_delta = f"<br><span style='font-size:0.7rem;opacity:0.8'>{arrow} {abs(diff):.1f}kg total</span>"
 
@@ -405,7 +675,7 @@ def render_stats_dashboard():
             <div class="stat-label">Protein Target</div>
         </div>
         <div class="stat-card">
-            <div class="stat-value">{streak}</div>
+            <div class="stat-value">{aggregates['current_streak']}</div>
             <div class="stat-label">Day Streak 🔥</div>
         </div>
         <div class="stat-card">
@@ -416,13 +686,62 @@ def render_stats_dashboard():
     """, unsafe_allow_html=True)
 
 
+# ── Developer Trace Panel ────────────────────────────────────────────────────
+
+def trace_rows(spans: list[dict]) -> list[tuple[int, dict]]:
+    """``(depth, span)`` pairs, each span followed by its children in start order."""
+    children: dict[str | None, list[dict]] = {}
+    for span in sorted(spans, key=lambda s: s["start_ms"]):
+        children.setdefault(span["parent_id"], []).append(span)
+    rows: list[tuple[int, dict]] = []
+
+    def walk(parent_id: str | None, depth: int):
+        for span in children.get(parent_id, []):
+            rows.append((depth, span))
+            walk(span["span_id"], depth + 1)
+
+    walk(None, 0)
+    return rows
+
+
+def render_trace_panel(trace_id: str | None):
+    """Waterfall of the last turn's spans (``TRACE_PANEL=1``), read from the in-memory trace exporter."""
+    spans = tracing.memory_exporter().get(trace_id) if trace_id else None
+    with st.expander("Developer: last turn trace"):
+        if not spans:
+            st.caption("No traced turn yet.")
+            return
+        total = max(s["start_ms"] + s["duration_ms"] for s in spans) or 1.0
+        summary = " · ".join(f"{c} {ms:.0f} ms" for c, ms in tracing.breakdown(spans).items() if ms)
+        st.caption(f"{total:.0f} ms — {summary}")
+        rows = []
+        for depth, span in trace_rows(spans):
+            label = span["name"] + (f" {span['attrs']['tool']}" if "tool" in span["attrs"] else "")
+            if "error" in span["attrs"]:
+                label += f" ({span['attrs']['error']})"
+            category = span["name"].split(".", 1)[0]
+            left = span["start_ms"] / total * 100
+            width = span["duration_ms"] / total * 100
+            rows.append(
+                f'<div class="trace-row"><span class="trace-label" style="padding-left:{depth * 0.8}rem">'
+                f'{html.escape(label)}</span><div class="trace-track"><div class="trace-bar trace-{category}" '
+                f'style="left:{left:.2f}%;width:{width:.2f}%"></div></div>'
+                f'<span class="trace-ms">{span["duration_ms"]:.1f} ms</span></div>'
+            )
+        st.markdown("".join(rows), unsafe_allow_html=True)
+
+
 # ── Main Chat Area ──────────────────────────────────────────────────────────
 
 def render_chat():
     inject_css()
 
+    if TRACE_PANEL:
+        tracing.memory_exporter()
+
     api_key = os.environ.get("GOOGLE_API_KEY")
-    if not api_key or api_key == "your_google_api_key_here":
+    offline = os.environ.get("GEMINI_MODEL", "").startswith("offline/")
+    if not offline and (not api_key or api_key == "your_google_api_key_here"):
         st.error("Please set your `GOOGLE_API_KEY` in `fitness_agent/.env` to get started.")
         st.code("echo 'GOOGLE_API_KEY=your_key' > fitness_agent/.env", language="bash")
         st.stop()
@@ -470,11 +789,15 @@ def render_chat():
 
         profile_summary = get_profile_summary()
         if profile_summary:
-            intro_msg = profile_summary + " Please greet me by name and briefly tell me what you can help with."
+            intro_msg = profile_summary + INTRO_REQUEST
             with st.status("Setting up your coach...", expanded=True) as status:
                 st.write("Analyzing your profile...")
-                response = run_agent(runner, session_id, intro_msg)
+                response = run_agent(
+                    runner, session_id, intro_msg, _user_id(),
+                    profile=profile_tool_args(), name=st.session_state["profile_name"],
+                )
                 status.update(label="Ready!", state="complete", expanded=False)
+            st.session_state["last_trace_id"] = tracing.last_trace_id()
             st.session_state["messages"].append({"role": "assistant", "content": response})
 
     for msg in st.session_state["messages"]:
@@ -484,20 +807,20 @@ def render_chat():
             else:
                 st.markdown(msg["content"])
 
-    is_thinking = st.session_state.get("pending_prompt") is not None
+    if TRACE_PANEL:
+        render_trace_panel(st.session_state.get("last_trace_id"))
+
+    is_thinking = (
+        st.session_state.get("pending_prompt") is not None
+        or st.session_state.get("pending_action") is not None
+    )
 
-    # Quick action buttons
+    # Quick action buttons -- answered from the tools directly, see quick_actions.py
     if st.session_state.get("profile_saved") and len(st.session_state["messages"]) <= 1 and not is_thinking:
-        cols = st.columns(4)
-        actions = [
-            ("🏋️ Workout Plan", "Give me a complete workout plan based on my profile."),
-            ("🥗 Diet Plan", "Give me a complete diet plan based on my profile."),
-            ("📺 Videos", "Recommend YouTube videos for my goal."),
-            ("📋 Everything", "Give me a workout plan, diet plan, and YouTube video recommendations based on my profile."),
-        ]
-        for col, (label, prompt) in zip(cols, actions):
+        cols = st.columns(len(QUICK_ACTIONS))
+        for col, (action, (label, _, _)) in zip(cols, QUICK_ACTIONS.items()):
             if col.button(label, use_container_width=True):
-                st.session_state["pending_prompt"] = prompt
+                st.session_state["pending_action"] = action
                 st.rerun()
 
     # Chat input -- disabled while processing
@@ -511,13 +834,18 @@ def render_chat():
 
     # Phase 2: Process pending prompt (runs after rerun with input disabled)
     if is_thinking:
-        prompt = st.session_state.pop("pending_prompt")
-        _handle_prompt(runner, session_id, prompt)
+        action = st.session_state.pop("pending_action", None)
+        with tracing.trace("turn", kind="prompt" if action is None else "quick_action", session_id=session_id):
+            if action is not None:
+                _handle_quick_action(session_id, action)
+            else:
+                _handle_prompt(runner, session_id, st.session_state.pop("pending_prompt"))
+        st.session_state["last_trace_id"] = tracing.last_trace_id()
         st.rerun()
 
 
 def _handle_prompt(runner: Runner, session_id: str, prompt: str):
-    """Render user message, show spinner, get response -- saves to session state."""
+    """Render user message, stream the response with tool progress -- saves to session state."""
     st.session_state["messages"].append({"role": "user", "content": prompt})
     with st.chat_message("user"):
         st.markdown(prompt)
@@ -529,14 +857,58 @@ def _handle_prompt(runner: Runner, session_id: str, prompt: str):
     full_message = profile_context + prompt
 
     with st.chat_message("assistant"):
-        with st.spinner("FitCoach is thinking..."):
-            response = run_agent(runner, session_id, full_message)
-        render_message_with_embeds(response)
+        status = st.empty()
+        body = st.empty()
+        metrics: dict = {}
+        status.caption("FitCoach is thinking...")
+
+        def text_chunks() -> Iterator[str]:
+            for kind, value in stream_agent(runner, session_id, full_message, metrics, user_id=_user_id()):
+                if kind == "tool":
+                    status.caption(TOOL_PROGRESS.get(value, "Working on it..."))
+                else:
+                    status.empty()
+                    yield value
+
+        with body.container():
+            response = st.write_stream(text_chunks())
+        status.empty()
+        if not isinstance(response, str) or not response:
+            response = FALLBACK_RESPONSE
+        # Re-render the finished text so YouTube links become embedded players.
+        with body.container():
+            render_message_with_embeds(response)
+    _record_metrics(metrics)
 
     st.session_state["messages"].append({"role": "assistant", "content": response})
     log_session()
 
 
+def _handle_quick_action(session_id: str, action: str):
+    """Answer a quick-action button from the tools -- no model call -- and record the turn in the ADK session."""
+    answer = run_quick_action(action, profile_tool_args(), owner=session_id)
+    prompt = answer["prompt"]
+    st.session_state["messages"].append({"role": "user", "content": prompt})
+    with st.chat_message("user"):
+        st.markdown(prompt)
+
+    profile_context = ""
+    if len(st.session_state["messages"]) <= 2:
+        profile_context = get_profile_summary() + "\n\nUser request: "
+
+    with st.chat_message("assistant"):
+        render_message_with_embeds(answer["markdown"])
+
+    # Follow-up questions go to the model, which needs to see what was answered.
+    _append_events(
+        get_runner().session_service, _user_id(), session_id,
+        session_events(root_agent.name, profile_context + prompt, answer),
+    )
+
+    st.session_state["messages"].append({"role": "assistant", "content": answer["markdown"]})
+    log_session()
+
+
 # ── Entry Point ──────────────────────────────────────────────────────────────
 
 def main():
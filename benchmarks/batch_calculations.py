@@ -0,0 +1,85 @@
+"""Benchmark the NumPy batch calculations against the scalar functions.
+
+Usage (from the repository root):
+
+    python -m benchmarks.batch_calculations [--rows 1000000] [--verify-rows 100000]
+
+The batch path is timed on all ``--rows`` rows. The scalar path is timed on
+``--verify-rows`` rows, and its per-row cost is extrapolated to the full size.
+Every row in that sample is also checked field by field against the batch
+output.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from fitness_agent.utils.batch_calculations import batch_profile_metrics
+from fitness_agent.utils.calculations import (
+    GOAL_CALORIE_ADJUSTMENTS,
+    calculate_bmi,
+    calculate_macros,
+    calculate_tdee,
+)
+
+
+def _population(rows: int, seed: int = 7) -> dict:
+    rng = np.random.default_rng(seed)
+    return {
+        "weight_kg": np.round(rng.uniform(30, 200, rows) * 2) / 2,
+        "height_cm": np.round(rng.uniform(100, 220, rows) * 2) / 2,
+        "age": rng.integers(14, 81, rows),
+        "gender": rng.choice(["male", "female"], rows),
+        "workout_days": rng.integers(3, 7, rows),
+        "goal": rng.choice(list(GOAL_CALORIE_ADJUSTMENTS), rows),
+    }
+
+
+def _scalar(cols: dict, i: int) -> dict:
+    w, h = float(cols["weight_kg"][i]), float(cols["height_cm"][i])
+    age, days = int(cols["age"][i]), int(cols["workout_days"][i])
+    goal, gender = str(cols["goal"][i]), str(cols["gender"][i])
+    bmi = calculate_bmi(w, h)
+    tdee = calculate_tdee(w, h, age, days, goal, gender)
+    macros = calculate_macros(tdee["target_calories"], goal)
+    split = macros.pop("split_percentages")
+    return {
+        **bmi, **tdee, **macros,
+        "protein_pct": split["protein"], "carbs_pct": split["carbs"], "fat_pct": split["fat"],
+    }
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--verify-rows", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    cols = _population(args.rows)
+    started = time.perf_counter()
+    batch = batch_profile_metrics(
+        cols["weight_kg"], cols["height_cm"], cols["age"],
+        cols["gender"], cols["workout_days"], cols["goal"],
+    )
+    batch_s = time.perf_counter() - started
+
+    sample = min(args.verify_rows, args.rows)
+    started = time.perf_counter()
+    expected = [_scalar(cols, i) for i in range(sample)]
+    scalar_s = (time.perf_counter() - started) * args.rows / sample
+
+    mismatches = 0
+    for i, row in enumerate(expected):
+        got = batch[i]
+        if any(got[name].item() != value for name, value in row.items()):
+            mismatches += 1
+    print(f"batch : {args.rows:>9,} rows in {batch_s * 1000:8.1f} ms")
+    print(f"scalar: {args.rows:>9,} rows in {scalar_s * 1000:8.1f} ms (extrapolated from {sample:,})")
+    print(f"speedup {scalar_s / batch_s:.1f}x; {mismatches} mismatches in {sample:,} verified rows")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Compare catalog cold-start time: compiled artifact vs. JSON sources.
+
+Usage (from the repository root):
+
+    python -m benchmarks.catalog_cold_start [--runs 15]
+
+Each sample runs in a fresh interpreter so nothing is warm in-process; only
+the catalog construction itself is timed, not interpreter or package import.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from fitness_agent.utils.catalog import DATA_DIR, load_shards, write_artifact
+
+_SAMPLE = """
+import json, sys, time
+from pathlib import Path
+from fitness_agent.utils.catalog import CatalogManager
+artifact = Path(sys.argv[1]) if sys.argv[1] else None
+started = time.perf_counter()
+manager = CatalogManager(artifact_path=artifact)
+elapsed = time.perf_counter() - started
+print(json.dumps({"source": manager.source, "ms": elapsed * 1000}))
+"""
+
+
+def _sample(artifact: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", _SAMPLE, artifact],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=15)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        artifact = Path(tmp) / "catalog.pkl"
+        write_artifact(load_shards(DATA_DIR), artifact)
+
+        results = {}
+        for label, path in (("json", ""), ("artifact", str(artifact))):
+            samples = [_sample(path) for _ in range(args.runs)]
+            sources = {s["source"] for s in samples}
+            assert sources == {label}, f"expected {label} path, got {sources}"
+            times = [s["ms"] for s in samples]
+            results[label] = {
+                "median_ms": statistics.median(times),
+                "min_ms": min(times),
+                "max_ms": max(times),
+            }
+
+    for label, r in results.items():
+        print(
+            f"{label:>8}: median {r['median_ms']:7.2f} ms  "
+            f"(min {r['min_ms']:.2f}, max {r['max_ms']:.2f}, n={args.runs})"
+        )
+    speedup = results["json"]["median_ms"] / results["artifact"]["median_ms"]
+    print(f" speedup: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Compare full and compact tool output sizes across every catalog profile.
+
+Usage (from the repository root):
+
+    python -m benchmarks.compact_output [--budget 1500] [--prefill-tok-s 2000]
+
+For each tool, every valid argument combination is run once and its result is
+sized with ``estimate_tokens`` in full form and in compact form under
+``--budget``. Every compact result that dropped nothing is checked to
+``expand`` back to the full one. The latency saved is an estimate: the tokens
+saved divided by ``--prefill-tok-s``, the model's assumed input processing
+rate, minus the measured time spent compacting.
+"""
+
+import argparse
+import itertools
+import time
+
+from fitness_agent.tools import get_diet_plan, get_workout_plan, get_youtube_recommendations
+from fitness_agent.utils.catalog import (
+    CUISINES,
+    DIET_PREFERENCES,
+    EQUIPMENT_OPTIONS,
+    FITNESS_LEVELS,
+    WORKOUT_DAYS,
+    get_catalog,
+)
+from fitness_agent.utils.compact import compact, estimate_tokens, expand
+
+
+def _calls() -> dict[str, list]:
+    goals = sorted(get_catalog().videos_by_goal)
+    return {
+        "get_workout_plan": [
+            lambda a=args: get_workout_plan(*a)
+            for args in itertools.product(goals, FITNESS_LEVELS, EQUIPMENT_OPTIONS, WORKOUT_DAYS)
+        ],
+        "get_diet_plan": [
+            lambda g=g, d=d, c=c: get_diet_plan(g, 72.5, 172, 29, d, c, 4)
+            for g, d, c in itertools.product(goals, DIET_PREFERENCES, CUISINES)
+        ],
+        "get_youtube_recommendations": [
+            lambda a=args: get_youtube_recommendations(*a)
+            for args in itertools.product(goals, FITNESS_LEVELS, ("workout", "diet", "both"))
+        ],
+    }
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", type=int, default=1500)
+    parser.add_argument("--prefill-tok-s", type=float, default=2000.0)
+    args = parser.parse_args(argv)
+
+    failures = 0
+    print(f"{'tool':<28}{'calls':>6}{'full tok':>10}{'compact':>9}{'saved':>8}"
+          f"{'max':>6}{'dropped':>8}{'encode ms':>10}{'est. saved ms':>14}")
+    for tool, calls in _calls().items():
+        full_tokens = compact_tokens = largest = dropped = 0
+        encode_s = 0.0
+        for call in calls:
+            result = call()
+            if "error" in result:
+                continue
+            started = time.perf_counter()
+            packed = compact(result, args.budget)
+            encode_s += time.perf_counter() - started
+            full_tokens += estimate_tokens(result)
+            size = estimate_tokens(packed)
+            compact_tokens += size
+            largest = max(largest, size)
+            if "_dropped" in packed or "_truncated" in packed:
+                dropped += 1
+            elif expand(packed) != result:
+                failures += 1
+        n = len(calls)
+        saved = full_tokens - compact_tokens
+        saved_ms = (saved / args.prefill_tok_s - encode_s) * 1000 / n
+        print(f"{tool:<28}{n:>6}{full_tokens / n:>10.0f}{compact_tokens / n:>9.0f}"
+              f"{saved / full_tokens:>8.0%}{largest:>6}{dropped:>8}"
+              f"{encode_s * 1000 / n:>10.3f}{saved_ms:>14.1f}")
+    print("token counts are per call (mean) except max; est. saved ms assumes "
+          f"{args.prefill_tok_s:.0f} prefill tokens/s")
+    if failures:
+        print(f"{failures} compact results did not expand back to the full result")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
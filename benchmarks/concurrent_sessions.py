@@ -0,0 +1,124 @@
+"""Run many chat sessions at once through the background agent loop.
+
+Usage (from the repository root):
+
+    python -m benchmarks.concurrent_sessions [--sessions 50] [--tokens 100] [--token-ms 4] [--think-ms 300]
+
+Each session gets its own thread, as Streamlit gives each browser session its
+own script thread, and runs one turn through ``app.stream_agent`` against the
+stub model from ``benchmarks.streaming_ttft`` (a real ``get_workout_plan``
+call, then a streamed reply). All turns share one runner and one session
+service. The run passes when every session receives its tool call and the
+complete reply, and the wall time stays well below running the turns one
+after another (estimated from one turn run alone). Two more checks cover the
+submission API: a turn that exceeds its timeout is cancelled, and so is one
+whose reader stops early. The script exits with status 1 if any check fails.
+"""
+
+import argparse
+import statistics
+import threading
+import time
+
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+
+import app
+from agent_loop import get_agent_loop
+from benchmarks.streaming_ttft import StubLlm
+from fitness_agent.agent import root_agent
+
+
+def _turn(runner: Runner, service: InMemorySessionService, session_id: str, timeout: float | None = None) -> dict:
+    loop = get_agent_loop()
+    loop.run(service.create_session(app_name=app.APP_NAME, user_id=app.USER_ID, session_id=session_id))
+    metrics: dict = {}
+    if timeout is None:
+        items = list(app.stream_agent(runner, session_id, "Plan please", metrics))
+    else:
+        events = app._agent_events(runner, session_id, "Plan please", metrics, app.STREAMING_RUN_CONFIG)
+        items = list(loop.stream(events, timeout=timeout))
+    return {
+        "calls": [value for kind, value in items if kind == "tool"],
+        "text": "".join(value for kind, value in items if kind == "text"),
+        **metrics,
+    }
+
+
+def _wait_for_cancel(loop, cancelled: int) -> bool:
+    deadline = time.monotonic() + 2
+    while loop.stats()["cancelled"] <= cancelled and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return loop.stats()["cancelled"] > cancelled
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--tokens", type=int, default=100)
+    parser.add_argument("--token-ms", type=float, default=4.0)
+    parser.add_argument("--think-ms", type=float, default=300.0)
+    args = parser.parse_args(argv)
+
+    model = StubLlm(tokens=args.tokens, token_ms=args.token_ms, think_ms=args.think_ms)
+    service = InMemorySessionService()
+    runner = Runner(agent=root_agent.clone(update={"model": model}), app_name=app.APP_NAME, session_service=service)
+    expected_text = "".join(f"word{i} " for i in range(args.tokens))
+    loop = get_agent_loop()
+
+    results: dict[int, dict | BaseException] = {}
+
+    def session(i: int):
+        try:
+            results[i] = _turn(runner, service, f"concurrent_{i}")
+        except BaseException as e:
+            results[i] = e
+
+    _turn(runner, service, "warmup")
+    solo = _turn(runner, service, "solo")["total_ms"] / 1000
+    started = time.perf_counter()
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(args.sessions)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+
+    errors = [r for r in results.values() if isinstance(r, BaseException)]
+    turns = [r for r in results.values() if isinstance(r, dict)]
+    complete = sum(r["calls"] == ["get_workout_plan"] and r["text"] == expected_text for r in turns)
+    serial = solo * args.sessions
+    print(f"{args.sessions} concurrent sessions")
+    print(f"  complete turns {complete}/{args.sessions}, errors {len(errors)}")
+    print(f"  wall {wall:.2f} s vs {serial:.2f} s for {args.sessions} turns of {solo * 1000:.0f} ms run one by one"
+          f" ({serial / wall:.1f}x)")
+    print(f"  per turn: ttft median {statistics.median(r['ttft_ms'] for r in turns):.0f} ms, "
+          f"total median {statistics.median(r['total_ms'] for r in turns):.0f} ms, "
+          f"max {max(r['total_ms'] for r in turns):.0f} ms")
+    for e in errors[:3]:
+        print(f"    {type(e).__name__}: {e}")
+    ok = complete == args.sessions and serial / wall > args.sessions / 5
+
+    cancelled = loop.stats()["cancelled"]
+    try:
+        _turn(runner, service, "timeout", timeout=args.think_ms / 2000)
+        timed_out = False
+    except TimeoutError:
+        timed_out = _wait_for_cancel(loop, cancelled)
+    print(f"  turn past its timeout cancelled: {timed_out}")
+
+    cancelled = loop.stats()["cancelled"]
+    loop.run(service.create_session(app_name=app.APP_NAME, user_id=app.USER_ID, session_id="abandoned"))
+    reader = app.stream_agent(runner, "abandoned", "Plan please", {})
+    next(reader)
+    reader.close()
+    abandoned = _wait_for_cancel(loop, cancelled)
+    print(f"  turn abandoned by its reader cancelled: {abandoned}")
+    print(f"  loop {loop.stats()}")
+
+    if not (ok and timed_out and abandoned):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
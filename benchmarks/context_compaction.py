@@ -0,0 +1,142 @@
+"""Request size of a long conversation with and without context compaction.
+
+Usage (from the repository root):
+
+    python -m benchmarks.context_compaction [--turns 20] [--budget 6000] [--keep-turns 2]
+
+Runs ``--turns`` turns through ``app.stream_agent`` against a stub model that
+asks for a plan every turn, cycling through the three real tools (workout,
+diet, videos) so the session fills with real tool results, then replies. The
+first message carries the profile, as the chat UI sends it. The conversation
+runs once with compaction off (``CONTEXT_TOKEN_BUDGET=0``) and once with
+``--budget``, printing the estimated request tokens per turn as reported in
+the turn's metrics. The script exits with status 1 if a compacted request
+stays over budget, loses the profile, drops the latest turns or leaves a
+tool call without its response.
+"""
+
+import argparse
+import os
+from collections.abc import AsyncGenerator
+
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types as genai_types
+
+import app
+from agent_loop import get_agent_loop
+from benchmarks.streaming_ttft import StubLlm
+from fitness_agent.agent import root_agent
+
+PROFILE = (
+    "My profile: Name=Asha, Age=29, Weight=68.0kg, Height=165.0cm, Gender=female, Goal=fat_loss, "
+    "Fitness Level=beginner, Diet Preference=vegetarian, Cuisine=indian, Workout Days/Week=4, Equipment=basic."
+)
+CALLS = [
+    ("get_workout_plan", {"goal": "fat_loss", "fitness_level": "beginner",
+                          "equipment_access": "basic", "workout_days_per_week": 4}),
+    ("get_diet_plan", {"goal": "fat_loss", "weight_kg": 68.0, "height_cm": 165.0, "age": 29,
+                       "diet_preference": "vegetarian", "cuisine_preference": "indian",
+                       "workout_days_per_week": 4, "gender": "female"}),
+    ("get_youtube_recommendations", {"goal": "fat_loss", "fitness_level": "beginner"}),
+]
+
+
+class PlanningLlm(StubLlm):
+    """Calls the next tool for every user message, then replies; keeps the last request."""
+
+    think_ms: float = 0.0
+    token_ms: float = 0.0
+    tokens: int = 120
+    calls: int = 0
+    last_request: LlmRequest | None = None
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self.last_request = llm_request
+        if not any(p.function_response for p in llm_request.contents[-1].parts or []):
+            name, args = CALLS[self.calls % len(CALLS)]
+            self.calls += 1
+            call = genai_types.FunctionCall(name=name, args=args)
+            yield LlmResponse(
+                content=genai_types.Content(role="model", parts=[genai_types.Part(function_call=call)]),
+                usage_metadata=genai_types.GenerateContentResponseUsageMetadata(
+                    candidates_token_count=1, total_token_count=1
+                ),
+            )
+            return
+        async for response in super().generate_content_async(llm_request, stream):
+            yield response
+
+
+def _conversation(turns: int, budget: int, keep_turns: int) -> tuple[list[dict], PlanningLlm, list[str]]:
+    os.environ["CONTEXT_TOKEN_BUDGET"] = str(budget)
+    os.environ["CONTEXT_KEEP_TURNS"] = str(keep_turns)
+    model = PlanningLlm()
+    service = InMemorySessionService()
+    runner = Runner(agent=root_agent.clone(update={"model": model}), app_name=app.APP_NAME, session_service=service)
+    session_id = f"long_{budget}"
+    get_agent_loop().run(service.create_session(app_name=app.APP_NAME, user_id=app.USER_ID, session_id=session_id))
+    reports, problems = [], []
+    for t in range(turns):
+        message = f"Request {t + 1}: show me that plan again with a tweak"
+        if t == 0:
+            message = f"{PROFILE}\n\nUser request: {message}"
+        metrics: dict = {}
+        for _ in app.stream_agent(runner, session_id, message, metrics):
+            pass
+        reports.append(metrics["context"])
+        problems += _check(model.last_request, message, budget, keep_turns, t + 1)
+    return reports, model, problems
+
+
+def _check(request: LlmRequest, message: str, budget: int, keep_turns: int, turn: int) -> list[str]:
+    problems = []
+    texts = [p.text for c in request.contents for p in c.parts or [] if p.text]
+    calls = {p.function_call.id for c in request.contents for p in c.parts or [] if p.function_call}
+    responses = {p.function_response.id for c in request.contents for p in c.parts or [] if p.function_response}
+    if not any(PROFILE in text for text in texts):
+        problems.append(f"turn {turn}: profile missing")
+    if message not in texts:
+        problems.append(f"turn {turn}: latest message missing")
+    if calls != responses:
+        problems.append(f"turn {turn}: {len(calls - responses)} tool calls without a response")
+    kept = sum(1 for c in request.contents if c.role == "user" and any(p.text for p in c.parts or []))
+    if kept < min(turn, keep_turns):
+        problems.append(f"turn {turn}: only {kept} turns kept")
+    return problems
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--budget", type=int, default=6000)
+    parser.add_argument("--keep-turns", type=int, default=2)
+    args = parser.parse_args(argv)
+
+    full, _, _ = _conversation(args.turns, 0, args.keep_turns)
+    compacted, model, problems = _conversation(args.turns, args.budget, args.keep_turns)
+    print(f"{args.turns} turns, budget {args.budget:,} tokens, last {args.keep_turns} turns kept in full")
+    print(f"  {'turn':>4} {'uncompacted':>12} {'compacted':>10} {'saved':>7}  (tokens per model call; saved per turn)")
+    for t, (before, after) in enumerate(zip(full, compacted), 1):
+        print(f"  {t:>4} {before['tokens_before'] // before['calls']:>12,} "
+              f"{after['tokens_after'] // after['calls']:>10,} {after['tokens_saved']:>7,}")
+        if after["tokens_after"] > args.budget * after["calls"]:
+            problems.append(f"turn {t}: over budget")
+    saved = sum(r["tokens_saved"] for r in compacted)
+    sent = sum(r["tokens_before"] for r in compacted)
+    print(f"  tokens sent over the conversation: {sent - saved:,} instead of {sent:,} ({saved / sent:.0%} saved)")
+    print("  final request opens with:")
+    for line in model.last_request.contents[0].parts[0].text.splitlines()[:4]:
+        print(f"    {line[:110]}")
+    for problem in problems:
+        print(f"  FAIL {problem}")
+    if problems:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Count history database loads per Streamlit rerun of app.py.
+
+Usage (from the repository root):
+
+    python -m benchmarks.history_reads_per_rerun [--reruns 5]
+
+Drives the app headlessly with Streamlit's ``AppTest`` against a temporary
+history database: the first run, ``--reruns`` idle reruns, a profile save
+(which logs a weigh-in and a session, then reruns), idle reruns again, and a
+second save of the same profile on the same day. For each step
+it prints the writes made and the history loads (database reads) and cache hits
+(served from memory). The script exits with status 1 if any rerun loads the
+history more than once, or an idle rerun loads it at all.
+"""
+
+import argparse
+import os
+import tempfile
+from pathlib import Path
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["HISTORY_DB_PATH"] = str(Path(tmp) / "history.db")
+        os.environ.setdefault("GOOGLE_API_KEY", "unused")
+
+        from streamlit.testing.v1 import AppTest
+
+        from history_store import get_history_store
+
+        at = AppTest.from_file(str(Path("app.py").resolve()), default_timeout=60)
+        store = get_history_store()
+        failed = False
+
+        def step(label: str, action, idle: bool):
+            nonlocal failed
+            before = store.stats()
+            action()
+            if at.exception:
+                raise SystemExit(f"{label}: app raised {at.exception[0].value}")
+            after = store.stats()
+            loads = after["loads"] - before["loads"]
+            hits = after["hits"] - before["hits"]
+            writes = after["writes"] - before["writes"]
+            ok = loads <= (0 if idle else 1)
+            failed |= not ok
+            print(f"{label:<18} writes {writes}  loads {loads}  hits {hits:>2}  {'ok' if ok else 'FAIL'}")
+
+        def save_profile():
+            at.text_input(key="inp_name").input("Bench")
+            next(b for b in at.button if b.label == "Save Profile").click().run()
+
+        step("first run", at.run, idle=False)
+        for i in range(args.reruns):
+            step(f"idle rerun {i + 1}", at.run, idle=True)
+        step("save profile", save_profile, idle=False)
+        for i in range(args.reruns):
+            step(f"idle rerun {i + 1}", at.run, idle=True)
+        step("save again", save_profile, idle=False)
+        step("idle rerun", at.run, idle=True)
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
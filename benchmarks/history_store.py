@@ -0,0 +1,180 @@
+"""Benchmark and stress-test the history store against the legacy JSON file.
+
+Usage (from the repository root):
+
+    python -m benchmarks.history_store [--entries 100000] [--threads 32] [--writes 200]
+
+Scale: both backends are seeded with ``--entries`` log entries, then the cost
+of one more write, of reading a user's history and of the dashboard figures
+(streak and weight delta) is measured. Each store dashboard sample follows a
+write, so the aggregates are always read from the database. The legacy
+path reproduces the old ``app.py`` code: load the whole JSON file, append,
+rewrite it with ``indent=2``.
+
+Concurrency: ``--threads`` writer threads each log ``--writes`` distinct
+session days and weigh-ins, half to their own user and half to one shared
+user. Afterwards every write must be readable. The legacy path runs the same
+workload for comparison and usually loses writes. The store must lose none,
+otherwise the script exits with status 1.
+"""
+
+import argparse
+import json
+import statistics
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from history_store import HistoryStore
+
+_EPOCH = date(2000, 1, 1)
+
+
+def _day(n: int) -> str:
+    return (_EPOCH + timedelta(days=n)).isoformat()
+
+
+def _legacy_load(path: Path) -> dict:
+    if path.exists():
+        with open(path) as f:
+            return json.load(f)
+    return {"sessions": [], "workout_log": [], "weight_log": []}
+
+
+def _legacy_log_session(path: Path, day: str):
+    history = _legacy_load(path)
+    if day not in history["sessions"]:
+        history["sessions"].append(day)
+    with open(path, "w") as f:
+        json.dump(history, f, indent=2)
+
+
+def _seed_history(entries: int) -> dict:
+    half = entries // 2
+    return {
+        "sessions": [_day(i) for i in range(half)],
+        "workout_log": [],
+        "weight_log": [{"date": _day(i), "weight": 70 + i % 10 / 10} for i in range(entries - half)],
+    }
+
+
+def _ms(samples: list[float]) -> str:
+    return f"median {statistics.median(samples) * 1000:8.3f} ms, max {max(samples) * 1000:8.3f} ms"
+
+
+def _timed(fn, runs: int) -> list[float]:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def scale(tmp: Path, entries: int, runs: int):
+    history = _seed_history(entries)
+    legacy = tmp / "scale.json"
+    with open(legacy, "w") as f:
+        json.dump(history, f, indent=2)
+    store = HistoryStore(tmp / "scale.db")
+    store.import_history("bench", history)
+
+    counter = iter(range(entries, entries + 10 * runs))
+    legacy_runs = max(3, runs // 50)
+    print(f"scale: {entries:,} existing entries")
+    print(f"  legacy write   {_ms(_timed(lambda: _legacy_log_session(legacy, _day(next(counter))), legacy_runs))}"
+          f"  ({legacy_runs} runs)")
+    print(f"  store write    {_ms(_timed(lambda: store.log_session('bench', _day(next(counter))), runs))}"
+          f"  ({runs} runs)")
+    print(f"  store weigh-in {_ms(_timed(lambda: store.log_weight('bench', _day(next(counter)), 71.5), runs))}")
+    print(f"  legacy read    {_ms(_timed(lambda: _legacy_load(legacy), legacy_runs))}")
+    print(f"  store read     {_ms(_timed(lambda: store.load('bench'), legacy_runs))}")
+    print(f"  store read, other user {_ms(_timed(lambda: store.load('someone_else'), runs))}")
+
+    def legacy_dashboard():
+        history = _legacy_load(legacy)
+        sessions = sorted(set(history["sessions"]), reverse=True)
+        weights = history["weight_log"]
+        return len(sessions), weights[-1]["weight"] - weights[0]["weight"]
+
+    def store_dashboard():
+        store.log_weight("bench", _day(next(counter)), 71.0)
+        return store.aggregates("bench")
+
+    print(f"  legacy dashboard        {_ms(_timed(legacy_dashboard, legacy_runs))}")
+    print(f"  store write + dashboard {_ms(_timed(store_dashboard, runs))}")
+
+
+def _run_threads(threads: int, target) -> list[BaseException]:
+    errors: list[BaseException] = []
+
+    def guarded(t: int):
+        try:
+            target(t)
+        except BaseException as e:
+            errors.append(e)
+
+    workers = [threading.Thread(target=guarded, args=(t,)) for t in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return errors
+
+
+def concurrency(tmp: Path, threads: int, writes: int) -> bool:
+    expected = threads * writes
+    print(f"concurrency: {threads} threads x {writes} writes")
+
+    legacy = tmp / "concurrency.json"
+    started = time.perf_counter()
+    errors = _run_threads(
+        threads, lambda t: [_legacy_log_session(legacy, _day(t * writes + i)) for i in range(writes)]
+    )
+    elapsed = time.perf_counter() - started
+    try:
+        kept = len(_legacy_load(legacy)["sessions"])
+    except json.JSONDecodeError:
+        kept = 0
+    print(f"  legacy: {kept:,}/{expected:,} writes kept, {len(errors)} errors, {elapsed:.2f} s")
+
+    store = HistoryStore(tmp / "concurrency.db")
+
+    def write(t: int):
+        for i in range(writes):
+            user = f"user_{t}" if i % 2 else "shared"
+            store.log_session(user, _day(t * writes + i))
+            store.log_weight(user, _day(t * writes + i), 60 + t)
+
+    started = time.perf_counter()
+    errors = _run_threads(threads, write)
+    elapsed = time.perf_counter() - started
+    users = ["shared"] + [f"user_{t}" for t in range(threads)]
+    sessions = sum(len(store.sessions(u)) for u in users)
+    weights = sum(len(store.weight_log(u)) for u in users)
+    print(f"  store : {sessions:,}/{expected:,} sessions and {weights:,}/{expected:,} weigh-ins kept,"
+          f" {len(errors)} errors, {elapsed:.2f} s ({2 * expected / elapsed:,.0f} writes/s)")
+    for e in errors[:3]:
+        print(f"    {type(e).__name__}: {e}")
+    return not errors and sessions == expected and weights == expected
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--writes", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        scale(Path(tmp), args.entries, args.runs)
+        ok = concurrency(Path(tmp), args.threads, args.writes)
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+"""How many simultaneous coaching sessions one process handles.
+
+Usage (from the repository root):
+
+    python -m benchmarks.load_test [--users 50] [--followups 3] [--latency lognormal:800,0.4]
+                                   [--output FILE] [--compare BASELINE.json]
+
+Each simulated user gets its own thread, as Streamlit gives each browser
+session its own script thread, and goes through the app's flow with the
+functions ``app.py`` uses: create the ADK session, save a profile (prefetch,
+weigh-in and visit logged to the history store), get the profile greeting
+(``run_agent`` through the response cache), press a quick action, then send
+``--followups`` free-text messages through ``stream_agent``, reading the
+dashboard aggregates before each, as every rerun does. Users start over
+``--ramp`` seconds and pause up to ``--pause`` seconds between steps.
+
+The model is ``OfflineLlm`` (``offline/rules``, real tool calls) with the
+``--latency`` distribution; history, response cache and sessions live in a
+temporary directory, with the session backend chosen by ``SESSION_BACKEND``
+as in the app.
+
+Reported: throughput, p50/p95/p99 latency per step and per tool, history
+write latency under load against the same writes run alone (contention),
+and resident memory growth per session. The results are written as JSON to
+``--output`` (default ``benchmarks/results/load_test_<commit>.json``);
+``--compare`` prints the change against an earlier results file. The script
+exits with status 1 if any turn fails.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from google.adk.runners import Runner
+
+import app
+from agent_loop import get_agent_loop
+from fitness_agent.offline_model import OfflineLlm
+from fitness_agent.prefetch import get_prefetcher
+from history_store import get_history_store
+from quick_actions import QUICK_ACTIONS, run_quick_action, session_events
+from response_cache import get_response_cache
+from session_service import session_service_from_env
+
+RESULTS_DIR = Path("benchmarks/results")
+FOLLOWUPS = [
+    "Can you make the workout a bit shorter?",
+    "What should I eat before training?",
+    "Any videos for beginners?",
+    "How much rest do I need between sessions?",
+    "Give me everything again with more protein",
+]
+COMPARED = [
+    ("throughput", "turns_per_s"),
+    ("latency_ms", "chat", "p50"),
+    ("latency_ms", "chat", "p95"),
+    ("latency_ms", "chat", "p99"),
+    ("latency_ms", "intro", "p95"),
+    ("latency_ms", "quick_action", "p95"),
+    ("history", "write_ms", "p95"),
+    ("history", "contention"),
+    ("memory", "per_session_kb"),
+]
+
+
+def _percentiles(samples: list[float]) -> dict:
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def rank(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 2)
+
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered), 2),
+        "p50": rank(0.50), "p95": rank(0.95), "p99": rank(0.99), "max": round(ordered[-1], 2),
+    }
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _profiles() -> list[tuple[dict, float]]:
+    """Tool-argument profiles over the sidebar's options, with the weight logged on save."""
+    grid = itertools.product(app.GOAL_MAP.values(), ("beginner", "intermediate", "advanced"),
+                             app.EQUIP_MAP.values(), app.DIET_MAP.values())
+    return [
+        ({"goal": goal, "fitness_level": level, "equipment_access": equipment, "workout_days_per_week": 4,
+          "weight_kg": 72.0, "height_cm": 175.0, "age": 30, "gender": "male",
+          "diet_preference": diet, "cuisine_preference": "indian"}, 72.0)
+        for goal, level, equipment, diet in grid
+    ]
+
+
+class Recorder:
+    """Latency samples by step name, shared by the user threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: dict[str, list[float]] = {}
+        self.errors: list[str] = []
+        self.turns = 0
+
+    def add(self, step: str, ms: float, turn: bool = False):
+        with self._lock:
+            self.samples.setdefault(step, []).append(ms)
+            self.turns += turn
+
+    def timed(self, step: str, fn, *args, turn: bool = False, **kwargs):
+        started = time.perf_counter()
+        result = fn(*args, **kwargs)
+        self.add(step, (time.perf_counter() - started) * 1000, turn)
+        return result
+
+    def error(self, message: str):
+        with self._lock:
+            self.errors.append(message)
+
+
+def _user(i: int, runner, rec: Recorder, args, rng: random.Random):
+    loop, store = get_agent_loop(), get_history_store()
+    profile, weight = rng.choice(_profiles())
+    name, user_id, session_id = f"User{i}", f"load_user_{i}", f"load_session_{i}"
+    today = datetime.now().strftime("%Y-%m-%d")
+    summary = app.format_profile_summary(name, profile)
+
+    def pause():
+        time.sleep(rng.uniform(0, args.pause))
+
+    rec.timed("session_create", loop.run, runner.session_service.create_session(
+        app_name=app.APP_NAME, user_id=user_id, session_id=session_id, state={},
+    ))
+    get_prefetcher().submit(session_id, profile)
+    rec.timed("history_write", store.log_weight, user_id, today, weight)
+    rec.timed("history_write", store.log_session, user_id, today)
+
+    reply = rec.timed("intro", app.run_agent, runner, session_id, summary + app.INTRO_REQUEST, user_id,
+                      profile=profile, name=name, turn=True)
+    if reply.startswith("Error:") or reply == app.FALLBACK_RESPONSE:
+        rec.error(f"user {i} intro: {reply[:80]}")
+    pause()
+
+    action = rng.choice(list(QUICK_ACTIONS))
+    started = time.perf_counter()
+    answer = run_quick_action(action, profile, owner=session_id)
+    app._append_events(runner.session_service, user_id, session_id, session_events(
+        app.root_agent.name, f"{summary}\n\nUser request: {answer['prompt']}", answer,
+    ))
+    rec.add("quick_action", (time.perf_counter() - started) * 1000, turn=True)
+
+    for n in range(args.followups):
+        pause()
+        rec.timed("history_read", store.aggregates, user_id, today)
+        metrics: dict = {}
+        started = time.perf_counter()
+        text = "".join(
+            value for kind, value in app.stream_agent(runner, session_id, FOLLOWUPS[(i + n) % len(FOLLOWUPS)],
+                                                     metrics, user_id=user_id)
+            if kind == "text"
+        )
+        rec.add("chat", (time.perf_counter() - started) * 1000, turn=True)
+        if metrics["ttft_ms"] is not None:
+            rec.add("chat_ttft", metrics["ttft_ms"])
+        for tool in metrics["tools"]:
+            rec.add(f"tool.{tool['name']}", tool["ms"])
+        if not text or text.startswith("Error:"):
+            rec.error(f"user {i} follow-up {n}: {text[:80] or 'no reply'}")
+    rec.timed("history_write", store.log_session, user_id, today)
+
+
+def _solo_writes(count: int) -> list[float]:
+    store, samples = get_history_store(), []
+    for n in range(count):
+        started = time.perf_counter()
+        store.log_weight("load_solo", f"2000-01-{n % 28 + 1:02d}", 70.0)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def _lookup(results: dict, path: tuple):
+    for key in path:
+        results = results.get(key, {}) if isinstance(results, dict) else {}
+    return results if isinstance(results, (int, float)) else None
+
+
+def _compare(results: dict, baseline_path: Path):
+    baseline = json.loads(baseline_path.read_text())
+    print(f"  vs {baseline_path} (commit {baseline['meta'].get('commit')}):")
+    for path in COMPARED:
+        new, old = _lookup(results, path), _lookup(baseline, path)
+        if new is None or old is None:
+            continue
+        change = f"{(new - old) / old:+.1%}" if old else "n/a"
+        print(f"    {'.'.join(path):<28} {old:>10} -> {new:>10}  {change}")
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--followups", type=int, default=3)
+    parser.add_argument("--latency", default="lognormal:800,0.4")
+    parser.add_argument("--token-ms", default="2")
+    parser.add_argument("--ramp", type=float, default=2.0)
+    parser.add_argument("--pause", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--compare", type=Path)
+    args = parser.parse_args(argv)
+
+    tmp = tempfile.TemporaryDirectory()
+    os.environ.update(
+        HISTORY_DB_PATH=str(Path(tmp.name) / "history.db"),
+        RESPONSE_CACHE_PATH=str(Path(tmp.name) / "responses.db"),
+        SESSION_DB_PATH=str(Path(tmp.name) / "sessions.db"),
+        OFFLINE_LATENCY_MS=args.latency,
+        OFFLINE_TOKEN_MS=args.token_ms,
+        OFFLINE_SEED=str(args.seed),
+    )
+    runner = Runner(
+        agent=app.root_agent.clone(update={"model": OfflineLlm(model="offline/rules")}),
+        app_name=app.APP_NAME,
+        session_service=session_service_from_env(),
+    )
+    solo = _solo_writes(50)
+    rec = Recorder()
+    _user(-1, runner, rec, argparse.Namespace(followups=1, pause=0), random.Random(0))
+    rec = Recorder()
+
+    rss_before = _rss_bytes()
+    threads = []
+
+    def user(i: int):
+        try:
+            _user(i, runner, rec, args, random.Random(args.seed * 100_003 + i))
+        except Exception as e:
+            rec.error(f"user {i}: {type(e).__name__}: {e}")
+
+    started = time.perf_counter()
+    for i in range(args.users):
+        thread = threading.Thread(target=user, args=(i,))
+        thread.start()
+        threads.append(thread)
+        time.sleep(args.ramp / max(1, args.users))
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+    rss_after = _rss_bytes()
+
+    write, solo_p = _percentiles(rec.samples.get("history_write", [])), _percentiles(solo)
+    results = {
+        "meta": {
+            "commit": _commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "session_backend": os.environ.get("SESSION_BACKEND", "memory"),
+        },
+        "config": {k: str(v) if isinstance(v, Path) else v for k, v in vars(args).items()},
+        "throughput": {
+            "wall_s": round(wall, 2),
+            "turns": rec.turns,
+            "turns_per_s": round(rec.turns / wall, 2),
+            "sessions_per_s": round(args.users / wall, 2),
+        },
+        "latency_ms": {step: _percentiles(rec.samples.get(step, []))
+                       for step in ("session_create", "intro", "quick_action", "chat", "chat_ttft")},
+        "tools_ms": {step.removeprefix("tool."): _percentiles(samples)
+                     for step, samples in sorted(rec.samples.items()) if step.startswith("tool.")},
+        "history": {
+            "write_ms": write,
+            "read_ms": _percentiles(rec.samples.get("history_read", [])),
+            "solo_write_ms": solo_p,
+            "contention": round(write["p95"] / solo_p["p50"], 2) if solo_p["p50"] else None,
+            "writes": get_history_store().stats()["writes"],
+        },
+        "memory": {
+            "rss_before_mb": round(rss_before / 2**20, 1),
+            "rss_after_mb": round(rss_after / 2**20, 1),
+            "per_session_kb": round((rss_after - rss_before) / 1024 / args.users, 1),
+        },
+        "errors": rec.errors,
+        "agent_loop": get_agent_loop().stats(),
+        "response_cache": get_response_cache().stats() if get_response_cache() else None,
+        "session_service": runner.session_service.stats(),
+    }
+
+    latency = results["latency_ms"]
+    print(f"{args.users} users, {args.followups} follow-ups each, model {args.latency}")
+    print(f"  {rec.turns} turns in {wall:.1f} s: {results['throughput']['turns_per_s']} turns/s, "
+          f"{results['throughput']['sessions_per_s']} sessions/s, {len(rec.errors)} errors")
+    for step in ("intro", "quick_action", "chat", "chat_ttft"):
+        s = latency[step]
+        if s["count"]:
+            print(f"  {step:<14} p50 {s['p50']:8.1f}  p95 {s['p95']:8.1f}  p99 {s['p99']:8.1f} ms")
+    for name, s in results["tools_ms"].items():
+        print(f"  {name:<28} p50 {s['p50']:6.1f}  p95 {s['p95']:6.1f} ms ({s['count']} calls)")
+    print(f"  history writes p95 {write['p95']:.2f} ms under load vs p50 {solo_p['p50']:.2f} ms alone "
+          f"(x{results['history']['contention']})")
+    print(f"  memory {results['memory']['rss_before_mb']} -> {results['memory']['rss_after_mb']} MiB, "
+          f"{results['memory']['per_session_kb']} KiB per session")
+    for error in rec.errors[:5]:
+        print(f"  ERROR {error}")
+
+    output = args.output or RESULTS_DIR / f"load_test_{results['meta']['commit'] or 'local'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"  results written to {output}")
+    if args.compare:
+        _compare(results, args.compare)
+    tmp.cleanup()
+    if rec.errors:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
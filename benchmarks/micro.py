@@ -0,0 +1,247 @@
+"""Micro-benchmarks of the functions that run on every request, checked against baselines.
+
+Usage (from the repository root):
+
+    python -m benchmarks.micro [-k SUBSTRING] [--threshold 0.3] [--save] [--profile]
+
+Times each benchmark as ``timeit`` does: the loop count is calibrated so a
+repeat takes at least ``--min-time`` seconds, and the best of ``--repeat``
+repeats is reported as microseconds per call. Covered: reading a reference
+JSON file, the catalog lookups behind the three tools, the tools themselves
+(as called, and without the memo), ``calculations.py``, the history reads each
+rerun makes (``_load_history`` and ``get_streak``, plus an uncached load)
+for one and three years of daily history, and ``parse_message_embeds`` on a
+reply with videos.
+
+Results are compared with ``benchmarks/micro_baselines.json``; the script
+exits with status 1 if any benchmark is more than ``--threshold`` (0.3 = 30%)
+slower than its baseline. ``--save`` writes the current results as the new
+baselines (only the selected ones with ``-k``). Baselines are machine
+specific: save them on the machine that runs the comparison.
+
+``--profile`` also runs each selected benchmark under cProfile and writes
+``benchmarks/results/micro_<name>.prof``, which ``snakeviz``, ``flameprof``
+or ``gprof2dot`` turn into a flame graph or call graph.
+"""
+
+import argparse
+import cProfile
+import json
+import os
+import platform
+import pstats
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import date, timedelta
+from pathlib import Path
+
+import streamlit as st
+
+import app
+from fitness_agent.tools import get_diet_plan, get_workout_plan, get_youtube_recommendations
+from fitness_agent.utils.calculations import calculate_bmi, calculate_bmr, calculate_macros, calculate_tdee
+from fitness_agent.utils.catalog import DATA_DIR, DIET_PLANS, _load_json
+from fitness_agent.utils.data_loader import get_diet_for_profile, get_videos_for_profile, get_workout_for_profile
+from history_store import get_history_store
+
+BASELINES = Path("benchmarks/micro_baselines.json")
+RESULTS_DIR = Path("benchmarks/results")
+HISTORY_YEARS = {"1y": 1, "3y": 3}
+REPLY = (
+    "Here are some videos for your fat-loss goal:\n\n"
+    + "".join(
+        f"{n}. **Workout {n}** ({10 + n} min) - https://www.youtube.com/watch?v=abcdefghi{n:02d}\n"
+        "   A beginner-friendly session with warm-up, main block and cool-down.\n"
+        for n in range(1, 6)
+    )
+    + "\nWatch https://youtu.be/abcdefghi01 again on rest days. " + "Stay consistent and hydrate. " * 20
+)
+
+_benchmarks: dict[str, Callable[[], Callable[[], object]]] = {}
+
+
+def bench(name: str):
+    """Register a setup function returning the zero-argument callable to time."""
+    def register(setup):
+        _benchmarks[name] = setup
+        return setup
+    return register
+
+
+@bench("catalog._load_json")
+def _load_json_bench():
+    path = DATA_DIR / DIET_PLANS / "fat_loss.json"
+    return lambda: _load_json(path)
+
+
+@bench("data.get_workout_for_profile")
+def _workout_lookup():
+    return lambda: get_workout_for_profile("muscle_building", "intermediate", "full_gym", 5)
+
+
+@bench("data.get_diet_for_profile")
+def _diet_lookup():
+    return lambda: get_diet_for_profile("fat_loss", "vegetarian", "flexible")
+
+
+@bench("data.get_videos_for_profile")
+def _videos_lookup():
+    return lambda: get_videos_for_profile("fat_loss", "beginner", "both")
+
+
+def _tool_benches(name: str, tool, *args):
+    bench(f"tools.{name}")(lambda: lambda: tool(*args))
+    if hasattr(tool, "cache"):
+        bench(f"tools.{name}[unmemoized]")(lambda: lambda: tool.__wrapped__(*args))
+
+
+_tool_benches("get_workout_plan", get_workout_plan, "muscle_building", "intermediate", "full_gym", 5)
+_tool_benches("get_diet_plan", get_diet_plan, "fat_loss", 72.0, 175.0, 30, "vegetarian", "flexible", 4, "male")
+_tool_benches("get_youtube_recommendations", get_youtube_recommendations, "fat_loss", "beginner", "both")
+
+
+@bench("calc.calculate_bmi")
+def _bmi():
+    return lambda: calculate_bmi(72.0, 175.0)
+
+
+@bench("calc.calculate_bmr")
+def _bmr():
+    return lambda: calculate_bmr(72.0, 175.0, 30, "male")
+
+
+@bench("calc.calculate_tdee")
+def _tdee():
+    return lambda: calculate_tdee(72.0, 175.0, 30, 4, "fat_loss", "male")
+
+
+@bench("calc.calculate_macros")
+def _macros():
+    return lambda: calculate_macros(2100.0, "muscle_building")
+
+
+def _history_user(label: str) -> str:
+    """A user with ``HISTORY_YEARS[label]`` years of daily visits, weigh-ins and workouts."""
+    user_id = f"micro_{label}"
+    store = get_history_store()
+    if not store.sessions(user_id):
+        start = date(2020, 1, 1)
+        days = [(start + timedelta(days=n)).isoformat() for n in range(365 * HISTORY_YEARS[label])]
+        store.import_history(user_id, {
+            "sessions": days,
+            "weight_log": [{"date": d, "weight": 80 - n / 100} for n, d in enumerate(days)],
+            "workout_log": [{"date": d, "exercise": "Squats", "sets": 3, "reps": 10} for d in days[::2]],
+        })
+    st.session_state["auth_user"] = {"id": user_id}
+    return user_id
+
+
+def _history_benches(label: str):
+    def load_history():
+        _history_user(label)
+        return app._load_history
+
+    def streak():
+        _history_user(label)
+        return app.get_streak
+
+    def load_uncached():
+        user_id = _history_user(label)
+        return lambda: get_history_store().load(user_id)
+
+    bench(f"history._load_history[{label}]")(load_history)
+    bench(f"history.get_streak[{label}]")(streak)
+    bench(f"history.load_uncached[{label}]")(load_uncached)
+
+
+for _label in HISTORY_YEARS:
+    _history_benches(_label)
+
+
+@bench("render.parse_message_embeds")
+def _parse_embeds():
+    return lambda: app.parse_message_embeds(REPLY)
+
+
+def measure(fn: Callable[[], object], min_time: float, repeat: int) -> tuple[float, int]:
+    """Best microseconds per call over ``repeat`` repeats, and the calibrated loop count."""
+    fn()
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        if time.perf_counter() - started >= min_time:
+            break
+        loops *= 2
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        best = min(best, (time.perf_counter() - started) / loops)
+    return best * 1e6, loops
+
+
+def profile(name: str, fn: Callable[[], object], loops: int) -> Path:
+    path = RESULTS_DIR / f"micro_{name.replace('[', '_').replace(']', '')}.prof"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    profiler = cProfile.Profile()
+    profiler.enable()
+    for _ in range(loops):
+        fn()
+    profiler.disable()
+    profiler.dump_stats(path)
+    pstats.Stats(str(path)).sort_stats("cumulative").print_stats(8)
+    return path
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-k", default="", help="only benchmarks whose name contains this")
+    parser.add_argument("--threshold", type=float, default=0.3)
+    parser.add_argument("--min-time", type=float, default=0.05)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", action="store_true")
+    parser.add_argument("--profile", action="store_true")
+    args = parser.parse_args(argv)
+
+    tmp = tempfile.TemporaryDirectory()
+    os.environ["HISTORY_DB_PATH"] = str(Path(tmp.name) / "history.db")
+    baselines = json.loads(BASELINES.read_text()) if BASELINES.exists() else {"benchmarks": {}}
+    selected = [name for name in _benchmarks if args.k in name]
+
+    results, regressions, profiles = {}, [], []
+    print(f"{'benchmark':<44}{'us/call':>12}{'baseline':>12}{'change':>9}")
+    for name in selected:
+        fn = _benchmarks[name]()
+        us, loops = measure(fn, args.min_time, args.repeat)
+        results[name] = round(us, 3)
+        base = baselines["benchmarks"].get(name)
+        change = (us - base) / base if base else None
+        flag = ""
+        if change is not None and change > args.threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<44}{us:>12.2f}{base if base is not None else '-':>12}"
+              f"{f'{change:+.0%}' if change is not None else 'new':>9}{flag}")
+        if args.profile:
+            profiles.append(profile(name, fn, loops))
+    tmp.cleanup()
+
+    for path in profiles:
+        print(f"  profile written to {path}")
+    if args.save:
+        baselines["benchmarks"].update(results)
+        baselines["python"] = platform.python_version()
+        baselines["machine"] = platform.machine()
+        BASELINES.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"  {len(results)} baselines saved to {BASELINES}")
+    elif regressions:
+        print(f"  {len(regressions)} benchmarks more than {args.threshold:.0%} slower than baseline")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
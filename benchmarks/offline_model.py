@@ -0,0 +1,99 @@
+"""Run the agent end to end against the offline model and check its latency model.
+
+Usage (from the repository root):
+
+    python -m benchmarks.offline_model [--turns 40] [--latency normal:300,60] [--token-ms 2] [--seed 7]
+
+Sends ``--turns`` chat turns (workout, diet, videos, everything and small
+talk, in rotation) through ``app.stream_agent`` with the full runner
+pipeline, the real tools and ``OfflineLlm`` in ``offline/rules`` mode, and
+compares the measured time to first token with the ``--latency``
+distribution drawn by the model. The same conversation runs twice with the
+same ``--seed``. The script exits with status 1 if the two runs call
+different tools or reply differently, or if a plan request calls no tool.
+"""
+
+import argparse
+import os
+import random
+import statistics
+
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+
+import app
+from agent_loop import get_agent_loop
+from fitness_agent.agent import root_agent
+from fitness_agent.offline_model import OfflineLlm, parse_latency
+
+PROFILE = (
+    "My profile: Name=Asha, Age=29, Weight=68.0kg, Height=165.0cm, Gender=female, Goal=fat_loss, "
+    "Fitness Level=beginner, Diet Preference=vegetarian, Cuisine=indian, Workout Days/Week=4, Equipment=basic."
+)
+MESSAGES = [
+    "Can I get a workout plan?",
+    "What should my diet look like?",
+    "Any videos I can follow?",
+    "Give me everything",
+    "Thanks, how often should I rest?",
+]
+
+
+def _conversation(turns: int) -> tuple[list[tuple], list[float]]:
+    runner = Runner(
+        agent=root_agent.clone(update={"model": OfflineLlm(model="offline/rules")}),
+        app_name=app.APP_NAME,
+        session_service=InMemorySessionService(),
+    )
+    get_agent_loop().run(runner.session_service.create_session(
+        app_name=app.APP_NAME, user_id=app.USER_ID, session_id="offline",
+    ))
+    transcript, ttft = [], []
+    for t in range(turns):
+        message = MESSAGES[t % len(MESSAGES)]
+        if t == 0:
+            message = f"{PROFILE}\n\nUser request: {message}"
+        metrics: dict = {}
+        items = list(app.stream_agent(runner, "offline", message, metrics))
+        tools = tuple(value for kind, value in items if kind == "tool")
+        transcript.append((message, tools, "".join(value for kind, value in items if kind == "text")))
+        if not tools:
+            ttft.append(metrics["ttft_ms"])
+    return transcript, ttft
+
+
+def _percentiles(samples: list[float]) -> str:
+    ordered = sorted(samples)
+    p50, p95 = ordered[len(ordered) // 2], ordered[int(len(ordered) * 0.95)]
+    return f"mean {statistics.fmean(samples):6.1f} ms  p50 {p50:6.1f} ms  p95 {p95:6.1f} ms"
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--latency", default="normal:300,60")
+    parser.add_argument("--token-ms", default="2")
+    parser.add_argument("--seed", default="7")
+    args = parser.parse_args(argv)
+
+    os.environ.update(OFFLINE_LATENCY_MS=args.latency, OFFLINE_TOKEN_MS=args.token_ms, OFFLINE_SEED=args.seed)
+    first, ttft = _conversation(args.turns)
+    second, _ = _conversation(args.turns)
+
+    draw, rng = parse_latency(args.latency), random.Random(int(args.seed))
+    drawn = [draw(rng) * 1000 for _ in range(1000)]
+    calls = sum(len(tools) for _, tools, _ in first)
+    print(f"{args.turns} turns, offline/rules, latency {args.latency}, {calls} real tool calls")
+    print(f"  configured draw        {_percentiles(drawn)}")
+    print(f"  measured ttft (no tool) {_percentiles(ttft)}")
+    same = first == second
+    missing = [m for m, tools, _ in first if not tools and "rest" not in m]
+    print(f"  repeat run with seed {args.seed} identical: {same}")
+    for message in missing[:3]:
+        print(f"  FAIL no tool called for {message!r}")
+    if not same or missing:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
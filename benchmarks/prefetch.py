@@ -0,0 +1,85 @@
+"""First tool call latency with and without the profile-save prefetch.
+
+Usage (from the repository root):
+
+    python -m benchmarks.prefetch [--profiles 50] [--think-ms 50] [--churn 20]
+
+For each of ``--profiles`` random profiles the tool caches are cleared, then
+all three tools are called once directly (cold), and once more after clearing
+again through a prefetch submitted ``--think-ms`` earlier, the time a user
+takes to reach for a quick action. The churn phase saves ``--churn`` different
+profiles back to back for one session and checks that all but the last batch
+were dropped. The script exits with status 1 if a prefetched lookup missed.
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from fitness_agent.prefetch import TOOLS, Prefetcher, tool_args
+from fitness_agent.utils import clear_caches
+
+GOALS = ("fat_loss", "weight_gain", "muscle_building", "health_maintenance")
+LEVELS = ("beginner", "intermediate", "advanced")
+EQUIPMENT = ("none", "basic", "full_gym")
+DIETS = ("vegetarian", "non_vegetarian", "vegan", "eggetarian")
+CUISINES = ("indian", "western", "flexible")
+
+
+def _profile(rng: random.Random) -> dict:
+    return {
+        "goal": rng.choice(GOALS), "fitness_level": rng.choice(LEVELS),
+        "equipment_access": rng.choice(EQUIPMENT), "workout_days_per_week": rng.randint(3, 6),
+        "weight_kg": rng.randint(45, 120), "height_cm": rng.randint(150, 200), "age": rng.randint(16, 70),
+        "gender": rng.choice(("male", "female")), "diet_preference": rng.choice(DIETS),
+        "cuisine_preference": rng.choice(CUISINES),
+    }
+
+
+def _first_calls(call, profile: dict) -> float:
+    started = time.perf_counter()
+    for name in TOOLS:
+        call(name, tool_args(name, profile))
+    return (time.perf_counter() - started) * 1000
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", type=int, default=50)
+    parser.add_argument("--think-ms", type=float, default=50.0)
+    parser.add_argument("--churn", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    prefetcher = Prefetcher(workers=2)
+    cold, warm = [], []
+    for i in range(args.profiles):
+        profile = _profile(rng)
+        clear_caches()
+        cold.append(_first_calls(lambda name, a: TOOLS[name](**a), profile))
+        clear_caches()
+        prefetcher.submit(f"session_{i}", profile)
+        time.sleep(args.think_ms / 1000)
+        warm.append(_first_calls(lambda name, a: prefetcher.call(f"session_{i}", name, a), profile))
+
+    print(f"{args.profiles} profiles, all three tools, caches cleared before each")
+    print(f"  direct     median {statistics.median(cold):7.3f} ms  max {max(cold):7.3f} ms")
+    print(f"  prefetched median {statistics.median(warm):7.3f} ms  max {max(warm):7.3f} ms")
+    served = prefetcher.stats()
+    print(f"  {served}")
+
+    churn = Prefetcher(workers=2)
+    for _ in range(args.churn):
+        churn.submit("churn", _profile(rng))
+    dropped = churn.stats()
+    print(f"churn: {args.churn} saves -> {dropped['cancelled']} tool runs cancelled before starting, "
+          f"{dropped['stale']} discarded")
+
+    if served["misses"] or dropped["cancelled"] + dropped["stale"] != 3 * (args.churn - 1):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Time the quick-action fast path across the profile grid.
+
+Usage (from the repository root):
+
+    python -m benchmarks.quick_actions [--runs 3]
+
+Every quick action is run for every combination of goal, fitness level,
+equipment and diet preference: the tools are called directly and the reply
+is rendered from the local templates, as the chat buttons do. The first
+pass starts from cold tool caches; later passes show the memoized cost. The
+script exits with status 1 if any action fails to render.
+"""
+
+import argparse
+import itertools
+import statistics
+import time
+
+from quick_actions import QUICK_ACTIONS, run_quick_action
+
+GOALS = ("fat_loss", "weight_gain", "muscle_building", "health_maintenance")
+LEVELS = ("beginner", "intermediate", "advanced")
+EQUIPMENT = ("none", "basic", "full_gym")
+DIETS = ("vegetarian", "non_vegetarian", "vegan", "eggetarian")
+
+
+def _profiles() -> list[dict]:
+    return [
+        {
+            "goal": goal, "fitness_level": level, "equipment_access": equipment,
+            "workout_days_per_week": 4, "weight_kg": 72.0, "height_cm": 175.0, "age": 30,
+            "gender": "male", "diet_preference": diet, "cuisine_preference": "indian",
+        }
+        for goal, level, equipment, diet in itertools.product(GOALS, LEVELS, EQUIPMENT, DIETS)
+    ]
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    profiles = _profiles()
+    failed = 0
+    print(f"{len(profiles)} profiles")
+    print(f"{'action':<12}{'pass':>6}{'median ms':>11}{'max ms':>9}")
+    for action in QUICK_ACTIONS:
+        for run in range(args.runs):
+            samples = []
+            for profile in profiles:
+                started = time.perf_counter()
+                answer = run_quick_action(action, profile)
+                samples.append((time.perf_counter() - started) * 1000)
+                failed += not answer["markdown"].strip()
+            label = "cold" if run == 0 else f"warm{run}"
+            print(f"{action:<12}{label:>6}{statistics.median(samples):>11.3f}{max(samples):>9.3f}")
+    if failed:
+        print(f"{failed} empty replies")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
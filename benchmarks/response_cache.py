@@ -0,0 +1,163 @@
+"""Hit ratio and latency saved by the response cache on the profile greeting.
+
+Usage (from the repository root):
+
+    python -m benchmarks.response_cache [--users 200] [--profiles 24] [--figure-sets 4] [--think-ms 800]
+
+Simulates ``--users`` users saving a profile, each with one of
+``--profiles`` combinations of goal, level, equipment and diet (over the
+sidebar's options), their own name, and one of ``--figure-sets`` sets of
+age (18-60), weight (50-100 kg) and height (150-195 cm), and sends the
+greeting through ``app.run_agent`` as the chat does. The stub model takes
+``--think-ms``, greets the user by the name in the profile summary and
+quotes the BMI worked out from its weight and height. The cache lives in a
+temporary database. Then a bypassed key, an expired entry and the size bound
+are checked. The script exits with status 1 if any user is greeted with
+someone else's name or BMI, a hit is missing from its session, or a check
+fails.
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import re
+import tempfile
+import time
+from collections.abc import AsyncGenerator
+from pathlib import Path
+
+import streamlit as st
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types as genai_types
+
+import app
+from agent_loop import get_agent_loop
+from benchmarks.streaming_ttft import StubLlm
+from fitness_agent.agent import root_agent
+from response_cache import ResponseCache
+
+NAMES = ["Asha", "Ravi", "Meera", "John", "Priya", "Arjun", "Sara", "Kabir", "Lena", "Omar"]
+
+
+class GreetingLlm(StubLlm):
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        await asyncio.sleep(self.think_ms / 1000)
+        prompt = llm_request.contents[-1].parts[0].text
+        name = re.search(r"Name=([^,]+)", prompt).group(1)
+        text = (f"Hi {name}! Great to meet you. Your BMI is {_bmi(prompt)}. I can build your workout "
+                "plan, work out your calories and meals, and find videos for your goal.")
+        yield LlmResponse(
+            content=genai_types.Content(role="model", parts=[genai_types.Part(text=text)]),
+            usage_metadata=genai_types.GenerateContentResponseUsageMetadata(
+                candidates_token_count=30, total_token_count=30
+            ),
+        )
+
+
+def _bmi(summary: str) -> float:
+    weight = float(re.search(r"Weight=([\d.]+)kg", summary).group(1))
+    height = float(re.search(r"Height=([\d.]+)cm", summary).group(1))
+    return round(weight / (height / 100) ** 2, 1)
+
+
+def _profiles(count: int) -> list[dict]:
+    grid = itertools.product(
+        app.GOAL_MAP, ("Beginner", "Intermediate", "Advanced"), app.EQUIP_MAP, app.DIET_MAP
+    )
+    return [
+        {"profile_goal": goal, "profile_fitness_level": level, "profile_equipment": equipment,
+         "profile_diet_pref": diet, "profile_cuisine_pref": "Indian", "profile_days": 4, "profile_gender": "male"}
+        for goal, level, equipment, diet in itertools.islice(grid, count)
+    ]
+
+
+def _figures(rng: random.Random) -> dict:
+    return {
+        "profile_age": rng.randint(18, 60),
+        "profile_weight": round(rng.uniform(50, 100) * 2) / 2,
+        "profile_height": round(rng.uniform(150, 195) * 2) / 2,
+    }
+
+
+def _greet(runner: Runner, service: InMemorySessionService, profile: dict, name: str, i: int) -> tuple[str, float, int]:
+    st.session_state.update(profile, profile_name=name, profile_saved=True)
+    session_id = f"user_{i}"
+    get_agent_loop().run(service.create_session(app_name=app.APP_NAME, user_id=app.USER_ID, session_id=session_id))
+    started = time.perf_counter()
+    reply = app.run_agent(
+        runner, session_id, app.get_profile_summary() + app.INTRO_REQUEST,
+        profile=app.profile_tool_args(), name=name,
+    )
+    elapsed = (time.perf_counter() - started) * 1000
+    session = get_agent_loop().run(service.get_session(app_name=app.APP_NAME, user_id=app.USER_ID, session_id=session_id))
+    return reply, elapsed, len(session.events)
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--profiles", type=int, default=24)
+    parser.add_argument("--figure-sets", type=int, default=4)
+    parser.add_argument("--think-ms", type=float, default=800.0)
+    args = parser.parse_args(argv)
+
+    problems = []
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["RESPONSE_CACHE_PATH"] = str(Path(tmp) / "responses.db")
+        cache = app.get_response_cache()
+        service = InMemorySessionService()
+        model = GreetingLlm(think_ms=args.think_ms)
+        runner = Runner(agent=root_agent.clone(update={"model": model}), app_name=app.APP_NAME, session_service=service)
+        profiles = _profiles(args.profiles)
+        rng = random.Random(0)
+        figure_sets = [_figures(rng) for _ in range(args.figure_sets)]
+        hit_ms, miss_ms = [], []
+        for i in range(args.users):
+            name = rng.choice(NAMES)
+            hits = cache.hits
+            profile = {**rng.choice(profiles), **rng.choice(figure_sets)}
+            reply, ms, events = _greet(runner, service, profile, name, i)
+            (hit_ms if cache.hits > hits else miss_ms).append(ms)
+            others = [n for n in NAMES if n != name and n in reply]
+            if f"Hi {name}!" not in reply or others:
+                problems.append(f"user {i} ({name}) greeted as: {reply[:40]}")
+            if f"BMI is {_bmi(app.get_profile_summary())}." not in reply:
+                problems.append(f"user {i} ({name}) given another BMI: {reply[:60]}")
+            if events != 2:
+                problems.append(f"user {i}: {events} session events")
+        stats = cache.stats()
+        print(f"{args.users} users over {len(profiles)} profiles x {len(figure_sets)} figure sets, model {args.think_ms:.0f} ms")
+        print(f"  hit ratio {stats['hit_ratio']:.0%} ({stats['hits']} hits, {stats['misses']} misses), "
+              f"{stats['entries']} entries")
+        print(f"  greeting: hit {sum(hit_ms) / max(1, len(hit_ms)):.1f} ms, miss {sum(miss_ms) / max(1, len(miss_ms)):.0f} ms")
+        print(f"  model latency saved {stats['latency_saved_ms'] / 1000:.1f} s")
+
+        personal = {"name": "Asha"}
+        key = ResponseCache.key("m", "i", {"goal": "fat_loss"}, "Hi, I am Asha", personal)
+        cache.put(key, "Hello Asha", personal, 500)
+        cache.bypass(key)
+        bypassed = cache.get(key, personal) is None
+        short = ResponseCache(Path(tmp) / "short.db", ttl=0.05, max_entries=3)
+        short.put(key, "Hello Asha", personal, 500)
+        time.sleep(0.1)
+        expired = short.get(key, personal) is None
+        for n in range(10):
+            short.put(f"k{n}", "reply", personal, 500)
+        bounded = short.stats()["entries"] == 3 and short.get("k9", personal) == "reply"
+        print(f"  bypassed key skipped: {bypassed}, entry expired after TTL: {expired}, size bound held: {bounded}")
+    problems += [name for name, ok in (("bypass", bypassed), ("ttl", expired), ("bound", bounded)) if not ok]
+    for problem in problems[:10]:
+        print(f"  FAIL {problem}")
+    if problems:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Check the bounded session service's caps and measure its overhead.
+
+Usage (from the repository root):
+
+    python -m benchmarks.session_service [--sessions 5000] [--turns 4] [--max-sessions 1000] [--max-mb 8]
+
+Creates ``--sessions`` sessions with ``--turns`` turns each (a user message, a
+tool call, a tool response of about 3 KB and a reply, like a real plan
+request) through both ADK's ``InMemorySessionService`` and
+``BoundedSessionService``, then reports the cost per appended event, the
+resident size and the gauges. A second pass with a short idle TTL checks that
+idle sessions expire. The script exits with status 1 if the bounded service
+ever holds more sessions or bytes than allowed.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+
+from google.adk.events import Event
+from google.adk.sessions import InMemorySessionService
+from google.genai import types as genai_types
+
+from fitness_agent.tools import get_workout_plan
+from session_service import BoundedSessionService
+
+APP = "bench"
+
+
+def _turn_events(i: int, plan: dict) -> list[Event]:
+    call = genai_types.FunctionCall(id=f"call_{i}", name="get_workout_plan", args={"goal": "fat_loss"})
+    response = genai_types.FunctionResponse(id=f"call_{i}", name="get_workout_plan", response=plan)
+    return [
+        Event(author="user", invocation_id=f"e{i}",
+              content=genai_types.Content(role="user", parts=[genai_types.Part(text=f"Plan {i} please")])),
+        Event(author="fitness_agent", invocation_id=f"e{i}",
+              content=genai_types.Content(role="model", parts=[genai_types.Part(function_call=call)])),
+        Event(author="fitness_agent", invocation_id=f"e{i}",
+              content=genai_types.Content(role="user", parts=[genai_types.Part(function_response=response)])),
+        Event(author="fitness_agent", invocation_id=f"e{i}",
+              content=genai_types.Content(role="model", parts=[genai_types.Part(text="Here is your plan. " * 40)])),
+    ]
+
+
+async def _fill(service, sessions: int, turns: int, plan: dict, check=None, prefix: str = "s") -> float:
+    elapsed = 0.0
+    for s in range(sessions):
+        session = await service.create_session(app_name=APP, user_id=f"user_{s % 100}", session_id=f"{prefix}{s}")
+        for t in range(turns):
+            for event in _turn_events(t, plan):
+                started = time.perf_counter()
+                await service.append_event(session, event)
+                elapsed += time.perf_counter() - started
+        if check is not None:
+            check()
+    return elapsed
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=5000)
+    parser.add_argument("--turns", type=int, default=4)
+    parser.add_argument("--max-sessions", type=int, default=1000)
+    parser.add_argument("--max-mb", type=float, default=8)
+    args = parser.parse_args(argv)
+
+    plan = get_workout_plan("fat_loss", "beginner", "none", 4)
+    events = args.sessions * args.turns * 4
+    print(f"{args.sessions:,} sessions x {args.turns} turns ({events:,} events, "
+          f"tool response {len(json.dumps(plan)):,} bytes)")
+
+    def measure(label: str, make, check=None):
+        elapsed = asyncio.run(_fill(make(), args.sessions, args.turns, plan))
+        tracemalloc.start()
+        service = make()
+        asyncio.run(_fill(service, args.sessions, args.turns, plan, check and (lambda: check(service))))
+        resident = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"  {label:<10}{elapsed / events * 1e6:6.1f} us/event, {resident / 2**20:7.1f} MiB resident")
+        return service
+
+    max_bytes = int(args.max_mb * 2**20)
+    over = []
+
+    def check(service: BoundedSessionService):
+        stats = service.stats()
+        if stats["live_sessions"] > args.max_sessions or stats["bytes"] > max_bytes:
+            over.append(stats)
+
+    measure("in-memory", InMemorySessionService)
+    bounded = measure(
+        "bounded",
+        lambda: BoundedSessionService(max_sessions=args.max_sessions, idle_ttl=0, max_bytes=max_bytes),
+        check,
+    )
+    print(f"  {bounded.stats()}")
+    held = sum(len(users[u]) for users in bounded.sessions.values() for u in users)
+    print(f"  sessions actually held: {held}, over the caps after {len(over)} sessions")
+
+    idle = BoundedSessionService(max_sessions=args.max_sessions, idle_ttl=0.05, max_bytes=max_bytes)
+    asyncio.run(_fill(idle, 10, 1, plan))
+    time.sleep(0.1)
+    asyncio.run(_fill(idle, 1, 1, plan, prefix="late"))
+    print(f"  idle TTL 50 ms: {idle.stats()['expirations']} of 10 idle sessions expired")
+
+    if over or held != bounded.stats()["live_sessions"] or idle.stats()["expirations"] != 10:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
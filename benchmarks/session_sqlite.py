@@ -0,0 +1,113 @@
+"""Append and load latency of the SQLite session service at 10k events per session.
+
+Usage (from the repository root):
+
+    python -m benchmarks.session_sqlite [--events 10000] [--sessions 3] [--batch 64]
+
+Fills ``--sessions`` sessions with ``--events`` events each (plan-request
+turns, as in ``benchmarks.session_service``), appending through
+``DurableSessionService`` with ``--batch`` events per write and with one
+write per event, and through the in-memory service for reference. Each
+turn's final reply also flushes the buffer, so the batched service writes
+once per turn here. Then it reopens the database as a restarted process
+would and times the first load of a session (full history, the last 50
+events, and with the default ``load_events`` window) and the loads that follow, which are
+served from memory. The script exits with status 1 if a reopened session is
+missing events.
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from google.adk.sessions import InMemorySessionService
+from google.adk.sessions.base_session_service import GetSessionConfig
+
+from benchmarks.session_service import _turn_events
+from fitness_agent.tools import get_workout_plan
+from session_service import DEFAULT_LOAD_EVENTS, DurableSessionService
+
+APP = "bench"
+
+
+async def _append(service, sessions: int, events: int, plan: dict) -> list[float]:
+    samples = []
+    turns = [_turn_events(t, plan) for t in range(events // 4)]
+    for s in range(sessions):
+        session = await service.create_session(app_name=APP, user_id="user", session_id=f"s{s}")
+        for turn in turns:
+            for event in turn:
+                # A copy: the in-memory services keep the very object appended.
+                event = event.model_copy()
+                started = time.perf_counter()
+                await service.append_event(session, event)
+                samples.append(time.perf_counter() - started)
+    await service.flush()
+    return samples
+
+
+def _us(samples: list[float]) -> str:
+    ordered = sorted(samples)
+    p99 = ordered[int(len(ordered) * 0.99)]
+    return f"mean {statistics.fmean(samples) * 1e6:7.1f} us  p99 {p99 * 1e6:8.1f} us"
+
+
+async def _timed(coro) -> tuple[float, object]:
+    started = time.perf_counter()
+    result = await coro
+    return (time.perf_counter() - started) * 1000, result
+
+
+async def _loads(db: Path, sessions: int) -> dict:
+    reopened = DurableSessionService(db, load_events=0)
+    recent_ms, recent = await _timed(reopened.get_session(
+        app_name=APP, user_id="user", session_id="s0", config=GetSessionConfig(num_recent_events=50)
+    ))
+    cold = []
+    for s in range(sessions):
+        ms, session = await _timed(reopened.get_session(app_name=APP, user_id="user", session_id=f"s{s}"))
+        cold.append((ms, len(session.events)))
+    hot_ms, _ = await _timed(reopened.get_session(app_name=APP, user_id="user", session_id="s0"))
+    windowed = DurableSessionService(db)
+    window_ms, window = await _timed(windowed.get_session(app_name=APP, user_id="user", session_id="s0"))
+    return {"recent_ms": recent_ms, "recent": len(recent.events), "cold": cold, "hot_ms": hot_ms,
+            "window_ms": window_ms, "window": len(window.events), "stats": reopened.stats()}
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=10_000)
+    parser.add_argument("--sessions", type=int, default=3)
+    parser.add_argument("--batch", type=int, default=64)
+    args = parser.parse_args(argv)
+
+    plan = get_workout_plan("fat_loss", "beginner", "none", 4)
+    events = args.events // 4 * 4
+    print(f"{args.sessions} sessions x {events:,} events")
+    with tempfile.TemporaryDirectory() as tmp:
+        memory = asyncio.run(_append(InMemorySessionService(), args.sessions, events, plan))
+        print(f"  append, in-memory          {_us(memory)}")
+        single = asyncio.run(_append(DurableSessionService(Path(tmp) / "single.db", batch_size=1),
+                                     args.sessions, events, plan))
+        print(f"  append, sqlite 1/write     {_us(single)}")
+        batched_db = Path(tmp) / "batched.db"
+        batched_service = DurableSessionService(batched_db, batch_size=args.batch)
+        batched = asyncio.run(_append(batched_service, args.sessions, events, plan))
+        print(f"  append, sqlite batched     {_us(batched)}  ({batched_service.flushes:,} writes)")
+
+        loads = asyncio.run(_loads(batched_db, args.sessions))
+    cold_ms = [ms for ms, _ in loads["cold"]]
+    print(f"  first load, last 50 events {loads['recent_ms']:8.2f} ms ({loads['recent']} events)")
+    print(f"  first load, full history   {statistics.median(cold_ms):8.2f} ms median ({loads['cold'][0][1]:,} events)")
+    print(f"  first load, default window {loads['window_ms']:8.2f} ms ({loads['window']} events)")
+    print(f"  later loads (in memory)    {loads['hot_ms']:8.3f} ms")
+    print(f"  {loads['stats']}")
+    if any(n != events for _, n in loads["cold"]) or loads["recent"] != 50 or loads["window"] != DEFAULT_LOAD_EVENTS:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
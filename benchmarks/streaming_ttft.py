@@ -0,0 +1,117 @@
+"""Time-to-first-token of the streamed chat path vs. the non-streamed one.
+
+Usage (from the repository root):
+
+    python -m benchmarks.streaming_ttft [--runs 5] [--tokens 300] [--token-ms 4] [--think-ms 300]
+
+The agent runs through ``app.stream_agent`` exactly as the chat UI drives it,
+but against a stub model: the first turn thinks for ``--think-ms`` and calls
+``get_workout_plan`` (the real tool runs); the second generates ``--tokens``
+tokens at ``--token-ms`` each. With ``StreamingMode.SSE`` the stub emits a
+partial response per token, like Gemini does; without it, one response at the
+end. No network or API key is needed.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from collections.abc import AsyncGenerator
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types as genai_types
+
+import app
+from agent_loop import get_agent_loop
+from fitness_agent.agent import root_agent
+
+
+class StubLlm(BaseLlm):
+    model: str = "stub"
+    tokens: int = 300
+    token_ms: float = 4.0
+    think_ms: float = 300.0
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        await asyncio.sleep(self.think_ms / 1000)
+        last = llm_request.contents[-1]
+        if not any(p.function_response for p in last.parts or []):
+            call = genai_types.FunctionCall(
+                name="get_workout_plan",
+                args={"goal": "fat_loss", "fitness_level": "beginner",
+                      "equipment_access": "none", "workout_days_per_week": 4},
+            )
+            yield LlmResponse(
+                content=genai_types.Content(role="model", parts=[genai_types.Part(function_call=call)]),
+                usage_metadata=genai_types.GenerateContentResponseUsageMetadata(
+                    candidates_token_count=1, total_token_count=1
+                ),
+            )
+            return
+        words = [f"word{i} " for i in range(self.tokens)]
+        for word in words:
+            await asyncio.sleep(self.token_ms / 1000)
+            if stream:
+                yield LlmResponse(
+                    content=genai_types.Content(role="model", parts=[genai_types.Part(text=word)]),
+                    partial=True,
+                )
+        yield LlmResponse(
+            content=genai_types.Content(role="model", parts=[genai_types.Part(text="".join(words))]),
+            usage_metadata=genai_types.GenerateContentResponseUsageMetadata(
+                candidates_token_count=self.tokens, total_token_count=self.tokens
+            ),
+        )
+
+
+def _run(runner: Runner, service: InMemorySessionService, run_config, i: int) -> dict:
+    session_id = f"bench_{i}_{run_config is not None}"
+    get_agent_loop().run(service.create_session(
+        app_name=app.APP_NAME, user_id=app.USER_ID, session_id=session_id
+    ))
+    metrics: dict = {}
+    started = time.perf_counter()
+    tool_label_ms = None
+    for kind, _ in app.stream_agent(runner, session_id, "Plan please", metrics, run_config):
+        if kind == "tool" and tool_label_ms is None:
+            tool_label_ms = (time.perf_counter() - started) * 1000
+    metrics["tool_label_ms"] = tool_label_ms
+    return metrics
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--tokens", type=int, default=300)
+    parser.add_argument("--token-ms", type=float, default=4.0)
+    parser.add_argument("--think-ms", type=float, default=300.0)
+    args = parser.parse_args(argv)
+
+    model = StubLlm(tokens=args.tokens, token_ms=args.token_ms, think_ms=args.think_ms)
+    service = InMemorySessionService()
+    runner = Runner(
+        agent=root_agent.clone(update={"model": model}),
+        app_name=app.APP_NAME,
+        session_service=service,
+    )
+    print(f"{'mode':<10}{'first text ms':>15}{'total ms':>10}{'tool label ms':>15}{'tool ms':>9}")
+    for label, run_config in (("sse", app.STREAMING_RUN_CONFIG), ("none", None)):
+        runs = [_run(runner, service, run_config, i) for i in range(args.runs)]
+        tool_ms = [t["ms"] for m in runs for t in m["tools"]]
+        print(
+            f"{label:<10}"
+            f"{statistics.median(m['ttft_ms'] for m in runs):>15.1f}"
+            f"{statistics.median(m['total_ms'] for m in runs):>10.1f}"
+            f"{statistics.median(m['tool_label_ms'] for m in runs):>15.1f}"
+            f"{statistics.median(tool_ms):>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
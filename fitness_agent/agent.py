@@ -1,10 +1,15 @@
 import os
 
 from google.adk.agents import Agent
+from google.adk.models.registry import LLMRegistry
 
+from .context_compaction import compact_context
+from .offline_model import OfflineLlm
+from .prefetch import serve_prefetched
 from .tools.workout_planner import get_workout_plan
 from .tools.diet_planner import get_diet_plan
 from .tools.youtube_recommender import get_youtube_recommendations
+from .utils.compact import TOOL_OUTPUT_MODE
 
 AGENT_INSTRUCTION = """You are FitCoach, a friendly and knowledgeable AI fitness coach. Your job is to help users get personalized workout plans, diet plans, and YouTube video recommendations.
 
@@ -79,7 +84,8 @@ When presenting workout plans:
 
 When presenting diet plans:
 - Show the calorie target and macro breakdown first
-- Present meals for each time of day (breakfast, lunch, dinner, snacks)
+- Present the `recommended_day` plan (one meal per time of day, chosen to best match the targets) with its totals
+- Offer the other options in `meal_plan` as swaps for each time of day (breakfast, lunch, dinner, snacks)
 - Show calories and protein for each meal
 - Mention that these are suggestions and can be swapped
 
@@ -97,6 +103,22 @@ When presenting YouTube videos:
 - Suggest modifications if the user mentions injuries or limitations
 """
 
+COMPACT_OUTPUT_NOTE = """
+## TOOL OUTPUT FORMAT
+
+Tool results marked `"_fmt": "compact/1"` are compacted to save space:
+- A list of items is sent as a table `{"_cols": [...], "_rows": [[...], ...]}`; each row holds the values for `_cols` in order
+- Some keys are shortened: plan = workout_plan, days = days_per_week, ex = exercises, rest_s = rest_sec, muscle = muscle_group, diet = diet_preference, options = meal_plan, pick = recommended_day, maint_kcal = maintenance_calories, target_kcal = target_calories, split_pct = split_percentages, prep_min = prep_time_min, mins = duration_min, desc = description, ingr = ingredients, ctype = content_type
+- `_dropped` lists fields left out to fit the size budget and `_truncated` gives the original row count of shortened tables; never invent values for them
+- Always present results to the user in normal readable form, never in this format
+"""
+
+if TOOL_OUTPUT_MODE == "compact":
+    AGENT_INSTRUCTION += COMPACT_OUTPUT_NOTE
+
+# GEMINI_MODEL=offline/... runs the agent without network, see offline_model.py.
+LLMRegistry.register(OfflineLlm)
+
 root_agent = Agent(
     model=os.environ.get("GEMINI_MODEL", "gemini-2.5-flash"),
     name="fitness_agent",
@@ -107,4 +129,6 @@ root_agent = Agent(
         get_diet_plan,
         get_youtube_recommendations,
     ],
+    before_model_callback=compact_context,
+    before_tool_callback=serve_prefetched,
 )
@@ -0,0 +1,215 @@
+"""Keep the conversation sent to the model within a token budget.
+
+Every model call replays the whole session, so without this the request
+grows with every turn, mostly through old tool results (a diet plan is a few
+thousand tokens). ``compact_context`` runs as the agent's
+``before_model_callback`` and, when the estimated request size (instruction
+plus conversation) is over ``CONTEXT_TOKEN_BUDGET``, shrinks the turns
+before the last ``CONTEXT_KEEP_TURNS`` ones, oldest first, in two stages:
+
+1. tool results are collapsed to a short reference with their headline
+   figures (the call and its arguments stay, so the model can call again);
+2. whole turns are replaced by a one-line summary each (the request, the
+   tools called, the start of the reply).
+
+The profile the app sends with the first message ("My profile: ...") is
+pinned: when its turn is summarized, it is kept verbatim at the top of the
+summary. Only the request is rewritten; the stored session keeps every event.
+Token counts are the ~4 characters per token estimate of ``utils.compact``,
+and each model call's before/after counts are kept for ``pop_report``.
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from google.genai import types as genai_types
+
+from .utils.compact import estimate_tokens, expand
+
+PROFILE_RE = re.compile(r"My profile: [^\n]*")
+REQUEST_PREFIX_RE = re.compile(r"^My profile: [^\n]*\n+User request: ", re.DOTALL)
+BRIEF_FIELDS = 10
+SNIPPET_CHARS = {"user": 160, "model": 240}
+REPORTS_KEPT = 256
+
+_reports: OrderedDict[str, dict] = OrderedDict()
+_reports_lock = threading.Lock()
+
+
+def _part_tokens(part: genai_types.Part) -> int:
+    if part.text:
+        return estimate_tokens(part.text)
+    if part.function_call:
+        return estimate_tokens({"name": part.function_call.name, "args": part.function_call.args or {}})
+    if part.function_response:
+        return estimate_tokens(part.function_response.response or {})
+    return 0
+
+
+def content_tokens(contents: list[genai_types.Content]) -> int:
+    return sum(_part_tokens(p) for c in contents for p in c.parts or [])
+
+
+def _is_user_message(content: genai_types.Content) -> bool:
+    return content.role == "user" and any(p.text for p in content.parts or [])
+
+
+def _turns(contents: list[genai_types.Content]) -> list[list[genai_types.Content]]:
+    """Split the conversation at each user message."""
+    turns: list[list[genai_types.Content]] = []
+    for content in contents:
+        if not turns or _is_user_message(content):
+            turns.append([])
+        turns[-1].append(content)
+    return turns
+
+
+def _brief(result: dict) -> dict:
+    """Headline figures of a tool result: scalars up to one level deep, list lengths."""
+    brief = {}
+    for key, value in expand(result).items():
+        items = value.items() if isinstance(value, dict) else [(None, value)]
+        for sub, leaf in items:
+            name = f"{key}.{sub}" if sub else key
+            if isinstance(leaf, list):
+                brief[name] = f"{len(leaf)} items"
+            elif isinstance(leaf, (int, float, bool)) or (isinstance(leaf, str) and len(leaf) <= 60):
+                brief[name] = leaf
+            if len(brief) >= BRIEF_FIELDS:
+                return brief
+    return brief
+
+
+def _collapse_tool_results(turn: list[genai_types.Content], number: int) -> list[genai_types.Content]:
+    collapsed = []
+    for content in turn:
+        parts = []
+        for part in content.parts or []:
+            response = part.function_response
+            if response is not None and not (response.response or {}).get("_omitted"):
+                part = genai_types.Part(function_response=genai_types.FunctionResponse(
+                    id=response.id,
+                    name=response.name,
+                    response={
+                        "_omitted": f"full result shown in turn {number}; call the tool again for details",
+                        "brief": _brief(response.response or {}),
+                    },
+                ))
+            parts.append(part)
+        collapsed.append(genai_types.Content(role=content.role, parts=parts))
+    return collapsed
+
+
+def _snippet(text: str, role: str) -> str:
+    text = " ".join(text.split())
+    limit = SNIPPET_CHARS[role]
+    return text if len(text) <= limit else text[:limit].rstrip() + "..."
+
+
+def _summary_line(turn: list[genai_types.Content], number: int) -> str:
+    asked, calls, reply = "", [], ""
+    for content in turn:
+        for part in content.parts or []:
+            if part.text and not part.thought:
+                if content.role == "user" and not asked:
+                    asked = _snippet(REQUEST_PREFIX_RE.sub("", part.text), "user")
+                elif content.role == "model":
+                    reply = part.text
+            elif part.function_call:
+                args = ", ".join(f"{k}={v}" for k, v in (part.function_call.args or {}).items())
+                calls.append(f"{part.function_call.name}({args})")
+    line = f"- Turn {number}: user asked \"{asked}\""
+    if calls:
+        line += f"; you called {'; '.join(calls)}"
+    if reply:
+        line += f"; you replied \"{_snippet(reply, 'model')}\""
+    return line
+
+
+def _profile(contents: list[genai_types.Content]) -> str | None:
+    profile = None
+    for content in contents:
+        if content.role == "user":
+            for part in content.parts or []:
+                if part.text and (match := PROFILE_RE.search(part.text)):
+                    profile = match.group(0)
+    return profile
+
+
+def compact_contents(
+    contents: list[genai_types.Content], budget: int, keep_turns: int = 2, fixed_tokens: int = 0
+) -> list[genai_types.Content]:
+    """``contents`` shrunk to fit ``budget`` tokens (with ``fixed_tokens`` already spent) where possible.
+
+    The last ``keep_turns`` turns are never changed. Returns new Content
+    objects for the rewritten turns; ``contents`` itself is not modified.
+    """
+    turns = _turns(contents)
+    sizes = [content_tokens(t) for t in turns]
+    old = max(0, len(turns) - max(1, keep_turns))
+    total = fixed_tokens + sum(sizes)
+
+    for i in range(old):
+        if total <= budget:
+            break
+        turns[i] = _collapse_tool_results(turns[i], i + 1)
+        collapsed = content_tokens(turns[i])
+        total -= sizes[i] - collapsed
+        sizes[i] = collapsed
+
+    summary: list[genai_types.Content] = []
+    summarized = 0
+    profile = _profile(contents)
+    while summarized < old and total > budget:
+        total -= sizes[summarized] + content_tokens(summary)
+        summarized += 1
+        lines = ["Summary of the earlier conversation (full details were shown at the time):"]
+        if profile:
+            lines.insert(0, f"Confirmed profile (pinned): {profile}")
+        lines += [_summary_line(turns[i], i + 1) for i in range(summarized)]
+        summary = [genai_types.Content(role="user", parts=[genai_types.Part(text="\n".join(lines))])]
+        total += content_tokens(summary)
+    return summary + [content for turn in turns[summarized:] for content in turn]
+
+
+def _system_tokens(config: genai_types.GenerateContentConfig | None) -> int:
+    instruction = config.system_instruction if config else None
+    return estimate_tokens(instruction) if isinstance(instruction, str) else 0
+
+
+def compact_context(callback_context, llm_request):
+    """``before_model_callback`` applying the deployment's context budget to ``llm_request``.
+
+    ``CONTEXT_TOKEN_BUDGET`` (default 6000, ``0`` disables) caps the
+    estimated tokens of instruction plus conversation;
+    ``CONTEXT_KEEP_TURNS`` (default 2) recent turns are always sent in full.
+    """
+    budget = int(os.environ.get("CONTEXT_TOKEN_BUDGET", "6000"))
+    keep_turns = int(os.environ.get("CONTEXT_KEEP_TURNS", "2"))
+    fixed = _system_tokens(llm_request.config)
+    before = fixed + content_tokens(llm_request.contents)
+    if 0 < budget < before:
+        llm_request.contents = compact_contents(llm_request.contents, budget, keep_turns, fixed)
+    after = fixed + content_tokens(llm_request.contents)
+    with _reports_lock:
+        report = _reports.setdefault(
+            callback_context.invocation_id, {"calls": 0, "tokens_before": 0, "tokens_after": 0}
+        )
+        _reports.move_to_end(callback_context.invocation_id)
+        report["calls"] += 1
+        report["tokens_before"] += before
+        report["tokens_after"] += after
+        while len(_reports) > REPORTS_KEPT:
+            _reports.popitem(last=False)
+    return None
+
+
+def pop_report(invocation_id: str) -> dict | None:
+    """Estimated request tokens before and after compaction, summed over the turn's model calls."""
+    with _reports_lock:
+        report = _reports.pop(invocation_id, None)
+    if report is not None:
+        report["tokens_saved"] = report["tokens_before"] - report["tokens_after"]
+    return report
@@ -0,0 +1,235 @@
+"""A local stand-in for Gemini, for load and latency testing without network.
+
+Set ``GEMINI_MODEL=offline/rules`` or ``GEMINI_MODEL=offline/script`` and
+``root_agent`` runs the whole ``Runner`` pipeline (callbacks, real tool
+calls, session events, streaming) against ``OfflineLlm``:
+
+- ``offline/rules`` reads the latest user message: words about workouts,
+  diet or videos (or "everything") make it call the matching tools with the
+  arguments from the "My profile: ..." line sent earlier in the
+  conversation, and once the results are back it replies with their headline
+  figures. Anything else gets a fixed coaching reply (greeting the user by
+  name when the message carries the profile).
+- ``offline/script`` replays ``OFFLINE_SCRIPT``, a JSON list of
+  ``{"match": regex, "steps": [...]}`` entries. The first entry whose
+  ``match`` is found in the latest user message (no ``match`` = any) is
+  used, and each model call in the turn takes the next step:
+  ``{"calls": [{"name": ..., "args": {...}}]}`` or ``{"text": ...}``.
+
+Latency is drawn per model call from ``OFFLINE_LATENCY_MS`` (before the
+first chunk) and per word from ``OFFLINE_TOKEN_MS``; both take ``300``
+(fixed), ``uniform:200,600``, ``normal:800,200`` (mean, sd) or
+``lognormal:800,0.5`` (median, sigma). ``OFFLINE_SEED`` makes the draws
+repeatable. Usage metadata carries the ``utils.compact`` token estimates.
+"""
+
+import asyncio
+import json
+import math
+import os
+import random
+import re
+from collections.abc import AsyncGenerator, Callable
+from pathlib import Path
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types as genai_types
+from pydantic import PrivateAttr
+
+from .context_compaction import content_tokens
+from .prefetch import tool_args
+from .utils.compact import estimate_tokens, expand
+
+PROFILE_RE = re.compile(r"My profile: ([^\n]*)")
+NAME_RE = re.compile(r"My profile: Name=([^,]+),")
+PROFILE_FIELDS = {
+    "Age": "age", "Weight": "weight_kg", "Height": "height_cm", "Gender": "gender", "Goal": "goal",
+    "Fitness Level": "fitness_level", "Diet Preference": "diet_preference", "Cuisine": "cuisine_preference",
+    "Workout Days/Week": "workout_days_per_week", "Equipment": "equipment_access",
+}
+DEFAULT_PROFILE = {
+    "age": 30, "weight_kg": 70.0, "height_cm": 170.0, "gender": "male", "goal": "health_maintenance",
+    "fitness_level": "beginner", "diet_preference": "vegetarian", "cuisine_preference": "indian",
+    "workout_days_per_week": 4, "equipment_access": "none",
+}
+RULES = [
+    (re.compile(r"\b(everything|all of (it|them|the above))\b", re.I),
+     ["get_workout_plan", "get_diet_plan", "get_youtube_recommendations"]),
+    (re.compile(r"\b(workout|exercise|training|routine|gym)\w*", re.I), ["get_workout_plan"]),
+    (re.compile(r"\b(diet|meal|calorie|nutrition|macro|food|eat)\w*", re.I), ["get_diet_plan"]),
+    (re.compile(r"\b(video|youtube|watch)\w*", re.I), ["get_youtube_recommendations"]),
+]
+TITLES = {
+    "get_workout_plan": "Workout plan",
+    "get_diet_plan": "Diet plan",
+    "get_youtube_recommendations": "Videos",
+}
+COACH_REPLY = (
+    "Happy to help! I can put together a workout plan, a diet plan with your calorie "
+    "targets, or videos for your goal. Which would you like?"
+)
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """A function drawing one latency in seconds from ``spec`` (milliseconds, see module docstring)."""
+    kind, _, params = spec.partition(":") if ":" in spec else ("fixed", "", spec)
+    values = [float(v) for v in params.split(",")]
+    draws = {
+        "fixed": lambda rng: values[0],
+        "uniform": lambda rng: rng.uniform(values[0], values[1]),
+        "normal": lambda rng: rng.gauss(values[0], values[1]),
+        "lognormal": lambda rng: values[0] * math.exp(rng.gauss(0.0, values[1])),
+    }
+    if kind not in draws:
+        raise ValueError(f"Unknown latency distribution {kind!r} in {spec!r}")
+    draw = draws[kind]
+    return lambda rng: max(0.0, draw(rng)) / 1000
+
+
+def _profile(contents: list[genai_types.Content]) -> dict:
+    profile = dict(DEFAULT_PROFILE)
+    for content in contents:
+        if content.role != "user":
+            continue
+        for part in content.parts or []:
+            if part.text and (match := PROFILE_RE.search(part.text)):
+                for field in match.group(1).rstrip(".").split(", "):
+                    label, _, value = field.partition("=")
+                    if label in PROFILE_FIELDS:
+                        profile[PROFILE_FIELDS[label]] = value
+    for name in ("weight_kg", "height_cm"):
+        profile[name] = float(str(profile[name]).removesuffix("kg").removesuffix("cm"))
+    for name in ("age", "workout_days_per_week"):
+        profile[name] = int(profile[name])
+    return profile
+
+
+def _turn(contents: list[genai_types.Content]) -> tuple[str, list[genai_types.Content]]:
+    """The latest user message and the contents after it."""
+    for i in range(len(contents) - 1, -1, -1):
+        content = contents[i]
+        texts = [p.text for p in content.parts or [] if p.text]
+        if content.role == "user" and texts:
+            return "\n".join(texts), contents[i + 1:]
+    return "", contents
+
+
+def _headline(name: str, result: dict) -> str:
+    result = expand(result)
+    if "error" in result:
+        return f"**{TITLES.get(name, name)}**: {result['error']}"
+    figures = [
+        f"{key.replace('_', ' ')} {value}" for key, value in result.items()
+        if isinstance(value, (str, int, float)) and not isinstance(value, bool)
+    ]
+    lines = [f"**{TITLES.get(name, name)}**" + (": " + ", ".join(figures[:6]) if figures else "")]
+    for key, value in result.items():
+        if isinstance(value, dict):
+            lines.append(f"- {key.replace('_', ' ')}: " + ", ".join(
+                f"{k.replace('_', ' ')} {v}" for k, v in value.items() if isinstance(v, (str, int, float))
+            ))
+        elif isinstance(value, list):
+            lines.append(f"- {key.replace('_', ' ')}: {len(value)} items")
+    lines += [f"- {video['title']}: {video['url']}" for video in result.get("videos", [])[:3]]
+    return "\n".join(lines)
+
+
+def _load_script(path: str) -> list[dict]:
+    with open(Path(path)) as f:
+        return json.load(f)
+
+
+class OfflineLlm(BaseLlm):
+    """``BaseLlm`` answering from rules or a script after a simulated delay; see the module docstring."""
+
+    model: str = "offline/rules"
+    _rng: random.Random = PrivateAttr()
+    _latency: Callable = PrivateAttr()
+    _token_delay: Callable = PrivateAttr()
+    _script: list[dict] | None = PrivateAttr(default=None)
+
+    @classmethod
+    def supported_models(cls) -> list[str]:
+        return [r"offline/.*"]
+
+    def model_post_init(self, context):
+        super().model_post_init(context)
+        seed = os.environ.get("OFFLINE_SEED")
+        self._rng = random.Random(int(seed) if seed else None)
+        self._latency = parse_latency(os.environ.get("OFFLINE_LATENCY_MS", "800"))
+        self._token_delay = parse_latency(os.environ.get("OFFLINE_TOKEN_MS", "4"))
+        mode = self.model.removeprefix("offline/")
+        if mode == "script":
+            self._script = _load_script(os.environ["OFFLINE_SCRIPT"])
+        elif mode == "rules":
+            self._script = None
+        else:
+            raise ValueError(f"Unknown offline model {self.model!r}; use offline/rules or offline/script")
+
+    def _rules_step(self, message: str, since: list[genai_types.Content], contents) -> dict:
+        if since:
+            results = [
+                _headline(p.function_response.name, p.function_response.response or {})
+                for c in since for p in c.parts or [] if p.function_response
+            ]
+            return {"text": "\n\n".join(results) or COACH_REPLY}
+        request = PROFILE_RE.sub("", message)
+        for pattern, names in RULES:
+            if pattern.search(request):
+                profile = _profile(contents)
+                return {"calls": [{"name": name, "args": tool_args(name, profile)} for name in names]}
+        if name := NAME_RE.search(message):
+            return {"text": f"Hi {name.group(1)}! {COACH_REPLY}"}
+        return {"text": COACH_REPLY}
+
+    def _script_step(self, message: str, since: list[genai_types.Content]) -> dict:
+        entry = next(
+            (e for e in self._script if re.search(e.get("match", ""), message, re.I)), {"steps": []}
+        )
+        steps = entry["steps"]
+        index = sum(1 for c in since if c.role == "model")
+        return steps[index] if index < len(steps) else {"text": COACH_REPLY}
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        contents = llm_request.contents
+        message, since = _turn(contents)
+        if self._script is None:
+            step = self._rules_step(message, since, contents)
+        else:
+            step = self._script_step(message, since)
+        prompt_tokens = content_tokens(contents)
+        await asyncio.sleep(self._latency(self._rng))
+
+        if "calls" in step:
+            parts = [
+                genai_types.Part(function_call=genai_types.FunctionCall(name=c["name"], args=c.get("args", {})))
+                for c in step["calls"]
+            ]
+            yield LlmResponse(
+                content=genai_types.Content(role="model", parts=parts),
+                usage_metadata=self._usage(prompt_tokens, estimate_tokens(step["calls"])),
+            )
+            return
+
+        text = step["text"]
+        if stream:
+            for word in re.findall(r"\S+\s*", text):
+                await asyncio.sleep(self._token_delay(self._rng))
+                yield LlmResponse(
+                    content=genai_types.Content(role="model", parts=[genai_types.Part(text=word)]),
+                    partial=True,
+                )
+        yield LlmResponse(
+            content=genai_types.Content(role="model", parts=[genai_types.Part(text=text)]),
+            usage_metadata=self._usage(prompt_tokens, estimate_tokens(text)),
+        )
+
+    @staticmethod
+    def _usage(prompt: int, candidates: int) -> genai_types.GenerateContentResponseUsageMetadata:
+        return genai_types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=prompt, candidates_token_count=candidates, total_token_count=prompt + candidates,
+        )
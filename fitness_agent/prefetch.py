@@ -0,0 +1,197 @@
+"""Speculative prefetch of tool results when a profile is saved.
+
+Saving the profile fixes every argument the tools need, so their results are
+computed right away on a small thread pool, off the Streamlit render thread.
+Each owner (an ADK session) has at most one batch of prefetched results,
+keyed by the hash of the profile it was computed for. Saving a different
+profile supersedes the batch: queued work is cancelled and results still
+being computed are discarded when they finish. Each batch is stamped with
+``data_version()`` when it is submitted, and a batch whose reference data
+has changed since (a catalog reload) is dropped instead of served.
+
+Lookups match on the tool name and its normalized arguments, so a result is
+served both to the quick actions and to the model's own tool calls (through
+the agent's ``before_tool_callback``). The callback runs on the shared agent
+event loop, so it only serves results that are already computed; a prefetch
+still running is left to finish and the tool (memoized) runs as usual.
+``Prefetcher.call``, used from the Streamlit thread, waits for it instead of
+computing the result twice.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .tools import get_diet_plan, get_workout_plan, get_youtube_recommendations
+from .utils.data_loader import data_version
+from .utils.memo import normalize_arg
+
+TOOLS = {
+    "get_workout_plan": get_workout_plan,
+    "get_diet_plan": get_diet_plan,
+    "get_youtube_recommendations": get_youtube_recommendations,
+}
+_SIGNATURES = {name: inspect.signature(tool) for name, tool in TOOLS.items()}
+
+
+def tool_args(tool_name: str, profile: dict) -> dict:
+    """The arguments of ``tool_name`` taken from ``profile`` (tool argument names -> values)."""
+    parameters = _SIGNATURES[tool_name].parameters
+    return {name: profile[name] for name in parameters if name in profile}
+
+
+def _args_key(tool_name: str, args: dict) -> tuple | None:
+    try:
+        bound = _SIGNATURES[tool_name].bind(**args)
+    except TypeError:
+        return None
+    bound.apply_defaults()
+    return tuple(normalize_arg(v) for v in bound.arguments.values())
+
+
+def profile_key(profile: dict) -> str:
+    normalized = {k: normalize_arg(v) for k, v in profile.items()}
+    return hashlib.sha1(json.dumps(normalized, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+class _Batch:
+    def __init__(self, key: str, version: int):
+        self.key = key
+        self.version = version
+        self.futures: dict[str, tuple[tuple, Future]] = {}
+        self.used = False
+
+
+class Prefetcher:
+    """Per-owner prefetched tool results, computed on a thread pool."""
+
+    def __init__(self, workers: int = 2, max_owners: int = 256):
+        self.workers = workers
+        self.max_owners = max_owners
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="prefetch") if workers > 0 else None
+        self._batches: OrderedDict[str, _Batch] = OrderedDict()
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.hits = 0
+        self.waits = 0
+        self.misses = 0
+        self.stale = 0
+        self.cancelled = 0
+
+    def submit(self, owner: str, profile: dict) -> str | None:
+        """Start computing every tool's result for ``profile``; returns the profile key.
+
+        Resubmitting the same profile keeps the existing batch.
+        """
+        if self._executor is None:
+            return None
+        key = profile_key(profile)
+        version = data_version()
+        with self._lock:
+            current = self._batches.get(owner)
+            if current is not None and current.key == key and current.version == version:
+                self._batches.move_to_end(owner)
+                return key
+            if current is not None:
+                self._drop(current)
+            batch = _Batch(key, version)
+            for name, tool in TOOLS.items():
+                args = tool_args(name, profile)
+                batch.futures[name] = (_args_key(name, args), self._executor.submit(tool, **args))
+                self.submitted += 1
+            self._batches[owner] = batch
+            self._batches.move_to_end(owner)
+            while len(self._batches) > self.max_owners:
+                _, evicted = self._batches.popitem(last=False)
+                self._drop(evicted)
+        return key
+
+    def _drop(self, batch: _Batch):
+        if batch.used:
+            return
+        for _, future in batch.futures.values():
+            if future.cancel():
+                self.cancelled += 1
+            else:
+                self.stale += 1
+
+    def lookup(self, owner: str | None, tool_name: str, args: dict, wait: bool = True) -> dict | None:
+        """The prefetched result of ``tool_name(**args)`` for ``owner``, or None.
+
+        With ``wait=False`` a prefetch still running counts as a miss.
+        """
+        version = data_version()
+        with self._lock:
+            batch = self._batches.get(owner) if owner is not None else None
+            if batch is not None and batch.version != version:
+                del self._batches[owner]
+                batch.used = False
+                self._drop(batch)
+                batch = None
+            entry = batch.futures.get(tool_name) if batch is not None else None
+            if entry is None or entry[0] != _args_key(tool_name, args):
+                self.misses += 1
+                return None
+            future = entry[1]
+            if not wait and not future.done():
+                self.misses += 1
+                return None
+            batch.used = True
+            if future.done():
+                self.hits += 1
+            else:
+                self.waits += 1
+        try:
+            return future.result()
+        except Exception:
+            return None
+
+    def call(self, owner: str | None, tool_name: str, args: dict) -> dict:
+        """``tool_name(**args)``, served from the prefetch when it matches."""
+        result = self.lookup(owner, tool_name, args)
+        if result is None:
+            result = TOOLS[tool_name](**args)
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            served = self.hits + self.waits
+            lookups = served + self.misses
+            return {
+                "owners": len(self._batches),
+                "submitted": self.submitted,
+                "hits": self.hits,
+                "waits": self.waits,
+                "misses": self.misses,
+                "hit_rate": round(served / lookups, 4) if lookups else 0.0,
+                "stale": self.stale,
+                "cancelled": self.cancelled,
+            }
+
+
+_prefetcher: Prefetcher | None = None
+_prefetcher_lock = threading.Lock()
+
+
+def get_prefetcher() -> Prefetcher:
+    """The process-wide prefetcher; ``PREFETCH_WORKERS`` threads (default 2, 0 disables)."""
+    global _prefetcher
+    if _prefetcher is None:
+        with _prefetcher_lock:
+            if _prefetcher is None:
+                _prefetcher = Prefetcher(workers=int(os.environ.get("PREFETCH_WORKERS", "2")))
+    return _prefetcher
+
+
+def serve_prefetched(tool, args: dict, tool_context) -> dict | None:
+    """``before_tool_callback`` answering a tool call from the session's finished prefetch.
+
+    Never blocks: it runs on the event loop every session shares.
+    """
+    if tool.name not in TOOLS:
+        return None
+    return get_prefetcher().lookup(tool_context.session.id, tool.name, args, wait=False)
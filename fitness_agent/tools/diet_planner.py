@@ -1,7 +1,16 @@
-from ..utils.data_loader import get_diet_for_profile
+from ..tracing import traced
+from ..utils.data_loader import data_version, get_diet_for_profile
 from ..utils.calculations import calculate_bmi, calculate_tdee, calculate_macros
+from ..utils.compact import shape_tool_output
+from ..utils.meal_solver import solve_day
+from ..utils.memo import memoize
 
+# Only the catalog lookup is cached: the BMI/TDEE/macro arithmetic is cheaper
+# than a cache probe and depends on continuous inputs that rarely repeat.
+_get_meals = memoize("get_diet_plan.meals", version=data_version)(get_diet_for_profile)
 
+
+@traced("tool.get_diet_plan")
 def get_diet_plan(
     goal: str,
     weight_kg: float,
@@ -25,16 +34,23 @@ def get_diet_plan(
         gender: User's gender for BMR calculation - 'male' or 'female'. Defaults to 'male'.
 
     Returns:
-        A dictionary containing BMI, calorie targets, macro breakdown, and meal suggestions.
+        A dictionary containing BMI, calorie targets, macro breakdown, meal suggestions,
+        and a recommended day plan picking one meal per slot closest to the targets.
     """
     bmi_info = calculate_bmi(weight_kg, height_cm)
     tdee_info = calculate_tdee(weight_kg, height_cm, age, workout_days_per_week, goal, gender)
     macro_info = calculate_macros(tdee_info["target_calories"], goal)
-    meals = get_diet_for_profile(goal, diet_preference, cuisine_preference)
+    meals = _get_meals(goal, diet_preference, cuisine_preference)
 
-    return {
+    result = {
         "bmi": bmi_info,
         "calories": tdee_info,
         "macros": macro_info,
         "meal_plan": meals,
     }
+    if "error" not in meals:
+        targets = {"calories": tdee_info["target_calories"], **macro_info}
+        plans = solve_day(meals["goal"], meals["diet_preference"], meals["cuisine"], targets)
+        if plans:
+            result["recommended_day"] = plans[0]
+    return shape_tool_output(result)
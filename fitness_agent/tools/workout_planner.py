@@ -1,6 +1,11 @@
-from ..utils.data_loader import get_workout_for_profile
+from ..tracing import traced
+from ..utils.compact import shape_tool_output
+from ..utils.data_loader import data_version, get_workout_for_profile
+from ..utils.memo import memoize
 
 
+@memoize("get_workout_plan", version=data_version)
+@traced("tool.get_workout_plan")
 def get_workout_plan(
     goal: str,
     fitness_level: str,
@@ -24,4 +29,4 @@ def get_workout_plan(
         equipment=equipment_access,
         days_per_week=workout_days_per_week,
     )
-    return result
+    return shape_tool_output(result)
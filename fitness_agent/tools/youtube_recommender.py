@@ -1,6 +1,11 @@
-from ..utils.data_loader import get_videos_for_profile
+from ..tracing import traced
+from ..utils.compact import shape_tool_output
+from ..utils.data_loader import data_version, get_videos_for_profile
+from ..utils.memo import memoize
 
 
+@memoize("get_youtube_recommendations", version=data_version)
+@traced("tool.get_youtube_recommendations")
 def get_youtube_recommendations(
     goal: str,
     fitness_level: str,
@@ -21,4 +26,4 @@ def get_youtube_recommendations(
         fitness_level=fitness_level,
         content_type=content_type,
     )
-    return result
+    return shape_tool_output(result)
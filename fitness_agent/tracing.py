@@ -0,0 +1,301 @@
+"""Per-turn tracing: nested, timed spans handed to pluggable exporters.
+
+A chat turn opens a trace with ``trace(name)``. Inside it, ``span(name)``
+and the ``traced(name)`` decorator record child spans, and ``add_span``
+records one timed by the caller (e.g. between two ADK events). The current
+span lives in a context variable, so spans nest through function calls,
+asyncio tasks and ``AgentLoop`` jobs, which all copy the caller's context.
+Work on threads that did not inherit it (the prefetch pool) is not
+recorded, and neither is anything outside a trace.
+
+When the outermost span ends, the trace's spans are passed as dicts to every
+exporter: ``JsonLinesExporter`` appends one JSON object per span to a file
+and ``MemoryExporter`` keeps the latest traces in memory. Any object with an
+``export(spans)`` method can be added with ``add_exporter``. ``TRACE_EXPORT``
+(``jsonl``, ``memory`` or both, comma-separated) sets up the built-in ones;
+``TRACE_PATH`` is the JSON-lines file. With no exporter, tracing costs one
+context-variable lookup per instrumented call.
+
+Span names are ``<category>.<what>``; ``breakdown`` sums a trace's time per
+category (model, tool, data, history, render).
+"""
+
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
+from contextvars import ContextVar
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRACE_PATH = Path("fitness_agent/data/traces.jsonl")
+CATEGORIES = ("model", "tool", "data", "history", "render")
+
+_current: ContextVar["Span | None"] = ContextVar("trace_span", default=None)
+_last_trace_id: ContextVar[str | None] = ContextVar("last_trace_id", default=None)
+_exporters: list = []
+_exporters_lock = threading.Lock()
+_configured = False
+
+
+class _Trace:
+    def __init__(self):
+        self.trace_id = os.urandom(8).hex()
+        self.started = time.perf_counter()
+        self.wall_start = time.time()
+        self.spans: list[Span] = []
+        self.lock = threading.Lock()
+
+
+class Span:
+    """One timed operation; ``set`` adds attributes while it is open."""
+
+    def __init__(self, trace: _Trace, parent: "Span | None", name: str, attrs: dict,
+                 start: float | None = None):
+        self.trace = trace
+        self.trace_id = trace.trace_id
+        self.span_id = os.urandom(4).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.name = name
+        self.attrs = attrs
+        self.thread = threading.current_thread().name
+        self.start = time.perf_counter() if start is None else start
+        self.end: float | None = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def finish(self, end: float | None = None):
+        self.end = time.perf_counter() if end is None else end
+        with self.trace.lock:
+            self.trace.spans.append(self)
+
+    def to_dict(self) -> dict:
+        started = self.trace.started
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ms": round((self.start - started) * 1000, 3),
+            "duration_ms": round((self.end - self.start) * 1000, 3),
+            "timestamp": round(self.trace.wall_start + self.start - started, 6),
+            "thread": self.thread,
+            "attrs": self.attrs,
+        }
+
+
+class _NullSpan:
+    trace_id = None
+
+    def set(self, **attrs):
+        pass
+
+
+_NOOP = nullcontext(_NullSpan())
+
+
+class _SpanScope:
+    def __init__(self, trace: _Trace, parent: Span | None, name: str, attrs: dict):
+        self._trace = trace
+        self._parent = parent
+        self._name = name
+        self._attrs = attrs
+
+    def __enter__(self) -> Span:
+        self._span = Span(self._trace, self._parent, self._name, self._attrs)
+        self._token = _current.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None and issubclass(exc_type, Exception):
+            self._span.set(error=exc_type.__name__)
+        self._span.finish()
+        try:
+            _current.reset(self._token)
+        except ValueError:
+            # Closed from another context (an async generator finalized late).
+            pass
+        if self._parent is None:
+            _last_trace_id.set(self._trace.trace_id)
+            _export(self._trace)
+        return False
+
+
+def trace(name: str, **attrs):
+    """Open a trace, or a child span when one is already open. A no-op without exporters."""
+    parent = _current.get()
+    if parent is not None:
+        return _SpanScope(parent.trace, parent, name, attrs)
+    if not exporters():
+        return _NOOP
+    return _SpanScope(_Trace(), None, name, attrs)
+
+
+def span(name: str, **attrs):
+    """A child span of the current one; does nothing outside a trace."""
+    parent = _current.get()
+    if parent is None:
+        return _NOOP
+    return _SpanScope(parent.trace, parent, name, attrs)
+
+
+def add_span(name: str, start: float, end: float, **attrs):
+    """Record a finished child span timed with ``time.perf_counter()`` values."""
+    parent = _current.get()
+    if parent is not None:
+        Span(parent.trace, parent, name, attrs, start=start).finish(end)
+
+
+def traced(name: str, **attrs):
+    """Decorator recording each call of the function as a span named ``name``."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            parent = _current.get()
+            if parent is None:
+                return func(*args, **kwargs)
+            with _SpanScope(parent.trace, parent, name, dict(attrs)):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def last_trace_id() -> str | None:
+    """The id of the last trace finished in this context (e.g. this Streamlit script run)."""
+    return _last_trace_id.get()
+
+
+# ── Exporters ────────────────────────────────────────────────────────────────
+
+class JsonLinesExporter:
+    """Append each span as one JSON line; a trace is written with a single ``write``."""
+
+    def __init__(self, path: str | Path = DEFAULT_TRACE_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def export(self, spans: list[dict]):
+        lines = "".join(json.dumps(s, default=str) + "\n" for s in spans)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(lines)
+
+
+class MemoryExporter:
+    """Keep the spans of the last ``max_traces`` traces, by trace id."""
+
+    def __init__(self, max_traces: int = 100):
+        self.max_traces = max_traces
+        self._traces: OrderedDict[str, list[dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def export(self, spans: list[dict]):
+        if not spans:
+            return
+        with self._lock:
+            self._traces[spans[0]["trace_id"]] = spans
+            while len(self._traces) > self.max_traces:
+                self._traces.popitem(last=False)
+
+    def get(self, trace_id: str) -> list[dict] | None:
+        with self._lock:
+            return self._traces.get(trace_id)
+
+    def traces(self) -> list[list[dict]]:
+        with self._lock:
+            return list(self._traces.values())
+
+    def clear(self):
+        with self._lock:
+            self._traces.clear()
+
+
+def _from_env() -> list:
+    built = []
+    for kind in filter(None, (k.strip() for k in os.environ.get("TRACE_EXPORT", "").split(","))):
+        if kind == "jsonl":
+            built.append(JsonLinesExporter(os.environ.get("TRACE_PATH", DEFAULT_TRACE_PATH)))
+        elif kind == "memory":
+            built.append(MemoryExporter())
+        else:
+            raise ValueError(f"Unknown TRACE_EXPORT {kind!r}; use jsonl, memory or both")
+    return built
+
+
+def exporters() -> list:
+    """The registered exporters, set up from ``TRACE_EXPORT`` on first use."""
+    global _configured
+    if not _configured:
+        with _exporters_lock:
+            if not _configured:
+                _exporters.extend(_from_env())
+                _configured = True
+    return _exporters
+
+
+def add_exporter(exporter):
+    exporters()
+    with _exporters_lock:
+        _exporters.append(exporter)
+
+
+def remove_exporter(exporter):
+    with _exporters_lock:
+        if exporter in _exporters:
+            _exporters.remove(exporter)
+
+
+def memory_exporter() -> MemoryExporter:
+    """The registered ``MemoryExporter``, adding one if there is none."""
+    for exporter in exporters():
+        if isinstance(exporter, MemoryExporter):
+            return exporter
+    exporter = MemoryExporter()
+    add_exporter(exporter)
+    return exporter
+
+
+def _export(trace: _Trace):
+    with trace.lock:
+        spans = sorted(trace.spans, key=lambda s: s.start)
+    records = [s.to_dict() for s in spans]
+    for exporter in list(exporters()):
+        try:
+            exporter.export(records)
+        except Exception:
+            logger.exception("trace exporter %s failed", type(exporter).__name__)
+
+
+def breakdown(spans: list[dict]) -> dict[str, float]:
+    """Milliseconds of the trace spent in each category, overlaps counted once.
+
+    ``other`` is the root span's time not covered by any category.
+    """
+    root = next((s for s in spans if s["parent_id"] is None), None)
+    intervals: dict[str, list[tuple[float, float]]] = {c: [] for c in CATEGORIES}
+    for s in spans:
+        category = s["name"].split(".", 1)[0]
+        if category in intervals:
+            intervals[category].append((s["start_ms"], s["start_ms"] + s["duration_ms"]))
+    totals = {c: _union_ms(iv) for c, iv in intervals.items()}
+    if root is not None:
+        covered = _union_ms([iv for ivs in intervals.values() for iv in ivs])
+        totals["other"] = max(0.0, root["duration_ms"] - covered)
+    return {c: round(ms, 1) for c, ms in totals.items()}
+
+
+def _union_ms(intervals: list[tuple[float, float]]) -> float:
+    total, end = 0.0, float("-inf")
+    for start, stop in sorted(intervals):
+        if stop <= end:
+            continue
+        total += stop - max(start, end)
+        end = stop
+    return total
@@ -1,2 +1,4 @@
+from .catalog import Catalog, get_catalog, reload_catalog
 from .data_loader import load_workout_data, load_diet_data, load_youtube_data
 from .calculations import calculate_bmi, calculate_tdee, calculate_macros
+from .memo import cache_stats, clear_caches
@@ -0,0 +1,126 @@
+"""Vectorized BMI, BMR, TDEE and macro calculations for many users at once.
+
+Each function takes columnar inputs (anything ``np.asarray`` accepts) and
+returns a NumPy structured array whose fields mirror the dict keys of the
+scalar functions in ``calculations.py``. Results are identical to calling
+the scalar functions row by row, including Python's rounding, and the
+lookup tables (``ACTIVITY_MULTIPLIERS``, ``MACRO_SPLITS`` ...) are read at
+call time so a nightly recompute picks up any change to them.
+"""
+
+import numpy as np
+
+from . import calculations
+
+BMI_DTYPE = np.dtype([("bmi", "f8"), ("category", "U11")])
+TDEE_DTYPE = np.dtype([
+    ("bmr", "f8"),
+    ("maintenance_calories", "f8"),
+    ("target_calories", "f8"),
+    ("adjustment", "i8"),
+])
+MACROS_DTYPE = np.dtype([
+    ("protein_g", "f8"),
+    ("carbs_g", "f8"),
+    ("fat_g", "f8"),
+    ("protein_pct", "i8"),
+    ("carbs_pct", "i8"),
+    ("fat_pct", "i8"),
+])
+METRICS_DTYPE = np.dtype(BMI_DTYPE.descr + TDEE_DTYPE.descr + MACROS_DTYPE.descr)
+
+
+def _round(values: np.ndarray, ndigits: int) -> np.ndarray:
+    """``round(x, ndigits)`` elementwise, bit-for-bit like the builtin.
+
+    ``np.round`` scales by ``10**ndigits`` before rounding, which can land on
+    the other side of a tie than Python's correctly-rounded ``round``. Only
+    the few values within rounding error of a tie are redone with the builtin.
+    """
+    rounded = np.round(values, ndigits)
+    if ndigits == 0:
+        return rounded
+    scaled = values * 10.0 ** ndigits
+    near_tie = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-6
+    for i in np.flatnonzero(near_tie):
+        rounded[i] = round(float(values[i]), ndigits)
+    return rounded
+
+
+def _lookup(keys, table: dict, default) -> np.ndarray:
+    """Map each key through ``table`` with ``dict.get`` semantics.
+
+    The tables have a handful of entries, so one vectorized equality mask per
+    entry beats factorizing a million-row column.
+    """
+    keys = np.asarray(keys)
+    out = np.full(keys.shape, default, dtype=np.result_type(default, *table.values()))
+    for key, value in table.items():
+        out[keys == key] = value
+    return out
+
+
+def batch_bmi(weight_kg, height_cm) -> np.ndarray:
+    weight_kg = np.asarray(weight_kg, dtype="f8")
+    height_m = np.asarray(height_cm, dtype="f8") / 100
+    bmi = _round(weight_kg / (height_m ** 2), 1)
+
+    out = np.empty(bmi.shape, dtype=BMI_DTYPE)
+    out["bmi"] = bmi
+    out["category"] = np.select(
+        [bmi < 18.5, bmi < 25, bmi < 30],
+        ["Underweight", "Normal", "Overweight"],
+        default="Obese",
+    )
+    return out
+
+
+def batch_bmr(weight_kg, height_cm, age, gender) -> np.ndarray:
+    """Mifflin-St Jeor equation; ``gender`` is an array of strings like ``"male"``."""
+    weight_kg = np.asarray(weight_kg, dtype="f8")
+    height_cm = np.asarray(height_cm, dtype="f8")
+    age = np.asarray(age, dtype="i8")
+    bmr = 10 * weight_kg + 6.25 * height_cm - 5 * age
+    bmr = bmr + np.where(np.asarray(gender) == "male", 5, -161)
+    return _round(bmr, 0)
+
+
+def batch_tdee(weight_kg, height_cm, age, workout_days, goal, gender) -> np.ndarray:
+    bmr = batch_bmr(weight_kg, height_cm, age, gender)
+    multiplier = _lookup(workout_days, calculations.ACTIVITY_MULTIPLIERS, 1.55)
+    maintenance = _round(bmr * multiplier, 0)
+    adjustment = _lookup(goal, calculations.GOAL_CALORIE_ADJUSTMENTS, 0)
+
+    out = np.empty(bmr.shape, dtype=TDEE_DTYPE)
+    out["bmr"] = bmr
+    out["maintenance_calories"] = maintenance
+    out["target_calories"] = _round(maintenance + adjustment, 0)
+    out["adjustment"] = adjustment
+    return out
+
+
+def batch_macros(target_calories, goal) -> np.ndarray:
+    target_calories = np.asarray(target_calories, dtype="f8")
+    default = calculations.MACRO_SPLITS["health_maintenance"]
+    out = np.empty(target_calories.shape, dtype=MACROS_DTYPE)
+    for macro, kcal_per_g in (("protein", 4), ("carbs", 4), ("fat", 9)):
+        share = _lookup(
+            goal, {g: split[macro] for g, split in calculations.MACRO_SPLITS.items()},
+            default[macro],
+        )
+        out[f"{macro}_g"] = _round(target_calories * share / kcal_per_g, 0)
+        out[f"{macro}_pct"] = (share * 100).astype("i8")
+    return out
+
+
+def batch_profile_metrics(weight_kg, height_cm, age, gender, workout_days, goal) -> np.ndarray:
+    """BMI, TDEE and macros for every row, as one structured array."""
+    bmi = batch_bmi(weight_kg, height_cm)
+    tdee = batch_tdee(weight_kg, height_cm, age, workout_days, goal, gender)
+    macros = batch_macros(tdee["target_calories"], goal)
+
+    out = np.empty(bmi.shape, dtype=METRICS_DTYPE)
+    for part in (bmi, tdee, macros):
+        for name in part.dtype.names:
+            out[name] = part[name]
+    return out
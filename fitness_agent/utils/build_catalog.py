@@ -0,0 +1,68 @@
+"""Compile the JSON reference data into the catalog artifact.
+
+Usage (from the repository root):
+
+    python -m fitness_agent.utils.build_catalog [--output PATH] [--report]
+
+Run it whenever ``fitness_agent/data/`` changes, e.g. as a container build
+step after the source is copied in. The loader falls back to the JSON files
+when the artifact is missing or older than its sources.
+
+Besides the lookup indexes, the artifact holds every workout variant
+(goal x level x equipment x 3-6 days) and meal variant (goal x diet x
+cuisine, including ``flexible``) as ready-to-serve results and serialized
+payloads. ``--report`` lists each combination that is served through a
+fallback instead of its own data.
+"""
+
+import argparse
+import os
+import time
+from pathlib import Path
+
+from .catalog import Catalog, DATA_DIR, DEFAULT_ARTIFACT_PATH, load_shards, write_artifact
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--data-dir", type=Path, default=DATA_DIR,
+        help="Directory containing workouts/, diet_plans/ and youtube_videos/",
+    )
+    parser.add_argument(
+        "--output", type=Path,
+        default=Path(os.environ.get("CATALOG_ARTIFACT", DEFAULT_ARTIFACT_PATH)),
+        help="Artifact path (defaults to $CATALOG_ARTIFACT or data/catalog.pkl)",
+    )
+    parser.add_argument(
+        "--report", action="store_true",
+        help="List every combination that is served through a fallback",
+    )
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    shards = load_shards(args.data_dir)
+    write_artifact(shards, args.output)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    catalog = Catalog(shards)
+    payload_bytes = sum(
+        len(payload)
+        for variants in (catalog.workout_variants, catalog.diet_variants)
+        for _, payload in variants.values()
+    )
+    print(
+        f"Wrote {args.output} ({args.output.stat().st_size} bytes, "
+        f"{len(shards)} source files) in {elapsed_ms:.1f} ms"
+    )
+    print(
+        f"Precomputed {len(catalog.workout_variants)} workout and "
+        f"{len(catalog.diet_variants)} meal variants ({payload_bytes} payload bytes); "
+        f"{len(catalog.fallbacks)} served through a fallback"
+    )
+    if args.report:
+        for kind, key, reason in catalog.fallbacks:
+            print(f"  {kind:<15} {'/'.join(map(str, key)):<45} {reason}")
+
+
+if __name__ == "__main__":
+    main()
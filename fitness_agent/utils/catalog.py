@@ -0,0 +1,473 @@
+"""Process-wide, indexed view of the reference data under ``data/``.
+
+Every JSON file is parsed once and flattened into dictionaries keyed by the
+same arguments the tools receive, so serving a tool call is a dict lookup
+instead of a file read plus a nested walk. Values handed out by the catalog
+are shared between callers and must be treated as read-only.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import struct
+import threading
+import time
+from pathlib import Path
+
+from ..models.schemas import CuisinePreference, DietPreference, EquipmentAccess, FitnessLevel
+from .video_index import VideoIndex
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+WORKOUTS = "workouts"
+DIET_PLANS = "diet_plans"
+YOUTUBE_VIDEOS = "youtube_videos"
+KINDS = (WORKOUTS, DIET_PLANS, YOUTUBE_VIDEOS)
+
+# Bump ARTIFACT_VERSION whenever _Shard or an indexer changes shape, so that
+# artifacts built by an older release are rejected instead of misread.
+ARTIFACT_MAGIC = b"FACATLOG"
+ARTIFACT_VERSION = 2
+_ARTIFACT_HEADER = struct.Struct(">8sI32s")
+DEFAULT_ARTIFACT_PATH = DATA_DIR / "catalog.pkl"
+
+FITNESS_LEVELS = tuple(e.value for e in FitnessLevel)
+EQUIPMENT_OPTIONS = tuple(e.value for e in EquipmentAccess)
+DIET_PREFERENCES = tuple(e.value for e in DietPreference)
+CUISINES = tuple(e.value for e in CuisinePreference)
+WORKOUT_DAYS = range(3, 7)
+FLEXIBLE_CUISINE_ORDER = ("indian", "western")
+
+
+def _load_json(filepath: Path) -> dict:
+    with open(filepath, "r") as f:
+        return json.load(f)
+
+
+def _video_matches(video: dict, fitness_level: str, content_type: str) -> bool:
+    return (
+        video.get("level", "") in [fitness_level, "all"]
+        and (content_type == "both" or video.get("type", "") == content_type)
+    )
+
+
+def filter_videos(videos: list, fitness_level: str, content_type: str) -> list:
+    filtered = [v for v in videos if _video_matches(v, fitness_level, content_type)]
+    if not filtered:
+        filtered = videos[:5]
+    return filtered
+
+
+def _serialize(result: dict) -> bytes:
+    return json.dumps(result, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def resolve_workout(
+    plans: dict, levels: dict, goal: str, fitness_level: str, equipment: str, days_per_week: int
+) -> tuple[dict, list[str]]:
+    """Build the workout response from index dicts.
+
+    Returns the response and a list of fallbacks applied to produce it, which
+    the response itself does not reveal.
+    """
+    available = levels.get((goal, fitness_level))
+    if available is None:
+        return {"error": f"No data for fitness level: {fitness_level}"}, []
+
+    fallbacks = []
+    days = plans.get((goal, fitness_level, equipment))
+    if days is None:
+        served = available[0] if available else ""
+        days = plans.get((goal, fitness_level, served))
+        if days is None:
+            return {"error": f"No equipment data found"}, []
+        fallbacks.append(f"equipment {equipment!r} missing, served {served!r}")
+
+    if len(days) > days_per_week:
+        days = days[:days_per_week]
+    elif len(days) < days_per_week:
+        fallbacks.append(f"only {len(days)} of {days_per_week} days available")
+
+    return {
+        "goal": goal,
+        "fitness_level": fitness_level,
+        "equipment": equipment,
+        "days_per_week": len(days),
+        "workout_plan": days,
+    }, fallbacks
+
+
+def resolve_diet(
+    plans: dict, diet_types: set, goal: str, diet_preference: str, cuisine: str
+) -> dict:
+    if (goal, diet_preference) not in diet_types:
+        return {"error": f"No data for diet preference: {diet_preference}"}
+
+    cuisine_data = plans.get((goal, diet_preference, cuisine))
+    if not cuisine_data:
+        return {"error": f"No data for cuisine: {cuisine}"}
+
+    return {
+        "goal": goal,
+        "diet_preference": diet_preference,
+        "cuisine": cuisine,
+        "meals": cuisine_data.get("meals", {}),
+    }
+
+
+def _index_workouts(goal: str, doc: dict) -> dict:
+    index = {"plans": {}, "levels": {}, "variants": {}, "fallbacks": []}
+    for level, level_data in doc.get("levels", {}).items():
+        if not level_data:
+            continue
+        equipment = level_data.get("equipment", {})
+        index["levels"][(goal, level)] = list(equipment.keys())
+        for name, equipment_data in equipment.items():
+            if equipment_data:
+                index["plans"][(goal, level, name)] = equipment_data.get("days", [])
+
+    levels = dict.fromkeys(FITNESS_LEVELS + tuple(level for _, level in index["levels"]))
+    equipment = dict.fromkeys(EQUIPMENT_OPTIONS + tuple(k[2] for k in index["plans"]))
+    for level in levels:
+        for name in equipment:
+            for days in WORKOUT_DAYS:
+                key = (goal, level, name, days)
+                result, fallbacks = resolve_workout(
+                    index["plans"], index["levels"], goal, level, name, days
+                )
+                index["variants"][key] = (result, _serialize(result))
+                if "error" in result:
+                    fallbacks = [result["error"]]
+                for reason in fallbacks:
+                    index["fallbacks"].append((WORKOUTS, key, reason))
+    return index
+
+
+def _index_diets(goal: str, doc: dict) -> dict:
+    index = {"plans": {}, "diet_types": set(), "variants": {}, "fallbacks": []}
+    flexible_sources = {}
+    for diet, diet_data in doc.get("diet_types", {}).items():
+        if not diet_data:
+            continue
+        index["diet_types"].add((goal, diet))
+        cuisines = diet_data.get("cuisines", {})
+        for cuisine, cuisine_data in cuisines.items():
+            if cuisine_data:
+                index["plans"][(goal, diet, cuisine)] = cuisine_data
+        if (goal, diet, "flexible") not in index["plans"]:
+            for c in FLEXIBLE_CUISINE_ORDER:
+                if cuisines.get(c):
+                    index["plans"][(goal, diet, "flexible")] = cuisines[c]
+                    flexible_sources[diet] = c
+                    break
+
+    diets = dict.fromkeys(DIET_PREFERENCES + tuple(diet for _, diet in index["diet_types"]))
+    cuisines = dict.fromkeys(CUISINES + tuple(k[2] for k in index["plans"]))
+    for diet in diets:
+        for cuisine in cuisines:
+            key = (goal, diet, cuisine)
+            result = resolve_diet(index["plans"], index["diet_types"], goal, diet, cuisine)
+            index["variants"][key] = (result, _serialize(result))
+            if "error" in result:
+                index["fallbacks"].append((DIET_PLANS, key, result["error"]))
+            elif cuisine == "flexible" and diet in flexible_sources:
+                index["fallbacks"].append(
+                    (DIET_PLANS, key, f"cuisine 'flexible' served {flexible_sources[diet]!r}")
+                )
+    return index
+
+
+def _index_videos(goal: str, doc: dict) -> dict:
+    videos = doc.get("videos", [])
+    levels = set(FITNESS_LEVELS) | {v.get("level", "") for v in videos}
+    levels.discard("all")
+    types = {v.get("type", "") for v in videos} | {"both"}
+    index = {"all": {goal: videos}, "filtered": {}, "fallbacks": []}
+    for level in sorted(levels):
+        for content_type in sorted(types):
+            filtered = filter_videos(videos, level, content_type)
+            index["filtered"][(goal, level, content_type)] = filtered
+            if filtered and not any(_video_matches(v, level, content_type) for v in videos):
+                index["fallbacks"].append((
+                    YOUTUBE_VIDEOS, (goal, level, content_type),
+                    f"no matching videos, served the first {len(filtered)}",
+                ))
+    return index
+
+
+_INDEXERS = {
+    WORKOUTS: _index_workouts,
+    DIET_PLANS: _index_diets,
+    YOUTUBE_VIDEOS: _index_videos,
+}
+
+
+class _Shard:
+    """One parsed source file together with its index entries."""
+
+    def __init__(self, kind: str, goal: str, signature: tuple, doc: dict):
+        self.kind = kind
+        self.goal = goal
+        self.signature = signature
+        self.doc = doc
+        self.index = _INDEXERS[kind](goal, doc)
+
+
+def _signature(filepath: Path) -> tuple:
+    stat = filepath.stat()
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _load_shard(kind: str, filepath: Path) -> _Shard:
+    signature = _signature(filepath)
+    return _Shard(kind, filepath.stem, signature, _load_json(filepath))
+
+
+def _source_files(data_dir: Path):
+    for kind in KINDS:
+        for filepath in sorted((data_dir / kind).glob("*.json")):
+            yield kind, filepath
+
+
+def load_shards(data_dir: Path = DATA_DIR) -> dict[tuple[str, str], _Shard]:
+    shards = {}
+    for kind, filepath in _source_files(Path(data_dir)):
+        shard = _load_shard(kind, filepath)
+        shards[(kind, shard.goal)] = shard
+    return shards
+
+
+def write_artifact(shards: dict[tuple[str, str], _Shard], path: Path) -> None:
+    """Serialize parsed and indexed shards into a single checksummed file.
+
+    The file is a fixed header (magic, format version, SHA-256 of the body)
+    followed by a pickle of the shards. It is written next to the target and
+    renamed into place so readers never see a partial artifact.
+    """
+    path = Path(path)
+    body = pickle.dumps(shards, protocol=pickle.HIGHEST_PROTOCOL)
+    header = _ARTIFACT_HEADER.pack(
+        ARTIFACT_MAGIC, ARTIFACT_VERSION, hashlib.sha256(body).digest()
+    )
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(body)
+    os.replace(tmp_path, path)
+
+
+def read_artifact(path: Path, data_dir: Path = DATA_DIR) -> dict[tuple[str, str], _Shard] | None:
+    """Load shards from a compiled artifact, or return None if it is unusable.
+
+    An artifact is unusable when it is missing, was written by a different
+    format version, fails its checksum, or is stale -- i.e. the set of source
+    files or any file's mtime/size differs from what it was built from.
+    The artifact is a trusted build product; never point this at a file from
+    an untrusted source, since unpickling can execute code.
+    """
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        logger.warning("Cannot read catalog artifact %s: %s", path, e)
+        return None
+
+    if len(raw) < _ARTIFACT_HEADER.size:
+        logger.warning("Catalog artifact %s is truncated", path)
+        return None
+    magic, version, digest = _ARTIFACT_HEADER.unpack_from(raw)
+    body = memoryview(raw)[_ARTIFACT_HEADER.size:]
+    if magic != ARTIFACT_MAGIC or version != ARTIFACT_VERSION:
+        logger.info("Ignoring catalog artifact %s with format version %s", path, version)
+        return None
+    if hashlib.sha256(body).digest() != digest:
+        logger.warning("Catalog artifact %s failed its checksum", path)
+        return None
+    shards = pickle.loads(body)
+
+    current = {}
+    for kind, filepath in _source_files(Path(data_dir)):
+        current[(kind, filepath.stem)] = _signature(filepath)
+    built = {key: shard.signature for key, shard in shards.items()}
+    if current != built:
+        logger.info("Catalog artifact %s is stale; loading JSON sources", path)
+        return None
+    return shards
+
+
+class Catalog:
+    """An immutable snapshot of all workouts, diet plans and videos.
+
+    Lookups are keyed by ``(goal, level, equipment)`` for workouts,
+    ``(goal, diet, cuisine)`` for meals and ``(goal, level, type)`` for
+    videos. A reload never mutates a published snapshot; it builds a new one
+    and swaps it in, so a caller holding a snapshot always sees one
+    consistent generation.
+    """
+
+    def __init__(self, shards: dict[tuple[str, str], _Shard], generation: int = 0):
+        self.generation = generation
+        self.shards = shards
+        self.documents: dict[tuple[str, str], dict] = {}
+        self.workouts: dict[tuple[str, str, str], list] = {}
+        self.workout_levels: dict[tuple[str, str], list] = {}
+        self.diets: dict[tuple[str, str, str], dict] = {}
+        self.diet_types: set[tuple[str, str]] = set()
+        self.videos: dict[tuple[str, str, str], list] = {}
+        self.videos_by_goal: dict[str, list] = {}
+        self.workout_variants: dict[tuple[str, str, str, int], tuple[dict, bytes]] = {}
+        self.diet_variants: dict[tuple[str, str, str], tuple[dict, bytes]] = {}
+        self.fallbacks: list[tuple[str, tuple, str]] = []
+        for (kind, goal), shard in sorted(shards.items()):
+            self.documents[(kind, goal)] = shard.doc
+            index = shard.index
+            self.fallbacks.extend(index["fallbacks"])
+            if kind == WORKOUTS:
+                self.workouts.update(index["plans"])
+                self.workout_levels.update(index["levels"])
+                self.workout_variants.update(index["variants"])
+            elif kind == DIET_PLANS:
+                self.diets.update(index["plans"])
+                self.diet_types.update(index["diet_types"])
+                self.diet_variants.update(index["variants"])
+            else:
+                self.videos.update(index["filtered"])
+                self.videos_by_goal.update(index["all"])
+        self.video_index = VideoIndex(self.videos_by_goal)
+
+    def document(self, kind: str, goal: str) -> dict | None:
+        return self.documents.get((kind, goal))
+
+    def workout_days(self, goal: str, level: str, equipment: str) -> list | None:
+        return self.workouts.get((goal, level, equipment))
+
+    def meals(self, goal: str, diet: str, cuisine: str) -> dict | None:
+        return self.diets.get((goal, diet, cuisine))
+
+    def video_list(self, goal: str, level: str, content_type: str) -> list | None:
+        videos = self.videos.get((goal, level, content_type))
+        if videos is None and goal in self.videos_by_goal:
+            videos = filter_videos(self.videos_by_goal[goal], level, content_type)
+        return videos
+
+
+class CatalogManager:
+    """Owns the published catalog and hot-reloads it from ``data_dir``.
+
+    Source files are re-stat'ed at most once per ``reload_interval`` seconds
+    (``0`` disables automatic checks), by whichever caller first notices the
+    interval has elapsed. Only files whose mtime or size changed are parsed
+    again; everything else is reused from the previous generation.
+    """
+
+    def __init__(
+        self,
+        data_dir: Path = DATA_DIR,
+        reload_interval: float = 0.0,
+        artifact_path: Path | None = None,
+    ):
+        self.data_dir = Path(data_dir)
+        self.reload_interval = reload_interval
+        self._reload_lock = threading.Lock()
+        self._listeners: list = []
+        self._checked_at = time.monotonic()
+        shards = None
+        if artifact_path is not None:
+            shards = read_artifact(artifact_path, self.data_dir)
+        self.source = "artifact" if shards is not None else "json"
+        if shards is None:
+            shards = load_shards(self.data_dir)
+        self.catalog = Catalog(shards)
+
+    def get(self) -> Catalog:
+        if (
+            self.reload_interval > 0
+            and time.monotonic() - self._checked_at >= self.reload_interval
+            and self._reload_lock.acquire(blocking=False)
+        ):
+            try:
+                self._refresh()
+            finally:
+                self._reload_lock.release()
+        return self.catalog
+
+    def reload(self) -> bool:
+        """Check every source file now; return True if a new generation was published."""
+        with self._reload_lock:
+            return self._refresh()
+
+    def on_reload(self, callback):
+        """Register ``callback(catalog)`` to run after each new generation is published."""
+        self._listeners.append(callback)
+
+    def _refresh(self) -> bool:
+        self._checked_at = time.monotonic()
+        current = self.catalog
+        shards = dict(current.shards)
+        seen = set()
+        changed = False
+        for kind, filepath in _source_files(self.data_dir):
+            key = (kind, filepath.stem)
+            seen.add(key)
+            try:
+                signature = _signature(filepath)
+                previous = shards.get(key)
+                if previous is not None and previous.signature == signature:
+                    continue
+                shards[key] = _load_shard(kind, filepath)
+            except Exception as e:
+                # Editors often save in several writes, and a file can parse
+                # but have the wrong shape (indexing then fails); keep serving
+                # the last good version and retry on the next check.
+                logger.warning("Skipping reload of %s: %r", filepath, e)
+                continue
+            changed = True
+        for key in set(shards) - seen:
+            del shards[key]
+            changed = True
+        if not changed:
+            return False
+
+        try:
+            catalog = Catalog(shards, current.generation + 1)
+        except Exception as e:
+            logger.warning("Keeping catalog generation %d, reload failed: %r", current.generation, e)
+            return False
+        self.catalog = catalog
+        logger.info("Catalog reloaded (generation %d)", self.catalog.generation)
+        for callback in self._listeners:
+            callback(self.catalog)
+        return True
+
+
+_manager: CatalogManager | None = None
+_manager_lock = threading.Lock()
+
+
+def get_catalog_manager() -> CatalogManager:
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = CatalogManager(
+                    reload_interval=float(os.environ.get("CATALOG_RELOAD_INTERVAL", "5")),
+                    artifact_path=Path(
+                        os.environ.get("CATALOG_ARTIFACT", DEFAULT_ARTIFACT_PATH)
+                    ),
+                )
+    return _manager
+
+
+def get_catalog() -> Catalog:
+    """Return the current catalog snapshot, loading it on first use."""
+    return get_catalog_manager().get()
+
+
+def reload_catalog() -> bool:
+    return get_catalog_manager().reload()
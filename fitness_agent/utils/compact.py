@@ -0,0 +1,169 @@
+"""Compact, token-budgeted encoding of tool results for the model context.
+
+``compact`` rewrites a tool result so it costs fewer tokens:
+
+- lists of dicts that share the same keys become ``{"_cols": [...], "_rows": [[...]]}``
+  tables, so keys are written once instead of once per item;
+- long keys are shortened (``SHORT_KEYS``);
+- if a token budget is given, optional fields are dropped in ``DROP_STAGES``
+  order, then the longest tables are truncated, until the result fits.
+
+``expand`` reverses the encoding back to the original key names and list of
+dicts, for UI rendering; dropped fields and truncated rows stay absent and
+are listed under ``_dropped`` / ``_truncated`` of the compact form.
+"""
+
+import json
+import os
+
+FORMAT = "compact/1"
+
+# Read once at import, like the agent instruction that explains the compact
+# format; the memoized tools also keep results already shaped in this mode.
+TOOL_OUTPUT_MODE = os.environ.get("TOOL_OUTPUT_MODE", "full")
+TOOL_TOKEN_BUDGET = int(os.environ.get("TOOL_TOKEN_BUDGET", "1500")) or None
+
+# Short keys must not collide with any key that appears in a tool result.
+SHORT_KEYS = {
+    "workout_plan": "plan",
+    "days_per_week": "days",
+    "exercises": "ex",
+    "rest_sec": "rest_s",
+    "muscle_group": "muscle",
+    "diet_preference": "diet",
+    "meal_plan": "options",
+    "recommended_day": "pick",
+    "maintenance_calories": "maint_kcal",
+    "target_calories": "target_kcal",
+    "split_percentages": "split_pct",
+    "prep_time_min": "prep_min",
+    "duration_min": "mins",
+    "description": "desc",
+    "ingredients": "ingr",
+    "content_type": "ctype",
+}
+LONG_KEYS = {short: long for long, short in SHORT_KEYS.items()}
+
+# Fields removed, stage by stage, when a result is over budget. Later stages
+# remove things the model needs more.
+DROP_STAGES = (
+    ("ingredients", "description", "instructor", "playlist", "meal_type", "program_day"),
+    ("tags", "prep_time_min", "muscle_group", "deviation", "score"),
+    ("meal_plan",),
+)
+
+
+def estimate_tokens(value) -> int:
+    """Rough token count of ``value`` serialized as compact JSON (~4 chars per token)."""
+    text = value if isinstance(value, str) else json.dumps(value, separators=(",", ":"))
+    return (len(text) + 3) // 4
+
+
+def _drop(value, fields: set):
+    if isinstance(value, dict):
+        return {k: _drop(v, fields) for k, v in value.items() if k not in fields}
+    if isinstance(value, list):
+        return [_drop(v, fields) for v in value]
+    return value
+
+
+def _keys(value) -> set:
+    if isinstance(value, dict):
+        return set(value).union(*(_keys(v) for v in value.values()))
+    if isinstance(value, list):
+        return set().union(*(_keys(v) for v in value))
+    return set()
+
+
+def _short(key: str) -> str:
+    if key in LONG_KEYS and key not in SHORT_KEYS:
+        raise ValueError(f"Key {key!r} collides with a compact short key")
+    return SHORT_KEYS.get(key, key)
+
+
+def _encode(value):
+    if isinstance(value, dict):
+        return {_short(k): _encode(v) for k, v in value.items()}
+    if isinstance(value, list):
+        if len(value) > 1 and all(isinstance(v, dict) for v in value):
+            cols = list(value[0])
+            if all(list(v) == cols for v in value):
+                return {
+                    "_cols": [_short(c) for c in cols],
+                    "_rows": [[_encode(v[c]) for c in cols] for v in value],
+                }
+        return [_encode(v) for v in value]
+    return value
+
+
+def _decode(value):
+    if isinstance(value, dict):
+        if "_cols" in value and "_rows" in value:
+            cols = [LONG_KEYS.get(c, c) for c in value["_cols"]]
+            return [dict(zip(cols, (_decode(v) for v in row))) for row in value["_rows"]]
+        return {LONG_KEYS.get(k, k): _decode(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    return value
+
+
+def _tables(value, path=()):
+    """Yield ``(path, table)`` for every table in an encoded value."""
+    if isinstance(value, dict):
+        if "_rows" in value:
+            yield path, value
+        for k, v in value.items():
+            if k != "_rows":
+                yield from _tables(v, path + (k,))
+    elif isinstance(value, list):
+        for i, v in enumerate(value):
+            yield from _tables(v, path + (i,))
+
+
+def compact(result: dict, budget: int | None = None) -> dict:
+    """Encode ``result`` compactly, fitting it into ``budget`` tokens if one is given."""
+    dropped: list[str] = []
+    encoded = _encode(result)
+    if budget is not None:
+        for stage in DROP_STAGES:
+            if estimate_tokens(encoded) <= budget:
+                break
+            present = [f for f in stage if f in _keys(result)]
+            result = _drop(result, set(stage))
+            dropped.extend(present)
+            encoded = _encode(result)
+
+    out = {"_fmt": FORMAT, **encoded}
+    if dropped:
+        out["_dropped"] = dropped
+    truncated: dict[str, int] = {}
+    while budget is not None and estimate_tokens(out) > budget:
+        tables = sorted(_tables(out), key=lambda t: len(t[1]["_rows"]), reverse=True)
+        if not tables or len(tables[0][1]["_rows"]) <= 1:
+            break
+        path, table = tables[0]
+        key = "/".join(map(str, path))
+        truncated.setdefault(key, len(table["_rows"]))
+        del table["_rows"][(len(table["_rows"]) + 1) // 2:]
+        out["_truncated"] = truncated
+    return out
+
+
+def expand(payload: dict) -> dict:
+    """Inverse of :func:`compact`; returns ``payload`` unchanged if it is not compact."""
+    if payload.get("_fmt") != FORMAT:
+        return payload
+    body = {k: v for k, v in payload.items() if k not in ("_fmt", "_dropped", "_truncated")}
+    return _decode(body)
+
+
+def shape_tool_output(result: dict) -> dict:
+    """Apply the deployment's ``TOOL_OUTPUT_MODE`` (``full`` or ``compact``) to a tool result.
+
+    In compact mode ``TOOL_TOKEN_BUDGET`` (default 1500, ``0`` = unlimited)
+    caps the estimated size of each result. Both are read when the process
+    starts; changing them needs a restart.
+    """
+    if TOOL_OUTPUT_MODE != "compact" or "error" in result:
+        return result
+    return compact(result, TOOL_TOKEN_BUDGET)
@@ -1,59 +1,180 @@
-import json
-from pathlib import Path
+import os
 
-DATA_DIR = Path(__file__).parent.parent / "data"
+from .catalog import (
+    DIET_PLANS,
+    WORKOUTS,
+    YOUTUBE_VIDEOS,
+    _serialize,
+    get_catalog,
+    resolve_diet,
+    resolve_workout,
+)
+from ..tracing import traced
+from .sqlite_store import get_reference_store
 
+# "json" serves the in-memory catalog; "sqlite" queries the database built by
+# `python -m fitness_agent.utils.ingest_reference_db`.
+DATA_BACKEND = os.environ.get("DATA_BACKEND", "json")
 
-def _load_json(filepath: Path) -> dict:
-    with open(filepath, "r") as f:
-        return json.load(f)
+
+def data_version() -> int:
+    """Changes whenever the reference data a lookup could return changes.
+
+    Memoized tools key their invalidation on this. Calling it also gives the
+    catalog its chance to check for edited files, so reloads are noticed even
+    when every tool call is a cache hit.
+    """
+    if DATA_BACKEND == "sqlite":
+        return 0
+    return get_catalog().generation
 
 
 def load_workout_data(goal: str) -> dict:
-    filepath = DATA_DIR / "workouts" / f"{goal}.json"
-    if not filepath.exists():
+    data = get_catalog().document(WORKOUTS, goal)
+    if data is None:
         return {"error": f"No workout data found for goal: {goal}"}
-    return _load_json(filepath)
+    return data
 
 
 def load_diet_data(goal: str) -> dict:
-    filepath = DATA_DIR / "diet_plans" / f"{goal}.json"
-    if not filepath.exists():
+    data = get_catalog().document(DIET_PLANS, goal)
+    if data is None:
         return {"error": f"No diet data found for goal: {goal}"}
-    return _load_json(filepath)
+    return data
 
 
 def load_youtube_data(goal: str) -> dict:
-    filepath = DATA_DIR / "youtube_videos" / f"{goal}.json"
-    if not filepath.exists():
+    data = get_catalog().document(YOUTUBE_VIDEOS, goal)
+    if data is None:
         return {"error": f"No youtube data found for goal: {goal}"}
-    return _load_json(filepath)
+    return data
 
 
+@traced("data.get_workout_for_profile")
 def get_workout_for_profile(
     goal: str, fitness_level: str, equipment: str, days_per_week: int
 ) -> dict:
-    data = load_workout_data(goal)
-    if "error" in data:
-        return data
+    if DATA_BACKEND == "sqlite":
+        return _get_workout_from_store(goal, fitness_level, equipment, days_per_week)
+
+    catalog = get_catalog()
+    variant = catalog.workout_variants.get((goal, fitness_level, equipment, days_per_week))
+    if variant is not None:
+        return variant[0]
+    if catalog.document(WORKOUTS, goal) is None:
+        return {"error": f"No workout data found for goal: {goal}"}
 
-    level_data = data.get("levels", {}).get(fitness_level)
-    if not level_data:
-        return {"error": f"No data for fitness level: {fitness_level}"}
+    result, _ = resolve_workout(
+        catalog.workouts, catalog.workout_levels,
+        goal, fitness_level, equipment, days_per_week,
+    )
+    return result
+
+
+@traced("data.get_diet_for_profile")
+def get_diet_for_profile(
+    goal: str, diet_preference: str, cuisine: str
+) -> dict:
+    if DATA_BACKEND == "sqlite":
+        return _get_diet_from_store(goal, diet_preference, cuisine)
+
+    catalog = get_catalog()
+    variant = catalog.diet_variants.get((goal, diet_preference, cuisine))
+    if variant is not None:
+        return variant[0]
+    if catalog.document(DIET_PLANS, goal) is None:
+        return {"error": f"No diet data found for goal: {goal}"}
+
+    return resolve_diet(catalog.diets, catalog.diet_types, goal, diet_preference, cuisine)
 
-    equipment_data = level_data.get("equipment", {}).get(equipment)
-    if not equipment_data:
-        available = list(level_data.get("equipment", {}).keys())
-        equipment_data = level_data.get("equipment", {}).get(
-            available[0] if available else ""
+
+def get_workout_payload(
+    goal: str, fitness_level: str, equipment: str, days_per_week: int
+) -> bytes:
+    """``get_workout_for_profile`` as compact UTF-8 JSON, prebuilt for every enum combination."""
+    if DATA_BACKEND != "sqlite":
+        variant = get_catalog().workout_variants.get(
+            (goal, fitness_level, equipment, days_per_week)
         )
-        if not equipment_data:
-            return {"error": f"No equipment data found"}
+        if variant is not None:
+            return variant[1]
+    return _serialize(get_workout_for_profile(goal, fitness_level, equipment, days_per_week))
+
 
-    days = equipment_data.get("days", [])
-    if len(days) > days_per_week:
-        days = days[:days_per_week]
+def get_diet_payload(goal: str, diet_preference: str, cuisine: str) -> bytes:
+    """``get_diet_for_profile`` as compact UTF-8 JSON, prebuilt for every enum combination."""
+    if DATA_BACKEND != "sqlite":
+        variant = get_catalog().diet_variants.get((goal, diet_preference, cuisine))
+        if variant is not None:
+            return variant[1]
+    return _serialize(get_diet_for_profile(goal, diet_preference, cuisine))
+
+
+@traced("data.get_videos_for_profile")
+def get_videos_for_profile(
+    goal: str,
+    fitness_level: str,
+    content_type: str = "both",
+    limit: int | None = None,
+    offset: int = 0,
+) -> dict:
+    if DATA_BACKEND == "sqlite":
+        return _get_videos_from_store(goal, fitness_level, content_type, limit, offset)
+
+    catalog = get_catalog()
+    if catalog.document(YOUTUBE_VIDEOS, goal) is None:
+        return {"error": f"No youtube data found for goal: {goal}"}
+
+    videos = catalog.video_list(goal, fitness_level, content_type)
+    if limit is not None or offset:
+        videos = videos[offset:None if limit is None else offset + limit]
 
+    return {
+        "goal": goal,
+        "fitness_level": fitness_level,
+        "content_type": content_type,
+        "videos": videos,
+    }
+
+
+def search_videos(
+    query: str | None = None,
+    goal: str | None = None,
+    fitness_level: str | None = None,
+    content_type: str = "both",
+    tags: list[str] | None = None,
+    max_duration_min: int | None = None,
+    limit: int = 10,
+    offset: int = 0,
+) -> dict:
+    """Ranked video search across all goals, e.g. ``search_videos("beginner, under 20 minutes, hiit")``.
+
+    Served from the catalog's in-memory inverted index for either backend.
+    """
+    return get_catalog().video_index.search(
+        query=query,
+        goal=goal,
+        level=fitness_level,
+        content_type=content_type,
+        tags=tags,
+        max_duration_min=max_duration_min,
+        limit=limit,
+        offset=offset,
+    )
+
+
+def _get_workout_from_store(
+    goal: str, fitness_level: str, equipment: str, days_per_week: int
+) -> dict:
+    store = get_reference_store()
+    if not store.has_goal(goal):
+        return {"error": f"No workout data found for goal: {goal}"}
+
+    days = store.workout_days(goal, fitness_level, equipment)
+    if days is None:
+        return {"error": f"No data for fitness level: {fitness_level}"}
+
+    days = days[:days_per_week]
     return {
         "goal": goal,
         "fitness_level": fitness_level,
@@ -63,56 +184,47 @@ def get_workout_for_profile(
     }
 
 
-def get_diet_for_profile(
-    goal: str, diet_preference: str, cuisine: str
-) -> dict:
-    data = load_diet_data(goal)
-    if "error" in data:
-        return data
+def _get_diet_from_store(goal: str, diet_preference: str, cuisine: str) -> dict:
+    store = get_reference_store()
+    if not store.has_goal(goal):
+        return {"error": f"No diet data found for goal: {goal}"}
 
-    diet_data = data.get("diet_types", {}).get(diet_preference)
-    if not diet_data:
+    if not store.has_diet_type(goal, diet_preference):
         return {"error": f"No data for diet preference: {diet_preference}"}
 
-    cuisine_data = diet_data.get("cuisines", {}).get(cuisine)
-    if not cuisine_data:
-        if cuisine == "flexible":
-            for c in ["indian", "western"]:
-                cuisine_data = diet_data.get("cuisines", {}).get(c)
-                if cuisine_data:
-                    break
-        if not cuisine_data:
-            return {"error": f"No data for cuisine: {cuisine}"}
+    meals = store.meals(goal, diet_preference, cuisine)
+    if meals is None:
+        return {"error": f"No data for cuisine: {cuisine}"}
 
     return {
         "goal": goal,
         "diet_preference": diet_preference,
         "cuisine": cuisine,
-        "meals": cuisine_data.get("meals", {}),
+        "meals": meals,
     }
 
 
-def get_videos_for_profile(
-    goal: str, fitness_level: str, content_type: str = "both"
+def _get_videos_from_store(
+    goal: str, fitness_level: str, content_type: str, limit: int | None, offset: int
 ) -> dict:
-    data = load_youtube_data(goal)
-    if "error" in data:
-        return data
-
-    videos = data.get("videos", [])
-
-    filtered = [
-        v for v in videos
-        if v.get("level", "") in [fitness_level, "all"]
-        and (content_type == "both" or v.get("type", "") == content_type)
-    ]
+    store = get_reference_store()
+    if not store.has_goal(goal):
+        return {"error": f"No youtube data found for goal: {goal}"}
 
-    if not filtered:
-        filtered = videos[:5]
+    videos = store.query_videos(
+        goal=goal, level=fitness_level, content_type=content_type,
+        limit=limit, offset=offset,
+    )
+    if not videos and (not offset or not store.query_videos(
+        goal=goal, level=fitness_level, content_type=content_type, limit=1,
+    )):
+        # No match at all: page through the goal's first five, as filter_videos does.
+        end = 5 if limit is None else min(5, offset + limit)
+        videos = store.query_videos(goal=goal, limit=max(0, end - offset), offset=offset)
 
     return {
         "goal": goal,
         "fitness_level": fitness_level,
         "content_type": content_type,
-        "videos": filtered,
+        "videos": videos,
     }
@@ -0,0 +1,40 @@
+"""Load the JSON reference data into the SQLite reference database.
+
+Usage (from the repository root):
+
+    python -m fitness_agent.utils.ingest_reference_db [--db PATH]
+
+Then start the app with ``DATA_BACKEND=sqlite`` to serve tool calls from it.
+"""
+
+import argparse
+import os
+import time
+from pathlib import Path
+
+from .catalog import DATA_DIR, load_shards
+from .sqlite_store import DEFAULT_DB_PATH, ingest
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--data-dir", type=Path, default=DATA_DIR,
+        help="Directory containing workouts/, diet_plans/ and youtube_videos/",
+    )
+    parser.add_argument(
+        "--db", type=Path,
+        default=Path(os.environ.get("SQLITE_DB_PATH", DEFAULT_DB_PATH)),
+        help="Database path (defaults to $SQLITE_DB_PATH or data/reference.db)",
+    )
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    counts = ingest(load_shards(args.data_dir), args.db)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    summary = ", ".join(f"{table}={n}" for table, n in counts.items())
+    print(f"Wrote {args.db} ({summary}) in {elapsed_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""Pick one meal per slot so a day's totals land on the calorie and macro targets.
+
+For each ``(goal, diet, cuisine)`` the options of every slot are expanded
+once into a matrix of per-day totals (one row per combination of one option
+per slot), cached until the catalog reloads. A solve is then a single
+vectorized scoring pass over that matrix.
+
+The matrix is capped at ``MAX_COMBINATIONS`` rows: beyond that, each slot's
+options are thinned to an even spread over their calorie range, so a larger
+diet file costs a bounded amount of memory and the totals still cover the
+same range.
+"""
+
+import itertools
+import math
+
+import numpy as np
+
+from .data_loader import data_version, get_diet_for_profile
+from .memo import MemoCache
+
+NUTRIENTS = ("calories", "protein_g", "carbs_g", "fat_g")
+
+# Relative weight of each nutrient's deviation from target. Calories and
+# protein are what users track; carbs and fat have more slack.
+DEFAULT_WEIGHTS = {"calories": 1.0, "protein_g": 1.0, "carbs_g": 0.5, "fat_g": 0.5}
+
+MAX_COMBINATIONS = 100_000
+
+_matrices = MemoCache("meal_solver.matrices", maxsize=128, version=data_version)
+
+
+def _spread(options: list, k: int) -> list:
+    """``k`` of ``options`` evenly spread by calories, in their original order."""
+    if len(options) <= k:
+        return options
+    by_calories = sorted(range(len(options)), key=lambda i: options[i].get("calories") or 0)
+    picked = {by_calories[round(j * (len(options) - 1) / max(k - 1, 1))] for j in range(k)}
+    return [option for i, option in enumerate(options) if i in picked]
+
+
+def _thin(options: list[list], limit: int) -> list[list]:
+    """``options`` with slots thinned so the product of their sizes is at most ``limit``."""
+    if math.prod(len(o) for o in options) <= limit:
+        return options
+    keep, budget = [0] * len(options), limit
+    # Smallest slots first, so what they leave of the budget goes to the larger ones.
+    order = sorted(range(len(options)), key=lambda s: len(options[s]))
+    for n, s in enumerate(order):
+        k = max(1, min(len(options[s]), int(round(budget ** (1 / (len(order) - n)), 9))))
+        keep[s], budget = k, budget // k
+    return [_spread(o, k) for o, k in zip(options, keep)]
+
+
+class _MealMatrix:
+    def __init__(self, meals: dict[str, list]):
+        self.slots = [slot for slot, options in meals.items() if options]
+        self.options = _thin([meals[slot] for slot in self.slots], MAX_COMBINATIONS)
+        if not self.slots:
+            self.choices = np.zeros((0, 0), dtype=np.intp)
+            self.totals = np.zeros((0, len(NUTRIENTS)))
+            return
+        self.choices = np.array(
+            list(itertools.product(*(range(len(o)) for o in self.options))), dtype=np.intp
+        ).reshape(-1, len(self.slots))
+        self.totals = np.zeros((len(self.choices), len(NUTRIENTS)))
+        for s, options in enumerate(self.options):
+            per_option = np.array(
+                [[option.get(n) or 0 for n in NUTRIENTS] for option in options], dtype=float
+            )
+            self.totals += per_option[self.choices[:, s]]
+
+    def plan(self, row: int, targets: np.ndarray, score: float) -> dict:
+        totals = self.totals[row]
+        return {
+            "meals": {
+                slot: self.options[s][self.choices[row, s]] for s, slot in enumerate(self.slots)
+            },
+            "totals": {n: round(float(v), 1) for n, v in zip(NUTRIENTS, totals)},
+            "deviation": {
+                n: round(float(v - t), 1) for n, v, t in zip(NUTRIENTS, totals, targets)
+            },
+            "score": round(float(score), 4),
+        }
+
+
+def _matrix(goal: str, diet_preference: str, cuisine: str) -> _MealMatrix | dict:
+    def build():
+        result = get_diet_for_profile(goal, diet_preference, cuisine)
+        return result if "error" in result else _MealMatrix(result["meals"])
+
+    return _matrices.get_or_compute((goal, diet_preference, cuisine), build)
+
+
+def _scores(matrix: _MealMatrix, targets: np.ndarray, weights: dict | None) -> np.ndarray:
+    w = np.array([(weights or DEFAULT_WEIGHTS).get(n, 0.0) for n in NUTRIENTS])
+    relative = np.abs(matrix.totals - targets) / np.maximum(targets, 1.0)
+    return relative @ w
+
+
+def _targets(targets: dict) -> np.ndarray:
+    return np.array([float(targets.get(n) or 0) for n in NUTRIENTS])
+
+
+def solve_day(
+    goal: str,
+    diet_preference: str,
+    cuisine: str,
+    targets: dict,
+    top_n: int = 1,
+    weights: dict | None = None,
+) -> list[dict] | dict:
+    """The ``top_n`` best distinct day plans, best first.
+
+    ``targets`` holds ``calories``, ``protein_g``, ``carbs_g`` and ``fat_g``
+    (as produced by ``calculate_tdee``/``calculate_macros``). The score is
+    the weighted sum of each nutrient's relative deviation from its target;
+    lower is better. Returns the loader's error dict if there are no meals,
+    and an empty list if every slot is empty.
+    """
+    matrix = _matrix(goal, diet_preference, cuisine)
+    if isinstance(matrix, dict):
+        return matrix
+    t = _targets(targets)
+    scores = _scores(matrix, t, weights)
+    if not len(scores) or top_n < 1:
+        return []
+    top_n = min(top_n, len(scores))
+    best = np.argpartition(scores, top_n - 1)[:top_n] if top_n < len(scores) else np.arange(len(scores))
+    best = best[np.lexsort((best, scores[best]))]
+    return [matrix.plan(int(row), t, scores[row]) for row in best]
+
+
+def solve_week(
+    goal: str,
+    diet_preference: str,
+    cuisine: str,
+    targets: dict,
+    days: int = 7,
+    weights: dict | None = None,
+) -> list[dict] | dict:
+    """A ``days``-long rotation of day plans, picked greedily by score.
+
+    No day plan is used twice and no slot serves the same meal on two
+    consecutive days. With only a few options per slot a week cannot avoid
+    every repeat, so among eligible plans the one reusing the fewest
+    already-served meals wins, then the best score.
+    """
+    matrix = _matrix(goal, diet_preference, cuisine)
+    if isinstance(matrix, dict):
+        return matrix
+    if not matrix.slots:
+        return []
+    t = _targets(targets)
+    scores = _scores(matrix, t, weights)
+    usage = np.zeros((len(matrix.slots), max(len(o) for o in matrix.options)), dtype=int)
+    slot_index = np.arange(len(matrix.slots))
+    available = np.ones(len(scores), dtype=bool)
+    rows = np.arange(len(scores))
+    rotation = []
+    for _ in range(days):
+        eligible = available.copy()
+        if rotation:
+            eligible &= np.all(matrix.choices != previous, axis=1)
+        if not eligible.any():
+            break
+        reuse = usage[slot_index, matrix.choices[eligible]].sum(axis=1)
+        candidates = rows[eligible]
+        row = int(candidates[np.lexsort((candidates, scores[eligible], reuse))[0]])
+        available[row] = False
+        previous = matrix.choices[row]
+        usage[slot_index, previous] += 1
+        rotation.append({"day": len(rotation) + 1, **matrix.plan(row, t, scores[row])})
+    return rotation
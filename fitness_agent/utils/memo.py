@@ -0,0 +1,190 @@
+"""LRU/TTL memoization for tool functions, with scrapeable counters.
+
+Arguments are normalized (strings stripped and lower-cased, defaults filled
+in) before they are used both as the cache key and as the actual call
+arguments, so ``"Fat_Loss "`` and ``"fat_loss"`` share one entry and one
+result. Cached results are shared between callers and must not be mutated.
+"""
+
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+_registry: dict[str, "MemoCache"] = {}
+_registry_lock = threading.Lock()
+
+
+def normalize_arg(value):
+    if isinstance(value, str):
+        return value.strip().lower()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+class MemoCache:
+    """A thread-safe LRU cache with optional per-entry TTL.
+
+    ``version`` is called on every lookup; when its value changes (e.g. the
+    catalog was reloaded) every entry is dropped before the lookup proceeds.
+    A value computed by ``get_or_compute`` is not stored if the version
+    changed while it was being computed, since it may be from the old data.
+    """
+
+    def __init__(self, name: str, maxsize: int = 512, ttl: float = 0.0, version=None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._version_fn = version
+        self._version = version() if version else None
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        # Caches register themselves so cache_stats() reports every one of them.
+        with _registry_lock:
+            _registry[name] = self
+
+    def _check_version(self):
+        if self._version_fn is None:
+            return
+        version = self._version_fn()
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._entries.clear()
+                    self._version = version
+                    self.invalidations += 1
+
+    def get(self, key):
+        self._check_version()
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return _MISSING
+            value, expires_at = entry
+            if expires_at is not None and time.monotonic() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, version=_MISSING):
+        """Store ``value``; with ``version``, only if the cache is still at that version."""
+        expires_at = time.monotonic() + self.ttl if self.ttl > 0 else None
+        if version is not _MISSING:
+            self._check_version()
+        with self._lock:
+            if version is not _MISSING and version != self._version:
+                return
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        value = self.get(key)
+        if value is _MISSING:
+            version = self._version
+            value = compute()
+            self.put(key, value, version)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+def memoize(name: str, maxsize: int | None = None, ttl: float | None = None, version=None):
+    """Memoize a function on its normalized arguments.
+
+    ``maxsize`` and ``ttl`` default to ``TOOL_CACHE_SIZE`` (512) and
+    ``TOOL_CACHE_TTL`` seconds (0 = entries never expire). The wrapper keeps
+    the wrapped function's name, signature and docstring, which ADK reads to
+    build the tool declaration.
+    """
+    if maxsize is None:
+        maxsize = int(os.environ.get("TOOL_CACHE_SIZE", "512"))
+    if ttl is None:
+        ttl = float(os.environ.get("TOOL_CACHE_TTL", "0"))
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        names = tuple(signature.parameters)
+        defaults = {n: p.default for n, p in signature.parameters.items() if p.default is not p.empty}
+        # Plain parameters let the key be built from args/kwargs directly; bind() is the fallback.
+        plain = all(p.kind is p.POSITIONAL_OR_KEYWORD for p in signature.parameters.values())
+        cache = MemoCache(name, maxsize=maxsize, ttl=ttl, version=version)
+
+        def slow_key(args, kwargs) -> tuple:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return tuple(normalize_arg(v) for v in bound.arguments.values())
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = None
+            if plain and len(args) <= len(names):
+                values = [normalize_arg(v) for v in args]
+                used = 0
+                for n in names[len(args):]:
+                    if n in kwargs:
+                        values.append(normalize_arg(kwargs[n]))
+                        used += 1
+                    elif n in defaults:
+                        values.append(normalize_arg(defaults[n]))
+                    else:
+                        break
+                else:
+                    if used == len(kwargs):
+                        key = tuple(values)
+            if key is None:
+                key = slow_key(args, kwargs)
+            return cache.get_or_compute(key, lambda: func(*key))
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
+
+
+def cache_stats() -> dict[str, dict]:
+    """Counters for every memoized function, keyed by cache name."""
+    with _registry_lock:
+        caches = list(_registry.values())
+    return {cache.name: cache.stats() for cache in caches}
+
+
+def clear_caches():
+    with _registry_lock:
+        caches = list(_registry.values())
+    for cache in caches:
+        cache.clear()
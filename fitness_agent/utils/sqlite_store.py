@@ -0,0 +1,309 @@
+"""SQLite backend for the reference data, mirroring the planned Supabase tables.
+
+The schema follows ``DATA_ARCHITECTURE.md`` (``goals``, ``workouts``,
+``diet_plans``, ``videos``) plus a ``video_tags`` table standing in for the
+Postgres ``text[]`` column, so filtering and paging happen in SQL and the
+query shapes can be exercised offline. Each row also keeps its original JSON
+object so the loader returns exactly what the JSON backend returns.
+
+Populate the database with ``python -m fitness_agent.utils.ingest_reference_db``
+and select it with ``DATA_BACKEND=sqlite``.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+from .catalog import DATA_DIR, DIET_PLANS, FLEXIBLE_CUISINE_ORDER, WORKOUTS, YOUTUBE_VIDEOS
+
+DEFAULT_DB_PATH = DATA_DIR / "reference.db"
+
+SCHEMA = """
+CREATE TABLE goals (
+    id TEXT PRIMARY KEY,
+    label TEXT NOT NULL
+);
+
+CREATE TABLE workouts (
+    id INTEGER PRIMARY KEY,
+    goal TEXT NOT NULL REFERENCES goals(id),
+    level TEXT NOT NULL,
+    equipment TEXT NOT NULL,
+    equipment_rank INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    day INTEGER,
+    day_name TEXT,
+    focus TEXT,
+    exercises TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE diet_plans (
+    id INTEGER PRIMARY KEY,
+    goal TEXT NOT NULL REFERENCES goals(id),
+    diet_type TEXT NOT NULL,
+    cuisine TEXT NOT NULL,
+    meal_slot TEXT NOT NULL,
+    slot_rank INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    calories INTEGER,
+    protein_g REAL,
+    meal_data TEXT NOT NULL
+);
+
+CREATE TABLE videos (
+    id INTEGER PRIMARY KEY,
+    goal TEXT NOT NULL REFERENCES goals(id),
+    position INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    url TEXT NOT NULL,
+    type TEXT NOT NULL,
+    level TEXT NOT NULL,
+    duration_min INTEGER,
+    tags TEXT NOT NULL,
+    description TEXT,
+    playlist_url TEXT,
+    program_day TEXT,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE video_tags (
+    video_id INTEGER NOT NULL REFERENCES videos(id),
+    tag TEXT NOT NULL,
+    PRIMARY KEY (tag, video_id)
+) WITHOUT ROWID;
+
+CREATE INDEX idx_workouts_goal_level_equip ON workouts(goal, level, equipment, position);
+CREATE INDEX idx_diet_plans_goal_diet_cuisine ON diet_plans(goal, diet_type, cuisine, slot_rank, position);
+CREATE INDEX idx_videos_goal_level_type ON videos(goal, level, type, position);
+CREATE INDEX idx_videos_goal_type ON videos(goal, type, position);
+CREATE INDEX idx_videos_duration ON videos(duration_min);
+CREATE INDEX idx_video_tags_video ON video_tags(video_id);
+"""
+
+
+def ingest(shards: dict, db_path: Path) -> dict:
+    """Build a fresh database at ``db_path`` from catalog shards.
+
+    The database is written to a temporary file and renamed into place, so
+    readers keep using the previous file until ingestion has committed.
+    Returns row counts per table.
+    """
+    db_path = Path(db_path)
+    tmp_path = db_path.with_name(db_path.name + ".tmp")
+    tmp_path.unlink(missing_ok=True)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(SCHEMA)
+        goals = sorted({goal for _, goal in shards})
+        conn.executemany(
+            "INSERT INTO goals (id, label) VALUES (?, ?)",
+            [(goal, goal.replace("_", " ").title()) for goal in goals],
+        )
+        for (kind, goal), shard in sorted(shards.items()):
+            if kind == WORKOUTS:
+                _ingest_workouts(conn, goal, shard.doc)
+            elif kind == DIET_PLANS:
+                _ingest_diets(conn, goal, shard.doc)
+            elif kind == YOUTUBE_VIDEOS:
+                _ingest_videos(conn, goal, shard.doc)
+        conn.commit()
+        counts = {
+            table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("goals", "workouts", "diet_plans", "videos", "video_tags")
+        }
+    finally:
+        conn.close()
+    os.replace(tmp_path, db_path)
+    return counts
+
+
+def _ingest_workouts(conn: sqlite3.Connection, goal: str, doc: dict):
+    rows = []
+    for level, level_data in doc.get("levels", {}).items():
+        for rank, (equipment, equipment_data) in enumerate(
+            (level_data or {}).get("equipment", {}).items()
+        ):
+            for position, day in enumerate((equipment_data or {}).get("days", [])):
+                rows.append((
+                    goal, level, equipment, rank, position,
+                    day.get("day"), day.get("name"), day.get("focus"),
+                    json.dumps(day.get("exercises", [])), json.dumps(day),
+                ))
+    conn.executemany(
+        "INSERT INTO workouts (goal, level, equipment, equipment_rank, position,"
+        " day, day_name, focus, exercises, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+
+
+def _ingest_diets(conn: sqlite3.Connection, goal: str, doc: dict):
+    rows = []
+    for diet, diet_data in doc.get("diet_types", {}).items():
+        for cuisine, cuisine_data in (diet_data or {}).get("cuisines", {}).items():
+            meals = (cuisine_data or {}).get("meals", {})
+            for slot_rank, (slot, options) in enumerate(meals.items()):
+                for position, meal in enumerate(options):
+                    rows.append((
+                        goal, diet, cuisine, slot, slot_rank, position,
+                        meal.get("calories"), meal.get("protein_g"), json.dumps(meal),
+                    ))
+    conn.executemany(
+        "INSERT INTO diet_plans (goal, diet_type, cuisine, meal_slot, slot_rank,"
+        " position, calories, protein_g, meal_data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+
+
+def _ingest_videos(conn: sqlite3.Connection, goal: str, doc: dict):
+    for position, video in enumerate(doc.get("videos", [])):
+        tags = video.get("tags", [])
+        cursor = conn.execute(
+            "INSERT INTO videos (goal, position, title, url, type, level, duration_min,"
+            " tags, description, playlist_url, program_day, data)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                goal, position, video.get("title", ""), video.get("url", ""),
+                video.get("type", ""), video.get("level", ""), video.get("duration_min"),
+                json.dumps(tags), video.get("description"), video.get("playlist"),
+                video.get("program_day"), json.dumps(video),
+            ),
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO video_tags (video_id, tag) VALUES (?, ?)",
+            [(cursor.lastrowid, tag) for tag in tags],
+        )
+
+
+class ReferenceStore:
+    """Read-only queries over an ingested reference database.
+
+    Connections are opened read-only and kept one per thread, since
+    ``sqlite3`` connections cannot be shared across threads.
+    """
+
+    def __init__(self, db_path: Path = DEFAULT_DB_PATH):
+        self.db_path = Path(db_path)
+        if not self.db_path.exists():
+            raise FileNotFoundError(
+                f"Reference database {self.db_path} not found; run "
+                "`python -m fitness_agent.utils.ingest_reference_db` first"
+            )
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+            self._local.conn = conn
+        return conn
+
+    def has_goal(self, goal: str) -> bool:
+        row = self._conn().execute("SELECT 1 FROM goals WHERE id = ?", (goal,)).fetchone()
+        return row is not None
+
+    def workout_days(self, goal: str, level: str, equipment: str) -> list | None:
+        """Days for the given equipment, falling back to the level's first equipment.
+
+        Returns None when the level itself has no data.
+        """
+        conn = self._conn()
+        rows = conn.execute(
+            "SELECT data FROM workouts WHERE goal = ? AND level = ? AND equipment = ?"
+            " ORDER BY position",
+            (goal, level, equipment),
+        ).fetchall()
+        if not rows:
+            first = conn.execute(
+                "SELECT equipment FROM workouts WHERE goal = ? AND level = ?"
+                " ORDER BY equipment_rank LIMIT 1",
+                (goal, level),
+            ).fetchone()
+            if first is None:
+                return None
+            rows = conn.execute(
+                "SELECT data FROM workouts WHERE goal = ? AND level = ? AND equipment = ?"
+                " ORDER BY position",
+                (goal, level, first[0]),
+            ).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def has_diet_type(self, goal: str, diet_type: str) -> bool:
+        row = self._conn().execute(
+            "SELECT 1 FROM diet_plans WHERE goal = ? AND diet_type = ? LIMIT 1",
+            (goal, diet_type),
+        ).fetchone()
+        return row is not None
+
+    def meals(self, goal: str, diet_type: str, cuisine: str) -> dict | None:
+        cuisines = [cuisine]
+        if cuisine == "flexible":
+            cuisines.extend(FLEXIBLE_CUISINE_ORDER)
+        for c in cuisines:
+            rows = self._conn().execute(
+                "SELECT meal_slot, meal_data FROM diet_plans"
+                " WHERE goal = ? AND diet_type = ? AND cuisine = ?"
+                " ORDER BY slot_rank, position",
+                (goal, diet_type, c),
+            ).fetchall()
+            if rows:
+                meals: dict[str, list] = {}
+                for slot, data in rows:
+                    meals.setdefault(slot, []).append(json.loads(data))
+                return meals
+        return None
+
+    def query_videos(
+        self,
+        goal: str | None = None,
+        level: str | None = None,
+        content_type: str = "both",
+        tags: list[str] | None = None,
+        max_duration_min: int | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> list[dict]:
+        """Filter videos in SQL, in catalog order.
+
+        ``level`` also matches videos marked ``all``; every tag in ``tags``
+        must be present on a video for it to match.
+        """
+        clauses, params = [], []
+        if goal is not None:
+            clauses.append("goal = ?")
+            params.append(goal)
+        if level is not None:
+            clauses.append("level IN (?, 'all')")
+            params.append(level)
+        if content_type != "both":
+            clauses.append("type = ?")
+            params.append(content_type)
+        if max_duration_min is not None:
+            clauses.append("duration_min <= ?")
+            params.append(max_duration_min)
+        for tag in tags or []:
+            clauses.append("id IN (SELECT video_id FROM video_tags WHERE tag = ?)")
+            params.append(tag)
+        sql = "SELECT data FROM videos"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY goal, position LIMIT ? OFFSET ?"
+        params.extend([-1 if limit is None else limit, offset])
+        return [json.loads(data) for (data,) in self._conn().execute(sql, params)]
+
+
+_store: ReferenceStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_reference_store() -> ReferenceStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ReferenceStore(
+                    Path(os.environ.get("SQLITE_DB_PATH", DEFAULT_DB_PATH))
+                )
+    return _store
@@ -0,0 +1,220 @@
+"""Inverted index and ranked search over the YouTube video catalog.
+
+Postings map ``goal``, ``type``, ``level``, ``tag`` and title/description
+``token`` values to frozensets of video ids, built once per catalog
+generation (a level's set also holds the videos marked ``all``); durations
+are kept sorted for range filters. A query combines hard filters (goal,
+level, type, duration) with scored terms (tags and free text). Filters are
+intersected smallest first, the duration bound is applied to what they
+leave (or walked as a sorted range when that is smaller), and each term's
+postings are intersected with the candidates before scoring. Nothing is
+copied whole per query: a search costs about the size of its smallest
+filter plus the matches it scores, not the size of the catalog (except a
+query with no filters and no terms, which matches every video).
+"""
+
+import bisect
+import heapq
+import math
+import re
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and for in of on or the to with under over less more than min mins minute minutes".split()
+)
+_MAX_DURATION_RE = re.compile(r"(?:under|below|less than|at most|max|<=?)\s*(\d+)\s*(?:m|min|mins|minutes)?\b")
+_MIN_DURATION_RE = re.compile(r"(?:over|above|more than|at least|min|>=?)\s*(\d+)\s*(?:m|min|mins|minutes)\b")
+
+TAG_WEIGHT = 2.0
+TITLE_WEIGHT = 1.5
+DESCRIPTION_WEIGHT = 1.0
+LEVEL_EXACT_BONUS = 0.25
+
+_EMPTY: frozenset[int] = frozenset()
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+class VideoIndex:
+    """Search structure over every goal's videos, built once per catalog generation.
+
+    Each result is the original video dict plus ``goal`` and ``score`` keys;
+    the catalog's own dicts are never modified.
+    """
+
+    def __init__(self, videos_by_goal: dict[str, list]):
+        self.videos: list[dict] = []
+        self.goals: list[str] = []
+        self.postings: dict[str, dict[str, list[int]]] = {
+            "goal": {}, "type": {}, "level": {}, "tag": {}, "title": {}, "description": {},
+        }
+        self._duration_of: list[float] = []
+        durations = []
+        for goal, videos in sorted(videos_by_goal.items()):
+            for video in videos:
+                doc_id = len(self.videos)
+                self.videos.append(video)
+                self.goals.append(goal)
+                self._add("goal", goal, doc_id)
+                self._add("type", video.get("type", ""), doc_id)
+                self._add("level", video.get("level", ""), doc_id)
+                for tag in video.get("tags", []):
+                    self._add("tag", tag.lower(), doc_id)
+                for token in set(tokenize(video.get("title", ""))):
+                    self._add("title", token, doc_id)
+                for token in set(tokenize(video.get("description", ""))):
+                    self._add("description", token, doc_id)
+                durations.append((video.get("duration_min") or 0, doc_id))
+                self._duration_of.append(video.get("duration_min") or 0)
+        durations.sort()
+        self._durations = [d for d, _ in durations]
+        self._duration_ids = tuple(i for _, i in durations)
+        self._sets: dict[str, dict[str, frozenset[int]]] = {
+            field: {value: frozenset(ids) for value, ids in values.items()}
+            for field, values in self.postings.items()
+        }
+        everyone = self._sets["level"].get("all", _EMPTY)
+        self._level_sets = {level: ids | everyone for level, ids in self._sets["level"].items()}
+        n = max(len(self.videos), 1)
+        self._idf = {
+            field: {value: math.log(1 + n / len(ids)) for value, ids in postings.items()}
+            for field, postings in self.postings.items()
+        }
+
+    def _add(self, field: str, value: str, doc_id: int):
+        self.postings[field].setdefault(value, []).append(doc_id)
+
+    def _ids(self, field: str, value: str) -> frozenset[int]:
+        return self._sets[field].get(value, _EMPTY)
+
+    def parse_query(self, query: str) -> dict:
+        """Turn text like ``"beginner, under 20 minutes, no-equipment, hiit"`` into search kwargs.
+
+        Level and type words become filters, known tags become tag terms and
+        everything else is matched against titles and descriptions.
+        """
+        text = query.lower()
+        parsed: dict = {"tags": [], "text": []}
+        m = _MAX_DURATION_RE.search(text)
+        if m:
+            parsed["max_duration_min"] = int(m.group(1))
+            text = text[:m.start()] + " " + text[m.end():]
+        m = _MIN_DURATION_RE.search(text)
+        if m:
+            parsed["min_duration_min"] = int(m.group(1))
+            text = text[:m.start()] + " " + text[m.end():]
+        for phrase in re.split(r"[,;]|\s+", text):
+            phrase = phrase.strip()
+            if not phrase:
+                continue
+            if phrase in self.postings["level"] and phrase != "all":
+                parsed["level"] = phrase
+            elif phrase in self.postings["type"]:
+                parsed["content_type"] = phrase
+            elif phrase in self.postings["goal"]:
+                parsed["goal"] = phrase
+            elif phrase in self.postings["tag"]:
+                parsed["tags"].append(phrase)
+            else:
+                parsed["text"].extend(tokenize(phrase))
+        return parsed
+
+    def search(
+        self,
+        query: str | None = None,
+        goal: str | None = None,
+        level: str | None = None,
+        content_type: str = "both",
+        tags: list[str] | None = None,
+        text: list[str] | None = None,
+        max_duration_min: int | None = None,
+        min_duration_min: int | None = None,
+        limit: int = 10,
+        offset: int = 0,
+    ) -> dict:
+        """Rank videos matching the filters by how well they match the terms.
+
+        ``query`` is parsed with :meth:`parse_query`; explicit keyword
+        arguments take precedence over what it yields. ``level`` also matches
+        videos marked ``all``. When tags or text terms are given, only videos
+        matching at least one of them are returned. Results are ordered by
+        score, then catalog order, and paged with ``limit``/``offset``.
+        """
+        if query:
+            parsed = self.parse_query(query)
+            goal = goal or parsed.get("goal")
+            level = level or parsed.get("level")
+            if content_type == "both":
+                content_type = parsed.get("content_type", "both")
+            tags = list(tags or []) + parsed["tags"]
+            text = list(text or []) + parsed["text"]
+            if max_duration_min is None:
+                max_duration_min = parsed.get("max_duration_min")
+            if min_duration_min is None:
+                min_duration_min = parsed.get("min_duration_min")
+        tags = [t.lower() for t in tags or []]
+        text = [t for term in text or [] for t in tokenize(term)]
+
+        filters = []
+        if goal is not None:
+            filters.append(self._ids("goal", goal))
+        if level is not None:
+            filters.append(self._level_sets.get(level, self._ids("level", "all")))
+        if content_type != "both":
+            filters.append(self._ids("type", content_type))
+        candidates: frozenset[int] | None = None
+        for ids in sorted(filters, key=len):
+            candidates = ids if candidates is None else candidates & ids
+        if max_duration_min is not None or min_duration_min is not None:
+            lo = 0 if min_duration_min is None else bisect.bisect_left(self._durations, min_duration_min)
+            hi = (
+                len(self._durations) if max_duration_min is None
+                else bisect.bisect_right(self._durations, max_duration_min)
+            )
+            if candidates is None or hi - lo < len(candidates):
+                in_range = self._duration_ids[lo:hi]
+                candidates = frozenset(in_range) if candidates is None else candidates.intersection(in_range)
+            else:
+                lowest = -math.inf if min_duration_min is None else min_duration_min
+                highest = math.inf if max_duration_min is None else max_duration_min
+                duration_of = self._duration_of
+                candidates = frozenset(i for i in candidates if lowest <= duration_of[i] <= highest)
+
+        weighted_terms = [("tag", t, TAG_WEIGHT) for t in tags]
+        for token in text:
+            weighted_terms.append(("title", token, TITLE_WEIGHT))
+            weighted_terms.append(("description", token, DESCRIPTION_WEIGHT))
+            weighted_terms.append(("tag", token, TAG_WEIGHT))
+
+        scores: dict[int, float] = {}
+        if weighted_terms:
+            for field, value, weight in weighted_terms:
+                idf = self._idf[field].get(value)
+                if idf is None:
+                    continue
+                ids = self._sets[field][value]
+                for doc_id in ids if candidates is None else ids & candidates:
+                    scores[doc_id] = scores.get(doc_id, 0.0) + weight * idf
+        else:
+            scores = dict.fromkeys(range(len(self.videos)) if candidates is None else candidates, 0.0)
+
+        if level is not None:
+            exact = self._ids("level", level)
+            for doc_id in scores:
+                if doc_id in exact:
+                    scores[doc_id] += LEVEL_EXACT_BONUS
+
+        top = heapq.nsmallest(
+            offset + limit, scores.items(), key=lambda item: (-item[1], item[0])
+        )[offset:]
+        return {
+            "total": len(scores),
+            "offset": offset,
+            "limit": limit,
+            "results": [
+                {**self.videos[doc_id], "goal": self.goals[doc_id], "score": round(score, 3)}
+                for doc_id, score in top
+            ],
+        }
@@ -0,0 +1,497 @@
+"""Append-only, per-user storage for session days, weigh-ins and workout logs.
+
+Replaces the single shared ``user_history.json`` that was read and rewritten
+in full on every write. Each write here is one INSERT into a SQLite database
+in WAL mode, so its cost does not grow with the history, concurrent
+Streamlit sessions cannot overwrite each other's writes, and every committed
+write survives a crash (``synchronous=FULL``).
+
+Log rows are never updated: a second weigh-in on the same day is a new row
+and reads return the latest one per day. ``compact`` deletes such superseded
+rows and checkpoints the WAL.
+
+Each user also has one ``aggregates`` row (streaks, last activity, first and
+latest weigh-in, the last 30 days of daily weights), updated in the same
+transaction as every append, so the dashboard reads a fixed-size row no
+matter how long the history is.
+
+``snapshot`` serves a user's history from memory, keyed by the user's
+revision: a counter in ``revisions`` bumped in the transaction of every
+write to that user, so one user's writes never invalidate another's
+snapshot. The revision is read again only after the database's ``PRAGMA
+data_version`` (read through a dedicated connection) changed, which every
+commit from this process or another one does, so a Streamlit rerun with no
+new writes costs no database read at all.
+
+On first open, an existing legacy ``user_history.json`` is imported once for
+``DEFAULT_USER_ID`` (the only user it ever held) and then left in place.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date, timedelta
+from pathlib import Path
+
+from fitness_agent.utils.memo import MemoCache
+
+DEFAULT_DB_PATH = Path("fitness_agent/data/user_history.db")
+LEGACY_JSON_PATH = Path("fitness_agent/data/user_history.json")
+DEFAULT_USER_ID = "default_user"
+
+# Daily weights older than this many days before the latest weigh-in are
+# dropped from the aggregates; it bounds the longest rolling average.
+RECENT_WEIGHT_DAYS = 30
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    user_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    PRIMARY KEY (user_id, date)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS weight_log (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    weight REAL NOT NULL,
+    logged_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS workout_log (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    logged_at REAL NOT NULL,
+    entry TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS aggregates (
+    user_id TEXT PRIMARY KEY,
+    last_session TEXT,
+    current_run INTEGER NOT NULL DEFAULT 0,
+    longest_streak INTEGER NOT NULL DEFAULT 0,
+    first_weight_date TEXT,
+    first_weight REAL,
+    latest_weight_date TEXT,
+    latest_weight REAL,
+    recent_weights TEXT NOT NULL DEFAULT '{}'
+);
+
+CREATE TABLE IF NOT EXISTS revisions (
+    user_id TEXT PRIMARY KEY,
+    revision INTEGER NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS migrations (
+    name TEXT PRIMARY KEY,
+    applied_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_weight_log_user_date ON weight_log(user_id, date, id);
+CREATE INDEX IF NOT EXISTS idx_workout_log_user ON workout_log(user_id, id);
+"""
+
+_AGGREGATE_FIELDS = (
+    "last_session", "current_run", "longest_streak", "first_weight_date", "first_weight",
+    "latest_weight_date", "latest_weight", "recent_weights",
+)
+
+
+def _empty_aggregates() -> dict:
+    return {
+        "last_session": None, "current_run": 0, "longest_streak": 0,
+        "first_weight_date": None, "first_weight": None,
+        "latest_weight_date": None, "latest_weight": None, "recent_weights": {},
+    }
+
+
+def _apply_session(agg: dict, day: str) -> bool:
+    """Fold a new session day into ``agg``; False if it predates the last session."""
+    last = agg["last_session"]
+    if last is not None and day <= last:
+        return False
+    gap = None if last is None else (date.fromisoformat(day) - date.fromisoformat(last)).days
+    agg["current_run"] = agg["current_run"] + 1 if gap == 1 else 1
+    agg["longest_streak"] = max(agg["longest_streak"], agg["current_run"])
+    agg["last_session"] = day
+    return True
+
+
+def _run_beside(conn: sqlite3.Connection, user_id: str, day: str, step: int) -> int:
+    """How many consecutive session days directly precede (``step=-1``) or follow ``day``."""
+    op, order = ("<", "DESC") if step < 0 else (">", "ASC")
+    cursor = conn.execute(
+        f"SELECT date FROM sessions WHERE user_id = ? AND date {op} ? ORDER BY date {order}",
+        (user_id, day),
+    )
+    expected, count = date.fromisoformat(day), 0
+    try:
+        for (other,) in cursor:
+            expected += timedelta(days=step)
+            if other != expected.isoformat():
+                break
+            count += 1
+    finally:
+        cursor.close()
+    return count
+
+
+def _apply_backfilled_session(conn: sqlite3.Connection, user_id: str, agg: dict, day: str):
+    """Fold a just-inserted session day older than ``agg["last_session"]`` into ``agg``.
+
+    Only the run of consecutive days around ``day`` is read, not the whole history.
+    """
+    after = _run_beside(conn, user_id, day, +1)
+    run = _run_beside(conn, user_id, day, -1) + 1 + after
+    agg["longest_streak"] = max(agg["longest_streak"], run)
+    if (date.fromisoformat(day) + timedelta(days=after)).isoformat() == agg["last_session"]:
+        agg["current_run"] = run
+
+
+def _apply_weight(agg: dict, day: str, weight: float):
+    """Fold a weigh-in into ``agg``; a later weigh-in on the same day replaces the earlier."""
+    if agg["first_weight_date"] is None or day <= agg["first_weight_date"]:
+        agg["first_weight_date"], agg["first_weight"] = day, weight
+    if agg["latest_weight_date"] is None or day >= agg["latest_weight_date"]:
+        agg["latest_weight_date"], agg["latest_weight"] = day, weight
+    cutoff = (
+        date.fromisoformat(agg["latest_weight_date"]) - timedelta(days=RECENT_WEIGHT_DAYS - 1)
+    ).isoformat()
+    recent = agg["recent_weights"]
+    if day >= cutoff:
+        recent[day] = weight
+    for old in [d for d in recent if d < cutoff]:
+        del recent[old]
+
+
+def _average(recent: dict[str, float], since: str, today: str) -> float | None:
+    values = [w for d, w in recent.items() if since <= d <= today]
+    return round(sum(values) / len(values), 1) if values else None
+
+
+class HistoryStore:
+    """Per-user history in one SQLite database.
+
+    Connections are kept one per thread and run in autocommit mode, so every
+    ``log_*`` call is its own durable transaction. ``writes`` counts the
+    ``log_*`` calls made through this store.
+    """
+
+    def __init__(
+        self,
+        db_path: Path = DEFAULT_DB_PATH,
+        legacy_json_path: Path | None = None,
+        snapshot_cache_size: int = 256,
+    ):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        if legacy_json_path is not None:
+            self._migrate_legacy_json(Path(legacy_json_path))
+        self._backfill_aggregates()
+        # Never writes, so its data_version changes on every commit made anywhere.
+        self._monitor = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._monitor_lock = threading.Lock()
+        # user_id -> (data_version, revision) as last read, least recently used first
+        self._revisions: OrderedDict[str, tuple[int, int]] = OrderedDict()
+        self._revisions_size = snapshot_cache_size
+        # Keyed by (user_id, revision); entries of older revisions age out.
+        self._snapshots = MemoCache("history.snapshots", maxsize=snapshot_cache_size)
+        self._aggregates = MemoCache("history.aggregates", maxsize=snapshot_cache_size)
+        self.writes = 0
+        self._writes_lock = threading.Lock()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=FULL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        # SQLite admits one writer at a time; queueing threads on a lock is far
+        # fairer than its sleeping busy handler, which is left to arbitrate
+        # between processes.
+        with self._write_lock:
+            conn = self._conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def _migrate_legacy_json(self, path: Path):
+        if not path.exists():
+            return
+        with self._transaction() as conn:
+            done = conn.execute(
+                "SELECT 1 FROM migrations WHERE name = 'legacy_json'"
+            ).fetchone()
+            if done is None:
+                with open(path) as f:
+                    self._insert_history(conn, DEFAULT_USER_ID, json.load(f))
+                conn.execute(
+                    "INSERT INTO migrations (name, applied_at) VALUES ('legacy_json', ?)",
+                    (time.time(),),
+                )
+
+    def _backfill_aggregates(self):
+        """Build aggregates for users whose history predates the ``aggregates`` table."""
+        with self._transaction() as conn:
+            users = conn.execute(
+                "SELECT user_id FROM sessions UNION SELECT user_id FROM weight_log"
+                " EXCEPT SELECT user_id FROM aggregates"
+            ).fetchall()
+            for (user_id,) in users:
+                self._rebuild_aggregates(conn, user_id)
+
+    @staticmethod
+    def _read_aggregate_row(conn: sqlite3.Connection, user_id: str) -> dict:
+        row = conn.execute(
+            f"SELECT {', '.join(_AGGREGATE_FIELDS)} FROM aggregates WHERE user_id = ?",
+            (user_id,),
+        ).fetchone()
+        if row is None:
+            return _empty_aggregates()
+        agg = dict(zip(_AGGREGATE_FIELDS, row))
+        agg["recent_weights"] = json.loads(agg["recent_weights"])
+        return agg
+
+    @staticmethod
+    def _write_aggregate_row(conn: sqlite3.Connection, user_id: str, agg: dict):
+        values = [agg[f] for f in _AGGREGATE_FIELDS]
+        values[-1] = json.dumps(agg["recent_weights"], sort_keys=True)
+        conn.execute(
+            f"INSERT OR REPLACE INTO aggregates (user_id, {', '.join(_AGGREGATE_FIELDS)})"
+            f" VALUES (?{', ?' * len(_AGGREGATE_FIELDS)})",
+            (user_id, *values),
+        )
+
+    def _rebuild_aggregates(self, conn: sqlite3.Connection, user_id: str):
+        """Recompute a user's aggregates by replaying their whole history in order."""
+        agg = _empty_aggregates()
+        for (day,) in conn.execute(
+            "SELECT date FROM sessions WHERE user_id = ? ORDER BY date", (user_id,)
+        ):
+            _apply_session(agg, day)
+        for day, weight in conn.execute(
+            "SELECT date, weight FROM weight_log WHERE user_id = ? ORDER BY date, id", (user_id,)
+        ):
+            _apply_weight(agg, day, weight)
+        self._write_aggregate_row(conn, user_id, agg)
+
+    @staticmethod
+    def _bump_revision(conn: sqlite3.Connection, user_id: str):
+        conn.execute(
+            "INSERT INTO revisions (user_id, revision) VALUES (?, 1)"
+            " ON CONFLICT (user_id) DO UPDATE SET revision = revision + 1",
+            (user_id,),
+        )
+
+    def _insert_history(self, conn: sqlite3.Connection, user_id: str, history: dict):
+        now = time.time()
+        conn.executemany(
+            "INSERT OR IGNORE INTO sessions (user_id, date) VALUES (?, ?)",
+            ((user_id, day) for day in history.get("sessions", [])),
+        )
+        conn.executemany(
+            "INSERT INTO weight_log (user_id, date, weight, logged_at) VALUES (?, ?, ?, ?)",
+            ((user_id, e["date"], e["weight"], now) for e in history.get("weight_log", [])),
+        )
+        conn.executemany(
+            "INSERT INTO workout_log (user_id, logged_at, entry) VALUES (?, ?, ?)",
+            ((user_id, now, json.dumps(e)) for e in history.get("workout_log", [])),
+        )
+        self._rebuild_aggregates(conn, user_id)
+        self._bump_revision(conn, user_id)
+
+    def import_history(self, user_id: str, history: dict):
+        """Bulk-append a history dict (the ``load`` shape) in one transaction."""
+        with self._transaction() as conn:
+            self._insert_history(conn, user_id, history)
+
+    def _count_write(self):
+        with self._writes_lock:
+            self.writes += 1
+
+    def log_session(self, user_id: str, day: str):
+        """Record a visit on ``day``; repeats are ignored and leave snapshots valid."""
+        with self._transaction() as conn:
+            inserted = conn.execute(
+                "INSERT OR IGNORE INTO sessions (user_id, date) VALUES (?, ?)", (user_id, day)
+            ).rowcount
+            if inserted:
+                agg = self._read_aggregate_row(conn, user_id)
+                if not _apply_session(agg, day):
+                    _apply_backfilled_session(conn, user_id, agg, day)
+                self._write_aggregate_row(conn, user_id, agg)
+                self._bump_revision(conn, user_id)
+        self._count_write()
+
+    def log_weight(self, user_id: str, day: str, weight: float):
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO weight_log (user_id, date, weight, logged_at) VALUES (?, ?, ?, ?)",
+                (user_id, day, weight, time.time()),
+            )
+            agg = self._read_aggregate_row(conn, user_id)
+            _apply_weight(agg, day, weight)
+            self._write_aggregate_row(conn, user_id, agg)
+            self._bump_revision(conn, user_id)
+        self._count_write()
+
+    def log_workout(self, user_id: str, entry: dict):
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO workout_log (user_id, logged_at, entry) VALUES (?, ?, ?)",
+                (user_id, time.time(), json.dumps(entry)),
+            )
+            self._bump_revision(conn, user_id)
+        self._count_write()
+
+    def data_version(self) -> int:
+        """Changes whenever any connection commits to the database; no disk read."""
+        with self._monitor_lock:
+            return self._monitor.execute("PRAGMA data_version").fetchone()[0]
+
+    def revision(self, user_id: str) -> int:
+        """Changes whenever ``user_id``'s history does; read only after a commit anywhere."""
+        version = self.data_version()
+        with self._monitor_lock:
+            seen = self._revisions.get(user_id)
+            if seen is not None and seen[0] == version:
+                self._revisions.move_to_end(user_id)
+                return seen[1]
+            # Read after the data version, so it is at least as recent.
+            row = self._monitor.execute(
+                "SELECT revision FROM revisions WHERE user_id = ?", (user_id,)
+            ).fetchone()
+            revision = row[0] if row else 0
+            self._revisions[user_id] = (version, revision)
+            self._revisions.move_to_end(user_id)
+            while len(self._revisions) > self._revisions_size:
+                self._revisions.popitem(last=False)
+            return revision
+
+    def sessions(self, user_id: str) -> list[str]:
+        rows = self._conn().execute(
+            "SELECT date FROM sessions WHERE user_id = ? ORDER BY date", (user_id,)
+        )
+        return [day for (day,) in rows]
+
+    def weight_log(self, user_id: str) -> list[dict]:
+        """One entry per day, the latest weigh-in of that day, oldest day first."""
+        latest: dict[str, float] = {}
+        rows = self._conn().execute(
+            "SELECT date, weight FROM weight_log WHERE user_id = ? ORDER BY date, id", (user_id,)
+        )
+        for day, weight in rows:
+            latest[day] = weight
+        return [{"date": day, "weight": weight} for day, weight in latest.items()]
+
+    def workout_log(self, user_id: str) -> list[dict]:
+        rows = self._conn().execute(
+            "SELECT entry FROM workout_log WHERE user_id = ? ORDER BY id", (user_id,)
+        )
+        return [json.loads(entry) for (entry,) in rows]
+
+    def load(self, user_id: str) -> dict:
+        """The user's history in the shape of the legacy JSON file."""
+        conn = self._conn()
+        conn.execute("BEGIN")
+        try:
+            return {
+                "sessions": self.sessions(user_id),
+                "workout_log": self.workout_log(user_id),
+                "weight_log": self.weight_log(user_id),
+            }
+        finally:
+            conn.execute("COMMIT")
+
+    def snapshot(self, user_id: str) -> dict:
+        """``load(user_id)``, reused until the user's history next changes.
+
+        The returned dict is shared between callers and must not be mutated.
+        """
+        return self._snapshots.get_or_compute(
+            (user_id, self.revision(user_id)), lambda: self.load(user_id)
+        )
+
+    def aggregates(self, user_id: str, today: str | None = None) -> dict:
+        """Dashboard figures for ``user_id`` as of ``today`` (ISO date, default: local today).
+
+        ``current_streak`` counts consecutive session days ending today, so it
+        is 0 until today's visit is logged. Weight averages cover the last 7
+        and 30 days including today and are None without weigh-ins in that
+        range; ``weight_delta`` is latest minus first weigh-in, None until
+        there are weigh-ins on two different days.
+        """
+        agg = self._aggregates.get_or_compute(
+            (user_id, self.revision(user_id)), lambda: self._read_aggregate_row(self._conn(), user_id)
+        )
+        today = today or date.today().isoformat()
+        day = date.fromisoformat(today)
+        recent = agg["recent_weights"]
+        first, latest = agg["first_weight_date"], agg["latest_weight_date"]
+        return {
+            "current_streak": agg["current_run"] if agg["last_session"] == today else 0,
+            "longest_streak": agg["longest_streak"],
+            "last_activity": agg["last_session"],
+            "latest_weight": agg["latest_weight"],
+            "weight_avg_7d": _average(recent, (day - timedelta(days=6)).isoformat(), today),
+            "weight_avg_30d": _average(recent, (day - timedelta(days=29)).isoformat(), today),
+            "weight_delta": (
+                round(agg["latest_weight"] - agg["first_weight"], 1) if first != latest else None
+            ),
+        }
+
+    def stats(self) -> dict:
+        """Write count and database loads/cache hits, in total and per cache."""
+        snapshots, aggregates = self._snapshots.stats(), self._aggregates.stats()
+        return {
+            "writes": self.writes,
+            "loads": snapshots["misses"] + aggregates["misses"],
+            "hits": snapshots["hits"] + aggregates["hits"],
+            "snapshots": snapshots,
+            "aggregates": aggregates,
+        }
+
+    def compact(self) -> int:
+        """Delete weigh-ins superseded by a later one on the same day; returns rows removed."""
+        with self._transaction() as conn:
+            removed = conn.execute(
+                "DELETE FROM weight_log WHERE id NOT IN ("
+                "  SELECT MAX(id) FROM weight_log GROUP BY user_id, date"
+                ")"
+            ).rowcount
+        with self._write_lock:
+            self._conn().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return removed
+
+
+_store: HistoryStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_history_store() -> HistoryStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = HistoryStore(
+                    Path(os.environ.get("HISTORY_DB_PATH", DEFAULT_DB_PATH)),
+                    legacy_json_path=LEGACY_JSON_PATH,
+                )
+    return _store
@@ -0,0 +1,181 @@
+"""Answer the chat's quick-action buttons straight from the tools, without the model.
+
+Every argument the quick actions need is already in the saved profile, so
+there is nothing for the model to decide: each action calls its tools
+directly and renders the results with the markdown templates below. The
+calls and the rendered reply are returned so the caller can record them in
+the ADK session, where follow-up questions to the model can see them.
+"""
+
+import uuid
+
+from google.adk.events import Event
+from google.genai import types as genai_types
+
+from fitness_agent.prefetch import get_prefetcher, tool_args
+from fitness_agent.utils.compact import expand
+
+# key -> (button label, prompt shown in the chat, tools called in order)
+QUICK_ACTIONS = {
+    "workout": (
+        "🏋️ Workout Plan",
+        "Give me a complete workout plan based on my profile.",
+        ("get_workout_plan",),
+    ),
+    "diet": (
+        "🥗 Diet Plan",
+        "Give me a complete diet plan based on my profile.",
+        ("get_diet_plan",),
+    ),
+    "videos": (
+        "📺 Videos",
+        "Recommend YouTube videos for my goal.",
+        ("get_youtube_recommendations",),
+    ),
+    "everything": (
+        "📋 Everything",
+        "Give me a workout plan, diet plan, and YouTube video recommendations based on my profile.",
+        ("get_workout_plan", "get_diet_plan", "get_youtube_recommendations"),
+    ),
+}
+
+VIDEOS_SHOWN = 6
+
+
+def _label(value: str) -> str:
+    return str(value).replace("_", " ").title()
+
+
+def render_workout(result: dict) -> str:
+    result = expand(result)
+    if "error" in result:
+        return f"I couldn't build a workout plan for your profile: {result['error']}"
+    lines = [
+        f"## 🏋️ Your {result['days_per_week']}-Day {_label(result['goal'])} Workout Plan",
+        f"*{_label(result['fitness_level'])} · equipment: {_label(result['equipment'])}*",
+    ]
+    for day in result["workout_plan"]:
+        lines += ["", f"### Day {day['day']}: {day['name']}"]
+        if day.get("focus"):
+            lines.append(f"*Focus: {day['focus']}*")
+        lines += ["", "| Exercise | Sets | Reps | Rest |", "|---|---|---|---|"]
+        for ex in day["exercises"]:
+            rest = f"{ex['rest_sec']}s" if ex.get("rest_sec") is not None else "—"
+            lines.append(f"| {ex['name']} | {ex.get('sets', '—')} | {ex.get('reps', '—')} | {rest} |")
+    lines += ["", "Take a rest day between hard sessions, and warm up for 5 minutes before each workout."]
+    return "\n".join(lines)
+
+
+def _meal_line(meal: dict) -> str:
+    return f"{meal['name']} — {meal.get('calories', '?')} kcal, {meal.get('protein_g', '?')}g protein"
+
+
+def render_diet(result: dict) -> str:
+    result = expand(result)
+    bmi, calories, macros = result["bmi"], result["calories"], result["macros"]
+    lines = [
+        "## 🥗 Your Diet Plan",
+        f"**BMI:** {bmi['bmi']} ({bmi['category']}) · "
+        f"**Maintenance:** {int(calories['maintenance_calories'])} kcal · "
+        f"**Target:** {int(calories['target_calories'])} kcal/day",
+        "",
+        "| Protein | Carbs | Fat |",
+        "|---|---|---|",
+        f"| {int(macros['protein_g'])}g | {int(macros['carbs_g'])}g | {int(macros['fat_g'])}g |",
+    ]
+    # Compact output over its token budget drops the swap options, see utils/compact.py.
+    meal_plan = result.get("meal_plan")
+    if meal_plan and "error" in meal_plan:
+        lines += ["", f"I couldn't find meals for your preferences: {meal_plan['error']}"]
+        return "\n".join(lines)
+    day = result.get("recommended_day")
+    if day:
+        lines += ["", "### Recommended day"]
+        for slot, meal in day["meals"].items():
+            lines.append(f"- **{_label(slot)}:** {_meal_line(meal)}")
+        totals = day["totals"]
+        lines.append(
+            f"\n*Day total: {int(totals['calories'])} kcal, {int(totals['protein_g'])}g protein*"
+        )
+    if meal_plan:
+        lines += ["", "### Swap options"]
+        for slot, options in meal_plan["meals"].items():
+            picked = day["meals"].get(slot) if day else None
+            others = [m for m in options if m != picked]
+            if others:
+                lines.append(f"- **{_label(slot)}:** " + "; ".join(_meal_line(m) for m in others))
+    lines += ["", "These are suggestions — swap any meal for one with similar calories and protein."]
+    return "\n".join(lines)
+
+
+def render_videos(result: dict) -> str:
+    result = expand(result)
+    if "error" in result:
+        return f"I couldn't find videos for your profile: {result['error']}"
+    lines = [f"## 📺 Videos for {_label(result['goal'])}"]
+    for video in result["videos"][:VIDEOS_SHOWN]:
+        lines += [
+            "",
+            f"**{video['title']}** · {_label(video.get('level', ''))} · {video.get('duration_min', '?')} min",
+        ]
+        if video.get("description"):
+            lines.append(video["description"])
+        # On its own line so the chat turns it into an embedded player.
+        lines.append(video["url"])
+    return "\n".join(lines)
+
+
+RENDERERS = {
+    "get_workout_plan": render_workout,
+    "get_diet_plan": render_diet,
+    "get_youtube_recommendations": render_videos,
+}
+
+
+def run_quick_action(action: str, profile: dict, owner: str | None = None) -> dict:
+    """Run a quick action for ``profile`` (tool argument names -> values).
+
+    Results prefetched for ``owner`` when the profile was saved are used
+    when they match. Returns ``{"prompt", "markdown", "calls"}`` where
+    ``calls`` lists ``(tool_name, args, result)`` in call order.
+    """
+    _, prompt, tool_names = QUICK_ACTIONS[action]
+    prefetcher = get_prefetcher()
+    calls = []
+    for name in tool_names:
+        args = tool_args(name, profile)
+        calls.append((name, args, prefetcher.call(owner, name, args)))
+    markdown = "\n\n---\n\n".join(RENDERERS[name](result) for name, _, result in calls)
+    return {"prompt": prompt, "markdown": markdown, "calls": calls}
+
+
+def session_events(agent_name: str, message: str, answer: dict) -> list[Event]:
+    """ADK events recording a quick action as if the agent had handled ``message``.
+
+    The user message, the function calls, their responses and the rendered
+    reply share one invocation id, mirroring a real model turn.
+    """
+    invocation_id = f"e-{uuid.uuid4()}"
+    call_ids = [f"quick-{uuid.uuid4().hex[:12]}" for _ in answer["calls"]]
+
+    def event(author: str, role: str, parts: list) -> Event:
+        return Event(
+            invocation_id=invocation_id,
+            author=author,
+            content=genai_types.Content(role=role, parts=parts),
+        )
+
+    return [
+        event("user", "user", [genai_types.Part(text=message)]),
+        event(agent_name, "model", [
+            genai_types.Part(function_call=genai_types.FunctionCall(id=cid, name=name, args=args))
+            for cid, (name, args, _) in zip(call_ids, answer["calls"])
+        ]),
+        event(agent_name, "user", [
+            genai_types.Part(function_response=genai_types.FunctionResponse(
+                id=cid, name=name, response=result
+            ))
+            for cid, (name, _, result) in zip(call_ids, answer["calls"])
+        ]),
+        event(agent_name, "model", [genai_types.Part(text=answer["markdown"])]),
+    ]
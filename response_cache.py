@@ -0,0 +1,233 @@
+"""On-disk cache of agent replies shared by every process on the host.
+
+Many users send the model the same turn: the greeting asked for when a
+profile is saved is built from the profile summary, and users with the same
+profile get the same reply apart from their name. Such a turn is answered
+once and served from here afterwards.
+
+Entries are keyed by a hash of (model name, instruction hash, profile,
+normalized prompt). The profile is the tool arguments, normalized as the
+tool memo does, with the exact age, weight and height: a reply may quote
+figures derived from them (BMI, calorie or macro targets), so it is only
+shared between users for whom those figures are the same. Personal fields
+(the name) are replaced by a placeholder in the prompt and the stored reply,
+and filled back in on every hit. Only an exact, case-sensitive occurrence is
+replaced, and a reply holding the value more than once is not stored: a
+name such as "Will" or "Grace" may also be an ordinary word.
+
+The database is SQLite in WAL mode, so several Streamlit processes can share
+it. Entries expire ``ttl`` seconds after they were stored (0 = never) and the
+least recently used ones are deleted beyond ``max_entries``. ``bypass`` marks
+a key that must always go to the model, e.g. after a bad reply was cached.
+Hit ratio and model latency saved are counted per process in ``stats``.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from fitness_agent.utils.memo import normalize_arg
+
+DEFAULT_DB_PATH = Path("fitness_agent/data/response_cache.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    latency_ms REAL NOT NULL,
+    created_at REAL NOT NULL,
+    used_at REAL NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS bypassed (
+    key TEXT PRIMARY KEY
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_responses_used_at ON responses(used_at);
+"""
+
+
+def _placeholder(field: str) -> str:
+    return "{{" + field + "}}"
+
+
+def _template(text: str, personal: dict[str, str]) -> str | None:
+    """``text`` with each personal value replaced by its placeholder; None if a value occurs twice."""
+    for field, value in personal.items():
+        if not value:
+            continue
+        if text.count(value) > 1:
+            return None
+        text = text.replace(value, _placeholder(field))
+    return text
+
+
+def _fill(template: str, personal: dict[str, str]) -> str:
+    for field, value in personal.items():
+        template = template.replace(_placeholder(field), value)
+    return template
+
+
+def normalize_prompt(prompt: str, personal: dict[str, str]) -> str:
+    """``prompt`` with personal fields templated out, whitespace collapsed and case folded."""
+    prompt = _template(prompt, personal) or prompt
+    return " ".join(prompt.split()).casefold()
+
+
+def _digest(value) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode()).hexdigest()
+
+
+class ResponseCache:
+    """Replies by cache key in one SQLite database, one connection per thread."""
+
+    def __init__(self, db_path: Path = DEFAULT_DB_PATH, ttl: float = 86400.0, max_entries: int = 5000):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.stores = 0
+        self.skipped = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.latency_saved_ms = 0.0
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def _count(self, **deltas):
+        with self._stats_lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    @staticmethod
+    def key(model: str, instruction: str, profile: dict, prompt: str, personal: dict[str, str]) -> str:
+        """Cache key of a turn; ``personal`` fields are left out of it."""
+        bucket = {name: normalize_arg(value) for name, value in profile.items()}
+        return _digest([model, _digest(instruction), bucket, normalize_prompt(prompt, personal)])
+
+    def get(self, key: str, personal: dict[str, str], bypass: bool = False) -> str | None:
+        """The cached reply for ``key`` with ``personal`` filled in, or None to ask the model."""
+        started = time.perf_counter()
+        conn = self._conn()
+        if bypass or conn.execute("SELECT 1 FROM bypassed WHERE key = ?", (key,)).fetchone():
+            self._count(bypasses=1)
+            return None
+        row = conn.execute(
+            "SELECT response, latency_ms, created_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        now = time.time()
+        if row is not None and self.ttl > 0 and now - row[2] >= self.ttl:
+            with self._write_lock:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._count(expirations=1)
+            row = None
+        if row is None:
+            self._count(misses=1)
+            return None
+        with self._write_lock:
+            conn.execute("UPDATE responses SET used_at = ? WHERE key = ?", (now, key))
+        reply = _fill(row[0], personal)
+        self._count(hits=1, latency_saved_ms=max(0.0, row[1] - (time.perf_counter() - started) * 1000))
+        return reply
+
+    def put(self, key: str, reply: str, personal: dict[str, str], latency_ms: float):
+        """Store ``reply`` (``latency_ms`` is what the model took) and evict beyond ``max_entries``.
+
+        A reply holding a personal value more than once is skipped.
+        """
+        template = _template(reply, personal)
+        if template is None:
+            self._count(skipped=1)
+            return
+        conn = self._conn()
+        now = time.time()
+        with self._write_lock:
+            if conn.execute("SELECT 1 FROM bypassed WHERE key = ?", (key,)).fetchone():
+                return
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, latency_ms, created_at, used_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (key, template, latency_ms, now, now),
+                )
+                excess = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+                if excess > 0:
+                    conn.execute(
+                        "DELETE FROM responses WHERE key IN"
+                        " (SELECT key FROM responses ORDER BY used_at LIMIT ?)",
+                        (excess,),
+                    )
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        self._count(stores=1, evictions=max(0, excess))
+
+    def bypass(self, key: str):
+        """Always send ``key``'s turn to the model from now on, in every process."""
+        with self._write_lock:
+            conn = self._conn()
+            conn.execute("INSERT OR IGNORE INTO bypassed (key) VALUES (?)", (key,))
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._write_lock:
+            self._conn().execute("DELETE FROM responses")
+
+    def stats(self) -> dict:
+        entries = self._conn().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "bypasses": self.bypasses,
+                "stores": self.stores,
+                "skipped": self.skipped,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "latency_saved_ms": round(self.latency_saved_ms, 1),
+            }
+
+
+_cache: ResponseCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache | None:
+    """The process-wide cache, or None when ``RESPONSE_CACHE_MAX_ENTRIES`` is 0."""
+    global _cache
+    max_entries = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "5000"))
+    if max_entries <= 0:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache(
+                    Path(os.environ.get("RESPONSE_CACHE_PATH", DEFAULT_DB_PATH)),
+                    ttl=float(os.environ.get("RESPONSE_CACHE_TTL", "86400")),
+                    max_entries=max_entries,
+                )
+    return _cache
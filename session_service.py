@@ -0,0 +1,658 @@
+"""Process-wide ADK session services: bounded in-memory, or durable on SQLite.
+
+``SESSION_BACKEND`` picks one (see ``session_service_from_env``).
+
+``BoundedSessionService``: ADK's ``InMemorySessionService`` keeps every
+session forever, and loses them all on restart. This subclass
+tracks when each session was last used and roughly how many bytes its events
+hold, measured as their serialized JSON size (the Python objects take about
+four times as much). Sessions idle for longer than
+``idle_ttl`` seconds are expired, on use of the service and by a sweep
+scheduled on the agent loop while sessions are held. When there are more
+than ``max_sessions`` sessions, or they hold more than ``max_bytes`` in
+total, the least recently used ones are evicted. Sessions with a turn in
+progress are pinned and never evicted or expired: ``get_session`` and every
+appended event pin a session, and the agent's final response unpins it. A
+pin not renewed for ``pin_ttl`` seconds (a turn that failed before its final
+response) lapses, so the caps may be exceeded only while that many turns run.
+
+``DurableSessionService`` keeps sessions in a SQLite database, so they
+survive restarts. Events of a session are indexed by (app, user, session)
+and loaded lazily: only when the session is first used in this process,
+after which it stays in a small in-memory LRU and later appends never read
+the database. That first load brings in only the last ``load_events``
+events (200 by default, 0 for all), bounding both the load time and the
+history the model sees after a restart; older events stay in the database.
+Appends are buffered and written in one transaction when the buffer reaches
+``batch_size`` events, when the agent's turn ends (its final response) or
+``flush_interval`` seconds after the first buffered event. Reads and writes
+run on a dedicated thread, so the agent loop never waits on the disk while
+other sessions' turns are due. This process is assumed to be the only
+writer of its database.
+
+For both, all methods other than ``has_session`` and ``stats`` must run on
+the agent loop (see ``agent_loop.py``); ``has_session`` must not.
+"""
+
+import asyncio
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.errors.session_not_found_error import SessionNotFoundError
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, InMemorySessionService, Session, State
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+
+logger = logging.getLogger(__name__)
+
+SESSION_BASE_BYTES = 512
+DEFAULT_SESSION_DB_PATH = Path("fitness_agent/data/sessions.db")
+DEFAULT_LOAD_EVENTS = 200
+# A turn is cancelled after AGENT_TURN_TIMEOUT seconds; its pin outlives it a little.
+DEFAULT_PIN_TTL = float(os.environ.get("AGENT_TURN_TIMEOUT", "120")) + 30
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    create_time REAL NOT NULL,
+    update_time REAL NOT NULL,
+    PRIMARY KEY (app_name, user_id, id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY,
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    data TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS events_by_session ON events (app_name, user_id, session_id, seq);
+
+CREATE TABLE IF NOT EXISTS app_states (
+    app_name TEXT PRIMARY KEY,
+    state TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS user_states (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    PRIMARY KEY (app_name, user_id)
+) WITHOUT ROWID;
+"""
+
+
+def _event_bytes(event: Event) -> int:
+    return len(event.model_dump_json(exclude_none=True))
+
+
+class BoundedSessionService(InMemorySessionService):
+    """``InMemorySessionService`` with LRU, idle-TTL and memory-cap eviction."""
+
+    def __init__(self, max_sessions: int = 1000, idle_ttl: float = 3600.0, max_bytes: int = 256 << 20,
+                 pin_ttl: float = DEFAULT_PIN_TTL):
+        super().__init__()
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.max_bytes = max_bytes
+        self.pin_ttl = pin_ttl
+        # (app_name, user_id, session_id) -> [last used (monotonic), bytes held]
+        self._usage: OrderedDict[tuple[str, str, str], list] = OrderedDict()
+        # Sessions with a turn in progress -> when the pin lapses (monotonic)
+        self._pins: dict[tuple[str, str, str], float] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._sweep_loop = None
+        self.evictions = 0
+        self.expirations = 0
+
+    def has_session(self, app_name: str, user_id: str, session_id: str) -> bool:
+        """Whether the session is still held; safe to call from any thread."""
+        return (app_name, user_id, session_id) in self._usage
+
+    def _touch(self, key: tuple[str, str, str], added_bytes: int = 0, pin: bool | None = None):
+        """Mark ``key`` used; ``pin`` True pins it for a turn, False releases the pin."""
+        with self._lock:
+            usage = self._usage.get(key)
+            if usage is None:
+                usage = self._usage[key] = [0.0, 0]
+            usage[0] = time.monotonic()
+            usage[1] += added_bytes
+            self._bytes += added_bytes
+            self._usage.move_to_end(key)
+            if pin:
+                self._pins[key] = usage[0] + self.pin_ttl
+            elif pin is not None:
+                self._pins.pop(key, None)
+            victims = self._select_victims(key)
+        self._drop(victims)
+        self._schedule_sweep()
+
+    def _drop(self, victims: list[tuple[str, str, str]]):
+        for app_name, user_id, session_id in victims:
+            self.sessions.get(app_name, {}).get(user_id, {}).pop(session_id, None)
+            if not self.sessions.get(app_name, {}).get(user_id, True):
+                del self.sessions[app_name][user_id]
+
+    def _schedule_sweep(self):
+        # One pending sweep per loop; benchmarks run the service on several loops in turn.
+        if self.idle_ttl <= 0 or not self._usage:
+            return
+        loop = asyncio.get_running_loop()
+        if self._sweep_loop is not loop:
+            self._sweep_loop = loop
+            loop.call_later(max(1.0, self.idle_ttl / 10), self._sweep)
+
+    def _sweep(self):
+        """Expire idle sessions even when nothing touches the service."""
+        self._sweep_loop = None
+        with self._lock:
+            victims = self._select_victims(None)
+        self._drop(victims)
+        self._schedule_sweep()
+
+    def _select_victims(self, keep: tuple[str, str, str] | None) -> list[tuple[str, str, str]]:
+        victims = []
+        now = time.monotonic()
+        expire_before = now - self.idle_ttl if self.idle_ttl > 0 else None
+        count, held = len(self._usage), self._bytes
+        for key, (last_used, size) in self._usage.items():
+            if key == keep:
+                continue
+            pinned_until = self._pins.get(key)
+            if pinned_until is not None:
+                if pinned_until > now:
+                    continue
+                del self._pins[key]
+            if expire_before is not None and last_used < expire_before:
+                self.expirations += 1
+            elif count > self.max_sessions or held > self.max_bytes:
+                self.evictions += 1
+            else:
+                break
+            victims.append(key)
+            count -= 1
+            held -= size
+        for key in victims:
+            del self._usage[key]
+        self._bytes = held
+        return victims
+
+    def _forget(self, key: tuple[str, str, str]):
+        with self._lock:
+            self._pins.pop(key, None)
+            usage = self._usage.pop(key, None)
+            if usage is not None:
+                self._bytes -= usage[1]
+
+    async def create_session(self, *, app_name: str, user_id: str, state: dict | None = None,
+                             session_id: str | None = None) -> Session:
+        session = await super().create_session(
+            app_name=app_name, user_id=user_id, state=state, session_id=session_id
+        )
+        self._touch((app_name, user_id, session.id), SESSION_BASE_BYTES)
+        return session
+
+    async def get_session(self, *, app_name: str, user_id: str, session_id: str, config=None) -> Session | None:
+        session = await super().get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id, config=config
+        )
+        if session is not None:
+            self._touch((app_name, user_id, session_id), pin=True)
+        return session
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        event = await super().append_event(session=session, event=event)
+        if not event.partial:
+            done = event.author != "user" and event.is_final_response()
+            self._touch((session.app_name, session.user_id, session.id), _event_bytes(event), pin=not done)
+        return event
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        await super().delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
+        self._forget((app_name, user_id, session_id))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "live_sessions": len(self._usage),
+                "pinned": len(self._pins),
+                "bytes": self._bytes,
+                "max_sessions": self.max_sessions,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+def _split_state(state: dict) -> tuple[dict, dict, dict]:
+    """Split a state or state delta into its app, user and session parts; temp keys are dropped."""
+    app, user, session = {}, {}, {}
+    for key, value in state.items():
+        if key.startswith(State.APP_PREFIX):
+            app[key.removeprefix(State.APP_PREFIX)] = value
+        elif key.startswith(State.USER_PREFIX):
+            user[key.removeprefix(State.USER_PREFIX)] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            session[key] = value
+    return app, user, session
+
+
+def _log_failed_flush(future: Future):
+    if future.exception() is not None:
+        logger.error("Session flush failed; kept for the next one", exc_info=future.exception())
+
+
+class _Flush:
+    """What one flush writes, taken from the buffers on the agent loop."""
+
+    def __init__(self, events: list[tuple], sessions: list[tuple], app_states: list[tuple],
+                 user_states: list[tuple]):
+        self.events = events
+        self.sessions = sessions
+        self.app_states = app_states
+        self.user_states = user_states
+
+
+class DurableSessionService(BaseSessionService):
+    """ADK sessions stored in SQLite, with batched appends and lazily loaded history."""
+
+    def __init__(self, db_path: str | Path = DEFAULT_SESSION_DB_PATH, batch_size: int = 64,
+                 flush_interval: float = 0.2, cache_size: int = 256,
+                 load_events: int = DEFAULT_LOAD_EVENTS):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.cache_size = cache_size
+        self.load_events = load_events
+        # All database work runs on this one thread, in submission order, so
+        # a load submitted after a flush sees its events.
+        self._io = ThreadPoolExecutor(1, thread_name_prefix="session-db")
+        # Created here, used only on the session-db thread (and by the exit flush).
+        self._db = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        # Guards the in-memory state below; never held during database work.
+        self._lock = threading.RLock()
+        # (app_name, user_id, session_id) -> Session, least recently used first
+        self._hot: OrderedDict[tuple[str, str, str], Session] = OrderedDict()
+        self._app_state: dict[str, dict] = {}
+        self._user_state: dict[tuple[str, str], dict] = {}
+        self._pending: list[tuple] = []
+        self._touched: dict[tuple[str, str, str], float] = {}
+        # Session state of touched sessions evicted from _hot before their flush.
+        self._evicted_state: dict[tuple[str, str, str], dict] = {}
+        self._dirty_app: set[str] = set()
+        self._dirty_user: set[tuple[str, str]] = set()
+        self._flush_timer = None
+        self.appends = 0
+        self.flushes = 0
+        self.events_written = 0
+        self.loads = 0
+        self.events_loaded = 0
+        self.cache_hits = 0
+        atexit.register(self._flush_now)
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._io, func, *args)
+
+    def has_session(self, app_name: str, user_id: str, session_id: str) -> bool:
+        """Whether the session exists; safe to call from any thread but the agent loop's."""
+        key = (app_name, user_id, session_id)
+        with self._lock:
+            if key in self._hot:
+                return True
+        return self._io.submit(self._exists, key).result()
+
+    def _exists(self, key: tuple[str, str, str]) -> bool:
+        return self._db.execute(
+            "SELECT 1 FROM sessions WHERE app_name=? AND user_id=? AND id=?", key
+        ).fetchone() is not None
+
+    def _read_shared(self, app_name: str, user_ids: list[str]) -> tuple[dict, dict[str, dict]]:
+        def load(table: str, where: str, params: tuple) -> dict:
+            row = self._db.execute(f"SELECT state FROM {table} WHERE {where}", params).fetchone()
+            return json.loads(row[0]) if row else {}
+
+        app_state = load("app_states", "app_name=?", (app_name,))
+        user_states = {
+            user_id: load("user_states", "app_name=? AND user_id=?", (app_name, user_id))
+            for user_id in user_ids
+        }
+        return app_state, user_states
+
+    async def _ensure_shared(self, app_name: str, user_ids: list[str]):
+        """Read the app and users' shared state into memory, where it then stays."""
+        with self._lock:
+            missing = [u for u in dict.fromkeys(user_ids) if (app_name, u) not in self._user_state]
+            if app_name in self._app_state and not missing:
+                return
+        app_state, user_states = await self._run(self._read_shared, app_name, missing)
+        with self._lock:
+            # Kept when already there: the copy in memory may have unwritten changes.
+            self._app_state.setdefault(app_name, app_state)
+            for user_id, state in user_states.items():
+                self._user_state.setdefault((app_name, user_id), state)
+
+    def _merged_state(self, app_name: str, user_id: str, session_state: dict) -> dict:
+        merged = dict(session_state)
+        merged.update({State.APP_PREFIX + k: v for k, v in self._app_state[app_name].items()})
+        merged.update({State.USER_PREFIX + k: v for k, v in self._user_state[app_name, user_id].items()})
+        return merged
+
+    def _apply_shared_delta(self, app_name: str, user_id: str, app_delta: dict, user_delta: dict):
+        if app_delta:
+            self._app_state[app_name].update(app_delta)
+            self._dirty_app.add(app_name)
+        if user_delta:
+            self._user_state[app_name, user_id].update(user_delta)
+            self._dirty_user.add((app_name, user_id))
+
+    def _remember(self, key: tuple[str, str, str], session: Session):
+        self._hot[key] = session
+        self._hot.move_to_end(key)
+        while len(self._hot) > self.cache_size:
+            evicted_key, evicted = self._hot.popitem(last=False)
+            if evicted_key in self._touched:
+                self._evicted_state[evicted_key] = _split_state(evicted.state)[2]
+
+    def _take_flush(self) -> _Flush | None:
+        """Empty the buffers into a ``_Flush``; states are serialized here, on the loop."""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not (self._pending or self._touched or self._dirty_app or self._dirty_user):
+                return None
+            sessions = []
+            for key, update_time in self._touched.items():
+                session = self._hot.get(key)
+                state = _split_state(session.state)[2] if session is not None else self._evicted_state.get(key)
+                sessions.append((key, update_time, None if state is None else json.dumps(state)))
+            batch = _Flush(
+                self._pending, sessions,
+                [(app_name, json.dumps(self._app_state[app_name])) for app_name in self._dirty_app],
+                [(*key, json.dumps(self._user_state[key])) for key in self._dirty_user],
+            )
+            self._pending = []
+            self._touched = {}
+            self._evicted_state = {}
+            self._dirty_app = set()
+            self._dirty_user = set()
+            return batch
+
+    def _write(self, batch: _Flush | None):
+        """Write ``batch`` in one transaction; on failure it is put back for the next flush."""
+        if batch is None:
+            return
+        try:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.executemany(
+                    "INSERT INTO events (app_name, user_id, session_id, timestamp, data) VALUES (?, ?, ?, ?, ?)",
+                    batch.events,
+                )
+                for key, update_time, state in batch.sessions:
+                    if state is None:
+                        self._db.execute(
+                            "UPDATE sessions SET update_time=? WHERE app_name=? AND user_id=? AND id=?",
+                            (update_time, *key),
+                        )
+                    else:
+                        self._db.execute(
+                            "UPDATE sessions SET state=?, update_time=? WHERE app_name=? AND user_id=? AND id=?",
+                            (state, update_time, *key),
+                        )
+                self._db.executemany("INSERT OR REPLACE INTO app_states (app_name, state) VALUES (?, ?)",
+                                     batch.app_states)
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO user_states (app_name, user_id, state) VALUES (?, ?, ?)",
+                    batch.user_states,
+                )
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._restore(batch)
+            raise
+        with self._lock:
+            self.flushes += 1
+            self.events_written += len(batch.events)
+
+    def _restore(self, batch: _Flush):
+        with self._lock:
+            self._pending[:0] = batch.events
+            for key, update_time, state in batch.sessions:
+                self._touched.setdefault(key, update_time)
+                if state is not None and key not in self._hot:
+                    self._evicted_state.setdefault(key, json.loads(state))
+            self._dirty_app.update(app_name for app_name, _ in batch.app_states)
+            self._dirty_user.update((app_name, user_id) for app_name, user_id, _ in batch.user_states)
+
+    def _flush_soon(self):
+        """Hand the buffers to the session-db thread without waiting for the write."""
+        future = self._io.submit(self._write, self._take_flush())
+        future.add_done_callback(_log_failed_flush)
+
+    def _flush_now(self):
+        # At exit, after the session-db thread has stopped: write on this thread.
+        self._write(self._take_flush())
+
+    async def flush(self) -> None:
+        """Write everything buffered, and wait for writes already under way."""
+        await self._run(self._write, self._take_flush())
+
+    async def create_session(self, *, app_name: str, user_id: str, state: dict | None = None,
+                             session_id: str | None = None) -> Session:
+        session_id = (session_id or "").strip() or os.urandom(16).hex()
+        key = (app_name, user_id, session_id)
+        app_delta, user_delta, session_state = _split_state(state or {})
+        now = time.time()
+        await self._ensure_shared(app_name, [user_id])
+        created = await self._run(self._insert_session, key, json.dumps(session_state), now)
+        if not created:
+            raise AlreadyExistsError(f"Session with id {session_id} already exists.")
+        with self._lock:
+            self._apply_shared_delta(app_name, user_id, app_delta, user_delta)
+            session = Session(
+                app_name=app_name, user_id=user_id, id=session_id,
+                state=self._merged_state(app_name, user_id, session_state),
+                events=[], last_update_time=now,
+            )
+            self._remember(key, session)
+        return session
+
+    def _insert_session(self, key: tuple[str, str, str], state: str, now: float) -> bool:
+        try:
+            self._db.execute(
+                "INSERT INTO sessions (app_name, user_id, id, state, create_time, update_time)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (*key, state, now, now),
+            )
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def _load(self, key: tuple[str, str, str], config: GetSessionConfig | None):
+        """The stored state, update time and events of a session, or None; on the session-db thread."""
+        row = self._db.execute(
+            "SELECT state, update_time FROM sessions WHERE app_name=? AND user_id=? AND id=?", key
+        ).fetchone()
+        if row is None:
+            return None
+        query = "SELECT data FROM events WHERE app_name=? AND user_id=? AND session_id=?"
+        params: list = list(key)
+        if config and config.after_timestamp:
+            query += " AND timestamp >= ?"
+            params.append(config.after_timestamp)
+        query += " ORDER BY seq DESC"
+        if config and config.num_recent_events is not None:
+            query += " LIMIT ?"
+            params.append(config.num_recent_events)
+        events = [Event.model_validate_json(data) for (data,) in self._db.execute(query, params)]
+        events.reverse()
+        with self._lock:
+            self.loads += 1
+            self.events_loaded += len(events)
+        return json.loads(row[0]), row[1], events
+
+    async def get_session(self, *, app_name: str, user_id: str, session_id: str,
+                          config: GetSessionConfig | None = None) -> Session | None:
+        key = (app_name, user_id, session_id)
+        with self._lock:
+            session = self._hot.get(key)
+            if session is not None:
+                self.cache_hits += 1
+                self._remember(key, session)
+        if session is None:
+            await self._ensure_shared(app_name, [user_id])
+            self._flush_soon()
+            window = config
+            if config is None and self.load_events:
+                window = GetSessionConfig(num_recent_events=self.load_events)
+            loaded = await self._run(self._load, key, window)
+            if loaded is None:
+                return None
+            session_state, update_time, events = loaded
+            with self._lock:
+                session = Session(
+                    app_name=app_name, user_id=user_id, id=session_id,
+                    state=self._merged_state(app_name, user_id, session_state),
+                    events=events, last_update_time=update_time,
+                )
+                if config is not None:
+                    return session
+                # Loaded meanwhile by another caller: keep that one, it may have new events.
+                session = self._hot.get(key, session)
+                self._remember(key, session)
+        if config is None:
+            return session
+        events = session.events
+        if config.after_timestamp:
+            events = [e for e in events if e.timestamp >= config.after_timestamp]
+        if config.num_recent_events is not None:
+            events = events[-config.num_recent_events:] if config.num_recent_events else []
+        return session.model_copy(update={"events": events})
+
+    def _list(self, app_name: str, user_id: str | None) -> list[tuple]:
+        query = "SELECT user_id, id, state, update_time FROM sessions WHERE app_name=?"
+        params: list = [app_name]
+        if user_id is not None:
+            query += " AND user_id=?"
+            params.append(user_id)
+        return self._db.execute(query + " ORDER BY update_time, user_id, id", params).fetchall()
+
+    async def list_sessions(self, *, app_name: str, user_id: str | None = None) -> ListSessionsResponse:
+        self._flush_soon()
+        rows = await self._run(self._list, app_name, user_id)
+        await self._ensure_shared(app_name, [uid for uid, _, _, _ in rows])
+        with self._lock:
+            sessions = [
+                Session(
+                    app_name=app_name, user_id=uid, id=sid,
+                    state=self._merged_state(app_name, uid, json.loads(state)),
+                    events=[], last_update_time=update_time,
+                )
+                for uid, sid, state, update_time in rows
+            ]
+        return ListSessionsResponse(sessions=sessions)
+
+    def _delete(self, key: tuple[str, str, str]):
+        self._db.execute("BEGIN IMMEDIATE")
+        self._db.execute("DELETE FROM events WHERE app_name=? AND user_id=? AND session_id=?", key)
+        self._db.execute("DELETE FROM sessions WHERE app_name=? AND user_id=? AND id=?", key)
+        self._db.execute("COMMIT")
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        key = (app_name, user_id, session_id)
+        self._flush_soon()
+        with self._lock:
+            self._hot.pop(key, None)
+        await self._run(self._delete, key)
+
+    async def get_user_state(self, *, app_name: str, user_id: str) -> dict:
+        await self._ensure_shared(app_name, [user_id])
+        with self._lock:
+            return dict(self._user_state[app_name, user_id])
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        key = (session.app_name, session.user_id, session.id)
+        with self._lock:
+            stored = self._hot.get(key)
+        if stored is None:
+            if not await self._run(self._exists, key):
+                raise SessionNotFoundError(f"Session {session.id} not found.")
+            await self._ensure_shared(session.app_name, [session.user_id])
+        with self._lock:
+            stored = self._hot.get(key)
+            event = await super().append_event(session=session, event=event)
+            session.last_update_time = event.timestamp
+            if stored is not None and stored is not session:
+                self._update_session_state(stored, event)
+                stored.events.append(event)
+                stored.last_update_time = event.timestamp
+            if event.actions and event.actions.state_delta:
+                app_delta, user_delta, _ = _split_state(event.actions.state_delta)
+                self._apply_shared_delta(session.app_name, session.user_id, app_delta, user_delta)
+            self._pending.append((*key, event.timestamp, event.model_dump_json(exclude_none=True)))
+            self._touched[key] = event.timestamp
+            self.appends += 1
+            flush = len(self._pending) >= self.batch_size or (event.author != "user" and event.is_final_response())
+            if not flush and self._flush_timer is None:
+                self._flush_timer = asyncio.get_running_loop().call_later(self.flush_interval, self._flush_soon)
+        if flush:
+            await self.flush()
+        return event
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hot_sessions": len(self._hot),
+                "pending": len(self._pending),
+                "appends": self.appends,
+                "flushes": self.flushes,
+                "events_written": self.events_written,
+                "loads": self.loads,
+                "events_loaded": self.events_loaded,
+                "cache_hits": self.cache_hits,
+            }
+
+
+def session_service_from_env() -> BaseSessionService:
+    """The session service selected by ``SESSION_BACKEND`` (``memory``, the default, or ``sqlite``).
+
+    ``memory`` is bounded by ``SESSION_MAX_COUNT``, ``SESSION_IDLE_TTL`` and
+    ``SESSION_MAX_MB``; ``sqlite`` stores sessions in ``SESSION_DB_PATH``
+    and keeps ``SESSION_CACHE_SIZE`` of them loaded, each with at most
+    ``SESSION_LOAD_EVENTS`` events read back (default 200, 0 = all).
+    """
+    if os.environ.get("SESSION_BACKEND", "memory") == "sqlite":
+        return DurableSessionService(
+            os.environ.get("SESSION_DB_PATH", str(DEFAULT_SESSION_DB_PATH)),
+            cache_size=int(os.environ.get("SESSION_CACHE_SIZE", "256")),
+            load_events=int(os.environ.get("SESSION_LOAD_EVENTS", str(DEFAULT_LOAD_EVENTS))),
+        )
+    return BoundedSessionService(
+        max_sessions=int(os.environ.get("SESSION_MAX_COUNT", "1000")),
+        idle_ttl=float(os.environ.get("SESSION_IDLE_TTL", "3600")),
+        max_bytes=int(float(os.environ.get("SESSION_MAX_MB", "256")) * (1 << 20)),
+    )
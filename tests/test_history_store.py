@@ -0,0 +1,186 @@
+"""``HistoryStore`` aggregates must match the raw logs they summarize, and
+snapshots must be reloaded after, and only after, their user's writes.
+
+Run from the repository root with ``python -m pytest tests`` (or
+``python -m unittest discover tests``).
+"""
+
+import random
+import tempfile
+import threading
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+
+from history_store import HistoryStore
+
+_EPOCH = date(2026, 1, 1)
+
+
+def _day(n: int) -> str:
+    return (_EPOCH + timedelta(days=n)).isoformat()
+
+
+def _expected(sessions: list[str], weight_log: list[dict], today: str) -> dict:
+    """``HistoryStore.aggregates`` worked out from the full logs."""
+    days = sorted(date.fromisoformat(d) for d in set(sessions))
+    longest, run, prev = 0, 0, None
+    for d in days:
+        run = run + 1 if prev is not None and (d - prev).days == 1 else 1
+        longest, prev = max(longest, run), d
+    current = 0
+    for i, d in enumerate(reversed(days)):
+        if d != date.fromisoformat(today) - timedelta(days=i):
+            break
+        current += 1
+
+    weights = {e["date"]: e["weight"] for e in weight_log}
+
+    def average(n: int):
+        since = (date.fromisoformat(today) - timedelta(days=n - 1)).isoformat()
+        values = [w for d, w in weights.items() if since <= d <= today]
+        return round(sum(values) / len(values), 1) if values else None
+
+    ordered = sorted(weights)
+    return {
+        "current_streak": current,
+        "longest_streak": longest,
+        "last_activity": days[-1].isoformat() if days else None,
+        "latest_weight": weights[ordered[-1]] if ordered else None,
+        "weight_avg_7d": average(7),
+        "weight_avg_30d": average(30),
+        "weight_delta": (
+            round(weights[ordered[-1]] - weights[ordered[0]], 1) if len(ordered) > 1 else None
+        ),
+    }
+
+
+class HistoryStoreAggregatesTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self._tmp.name) / "history.db"
+        self.store = HistoryStore(self.db_path)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def assertMatchesLogs(self, store: HistoryStore, user_id: str, today: str):
+        expected = _expected(store.sessions(user_id), store.weight_log(user_id), today)
+        self.assertEqual(store.aggregates(user_id, today), expected, user_id)
+
+    def _fill(self, users: int, seed: int = 0) -> str:
+        """Random sessions (some backfilled) and weigh-ins (some on the same day); returns the last day."""
+        rng = random.Random(seed)
+        for u in range(users):
+            for _ in range(rng.randint(0, 80)):
+                if rng.random() < 0.5:
+                    self.store.log_session(f"u{u}", _day(rng.randint(0, 60)))
+                else:
+                    self.store.log_weight(f"u{u}", _day(rng.randint(0, 60)), round(rng.uniform(55, 95), 1))
+        return _day(60)
+
+    def test_incremental_matches_logs(self):
+        today = self._fill(users=40)
+        for u in range(40):
+            self.assertMatchesLogs(self.store, f"u{u}", today)
+
+    def test_backfill_rebuilds_missing_aggregates(self):
+        today = self._fill(users=20)
+        before = {u: self.store.aggregates(f"u{u}", today) for u in range(20)}
+        self.store._conn().execute("DELETE FROM aggregates")
+
+        reopened = HistoryStore(self.db_path)
+        for u in range(20):
+            self.assertEqual(reopened.aggregates(f"u{u}", today), before[u])
+            self.assertMatchesLogs(reopened, f"u{u}", today)
+
+    def test_compact_keeps_history_and_aggregates(self):
+        for n in range(10):
+            self.store.log_session("u", _day(n))
+            for weight in (70.0, 71.0, 70.0 + n / 10):
+                self.store.log_weight("u", _day(n), weight)
+        log, before = self.store.weight_log("u"), self.store.aggregates("u", _day(9))
+
+        self.assertEqual(self.store.compact(), 20)
+        self.assertEqual(self.store.compact(), 0)
+        self.assertEqual(self.store.weight_log("u"), log)
+        self.assertEqual(self.store.aggregates("u", _day(9)), before)
+        self.store._conn().execute("DELETE FROM aggregates")
+        self.assertEqual(HistoryStore(self.db_path).aggregates("u", _day(9)), before)
+        self.assertMatchesLogs(self.store, "u", _day(9))
+
+    def test_concurrent_writes_and_compact(self):
+        threads, writes = 8, 60
+        errors = []
+
+        def write(t: int):
+            try:
+                rng = random.Random(t)
+                for i in range(writes):
+                    user = "shared" if i % 2 else f"user_{t}"
+                    day = _day(rng.randint(0, 40))
+                    self.store.log_session(user, day)
+                    self.store.log_weight(user, day, 60 + t + i / 100)
+                    self.store.log_workout(user, {"day": day, "thread": t})
+                    if i % 20 == 0:
+                        self.store.compact()
+            except BaseException as e:
+                errors.append(e)
+
+        workers = [threading.Thread(target=write, args=(t,)) for t in range(threads)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+
+        self.assertEqual(errors, [])
+        users = ["shared"] + [f"user_{t}" for t in range(threads)]
+        self.assertEqual(sum(len(self.store.workout_log(u)) for u in users), threads * writes)
+        for user in users:
+            self.assertMatchesLogs(self.store, user, _day(40))
+        self.store._conn().execute("DELETE FROM aggregates")
+        reopened = HistoryStore(self.db_path)
+        for user in users:
+            self.assertMatchesLogs(reopened, user, _day(40))
+
+
+class HistoryStoreSnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self._tmp.name) / "history.db"
+        self.store = HistoryStore(self.db_path)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _loads(self) -> int:
+        return self.store.stats()["loads"]
+
+    def test_other_users_writes_keep_snapshot(self):
+        self.store.log_session("a", _day(0))
+        self.store.log_session("b", _day(0))
+        self.store.snapshot("a"), self.store.aggregates("a", _day(0))
+        loads = self._loads()
+
+        self.store.log_weight("b", _day(1), 70.0)
+        self.store.log_workout("b", {"day": _day(1)})
+        self.assertEqual(self.store.snapshot("a")["sessions"], [_day(0)])
+        self.store.aggregates("a", _day(0))
+        self.assertEqual(self._loads(), loads)
+
+        self.store.log_weight("a", _day(1), 70.0)
+        self.assertEqual(self.store.snapshot("a")["weight_log"], [{"date": _day(1), "weight": 70.0}])
+        self.assertEqual(self.store.aggregates("a", _day(1))["latest_weight"], 70.0)
+        self.assertEqual(self._loads(), loads + 2)
+
+    def test_write_from_another_process_reloads(self):
+        self.store.log_session("a", _day(0))
+        self.assertEqual(self.store.snapshot("a")["sessions"], [_day(0)])
+
+        HistoryStore(self.db_path).log_session("a", _day(1))
+        self.assertEqual(self.store.snapshot("a")["sessions"], [_day(0), _day(1)])
+        self.assertEqual(self.store.aggregates("a", _day(1))["current_streak"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+"""The meal solver's matrix stays bounded and copes with empty diet files."""
+
+import math
+import random
+import unittest
+
+from fitness_agent.utils import meal_solver
+from fitness_agent.utils.meal_solver import MAX_COMBINATIONS, _MealMatrix
+
+
+def _option(rng: random.Random, i: int) -> dict:
+    return {"name": f"meal {i}", "calories": rng.randint(100, 900), "protein_g": rng.randint(5, 60),
+            "carbs_g": rng.randint(5, 120), "fat_g": rng.randint(2, 40)}
+
+
+class MealMatrixTest(unittest.TestCase):
+    def test_large_file_is_capped_and_keeps_calorie_range(self):
+        rng = random.Random(0)
+        meals = {slot: [_option(rng, i) for i in range(40)] for slot in "abcdef"}
+        matrix = _MealMatrix(meals)
+
+        self.assertLessEqual(len(matrix.totals), MAX_COMBINATIONS)
+        self.assertEqual(len(matrix.totals), math.prod(len(o) for o in matrix.options))
+        low = sum(min(o["calories"] for o in options) for options in meals.values())
+        high = sum(max(o["calories"] for o in options) for options in meals.values())
+        self.assertEqual((matrix.totals[:, 0].min(), matrix.totals[:, 0].max()), (low, high))
+
+    def test_small_file_is_enumerated_in_full(self):
+        rng = random.Random(1)
+        matrix = _MealMatrix({"a": [_option(rng, i) for i in range(4)], "b": [_option(rng, i) for i in range(3)]})
+        self.assertEqual(len(matrix.totals), 12)
+
+    def test_empty_slots(self):
+        matrix = _MealMatrix({"breakfast": [], "lunch": []})
+        self.assertEqual(matrix.slots, [])
+        self.assertEqual(matrix.totals.shape, (0, len(meal_solver.NUTRIENTS)))
+
+        original = meal_solver.get_diet_for_profile
+        meal_solver.get_diet_for_profile = lambda *args: {"meals": {"breakfast": [], "lunch": []}}
+        try:
+            targets = {"calories": 2000, "protein_g": 120, "carbs_g": 200, "fat_g": 60}
+            self.assertEqual(meal_solver.solve_day("empty", "vegan", "indian", targets), [])
+            self.assertEqual(meal_solver.solve_week("empty", "vegan", "indian", targets), [])
+        finally:
+            meal_solver.get_diet_for_profile = original
+            meal_solver._matrices.clear()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""The SQLite reference backend returns exactly what the JSON catalog does.
+
+Every profile lookup is compared over all enum combinations, plus an unknown
+value for each argument to cover the fallbacks and errors, and videos over
+a grid of pages.
+"""
+
+import itertools
+import tempfile
+import unittest
+from pathlib import Path
+
+from fitness_agent.utils import data_loader, sqlite_store
+from fitness_agent.utils.catalog import DATA_DIR, load_shards
+
+GOALS = ("fat_loss", "weight_gain", "muscle_building", "health_maintenance", "unknown")
+LEVELS = ("beginner", "intermediate", "advanced", "unknown")
+EQUIPMENT = ("none", "basic", "full_gym", "unknown")
+DAYS = (2, 3, 4, 5, 6, 7)
+DIETS = ("vegetarian", "non_vegetarian", "vegan", "eggetarian", "unknown")
+CUISINES = ("indian", "western", "flexible", "unknown")
+CONTENT_TYPES = ("workout", "diet", "both", "unknown")
+LIMITS = (None, 0, 1, 3, 5, 10)
+OFFSETS = (0, 1, 3, 4, 5, 10)
+
+
+class ReferenceBackendParityTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._tmp = tempfile.TemporaryDirectory()
+        db_path = Path(cls._tmp.name) / "reference.db"
+        sqlite_store.ingest(load_shards(DATA_DIR), db_path)
+        cls.store = sqlite_store.ReferenceStore(db_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._tmp.cleanup()
+
+    def setUp(self):
+        self._backend, self._store = data_loader.DATA_BACKEND, sqlite_store._store
+        sqlite_store._store = self.store
+
+    def tearDown(self):
+        data_loader.DATA_BACKEND, sqlite_store._store = self._backend, self._store
+
+    def assertSameOnBothBackends(self, lookup, combinations):
+        mismatches = []
+        for args in combinations:
+            data_loader.DATA_BACKEND = "json"
+            expected = lookup(*args)
+            data_loader.DATA_BACKEND = "sqlite"
+            if lookup(*args) != expected:
+                mismatches.append(args)
+        self.assertEqual(mismatches, [])
+
+    def test_workouts(self):
+        self.assertSameOnBothBackends(
+            data_loader.get_workout_for_profile, itertools.product(GOALS, LEVELS, EQUIPMENT, DAYS)
+        )
+
+    def test_diets(self):
+        self.assertSameOnBothBackends(
+            data_loader.get_diet_for_profile, itertools.product(GOALS, DIETS, CUISINES)
+        )
+
+    def test_video_pages(self):
+        self.assertSameOnBothBackends(
+            data_loader.get_videos_for_profile,
+            itertools.product(GOALS, LEVELS, CONTENT_TYPES, LIMITS, OFFSETS),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()